@@ -0,0 +1,27 @@
+"""add user token_version
+
+Revision ID: 3a1b0a9ec7fa
+Revises: a88f785891f4
+Create Date: 2026-10-17 10:12:41.503297
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3a1b0a9ec7fa"
+down_revision = "a88f785891f4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "users",
+        sa.Column("token_version", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_column("users", "token_version")
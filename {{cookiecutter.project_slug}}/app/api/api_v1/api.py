@@ -1,7 +1,12 @@
 from fastapi import APIRouter
 
-from app.api.api_v1.endpoints import login, users
+from app.api.api_v1.endpoints import admin, login, users, users_async
+from app.core.config import settings
 
 api_router = APIRouter()
 api_router.include_router(login.router, tags=["login"])
+if settings.ASYNC_DATABASE:
+    # Registered first so the async read endpoints take precedence over the sync ones.
+    api_router.include_router(users_async.router, prefix="/users", tags=["users"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
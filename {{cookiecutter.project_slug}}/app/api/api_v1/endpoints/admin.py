@@ -0,0 +1,86 @@
+from typing import Any, List
+
+from fastapi import APIRouter, Depends
+
+from app import models, schemas
+from app.api import deps
+from app.api.routing import SessionReleasingRoute
+from app.core.cache import principal_cache, token_versions, verified_tokens
+from app.core.redis import circuit_breakers, pool_snapshot, redis_pools
+from app.db.pool import pool_metrics
+
+router = APIRouter(route_class=SessionReleasingRoute)
+
+
+@router.get("/pools", response_model=List[schemas.PoolStatus])
+def read_pools(
+    _: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """Get the status of every database connection pool in this worker.
+
+    Args:
+        _ (models.User, optional): The current user. Defaults to Depends(deps.get_current_active_superuser).
+
+    Raises:
+        HTTPException: The user does not have sufficient privileges.
+
+    Returns:
+        Any: The pool status, checkout counters and wait time histogram.
+    """
+    return [metrics.snapshot() for metrics in pool_metrics.values()]
+
+
+@router.get("/caches", response_model=List[schemas.CacheStatus])
+def read_caches(
+    _: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """Get the size and hit rate of every in-process cache in this worker.
+
+    Args:
+        _ (models.User, optional): The current user. Defaults to Depends(deps.get_current_active_superuser).
+
+    Raises:
+        HTTPException: The user does not have sufficient privileges.
+
+    Returns:
+        Any: The cache sizes, hit and miss counters.
+    """
+    return [
+        cache.snapshot() for cache in (principal_cache, token_versions, verified_tokens)
+    ]
+
+
+@router.get("/redis", response_model=List[schemas.RedisPoolStatus])
+def read_redis_pools(
+    _: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """Get the utilization of the Redis connection pools in this worker.
+
+    Args:
+        _ (models.User, optional): The current user. Defaults to Depends(deps.get_current_active_superuser).
+
+    Raises:
+        HTTPException: The user does not have sufficient privileges.
+
+    Returns:
+        Any: The connections in use and idle, against the pool limit.
+    """
+    return [pool_snapshot(name, pool) for name, pool in redis_pools.items()]
+
+
+@router.get("/redis/circuits", response_model=List[schemas.CircuitStatus])
+def read_redis_circuits(
+    _: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """Get the circuit breaker of every Redis feature in this worker.
+
+    Args:
+        _ (models.User, optional): The current user. Defaults to Depends(deps.get_current_active_superuser).
+
+    Raises:
+        HTTPException: The user does not have sufficient privileges.
+
+    Returns:
+        Any: The circuit states, call and rejection counters.
+    """
+    return [breaker.snapshot() for breaker in circuit_breakers.values()]
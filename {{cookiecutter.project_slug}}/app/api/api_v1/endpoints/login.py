@@ -1,62 +1,166 @@
+import math
 from datetime import timedelta
-from typing import Any
+from typing import Any, Optional
 
 from fastapi import APIRouter, Body, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
-from slowapi import Limiter
 from slowapi.util import get_remote_address
 from sqlalchemy.orm import Session
 
-from app import crud, schemas
+from app import crud, models, schemas
 from app.api import deps
+from app.api.routing import SessionReleasingRoute
 from app.core import security
 from app.core.config import settings
-from app.core.security import get_password_hash, verify_password
+from app.core.hashing import check_password, hash_password
+from app.core.lockout import login_lockout
+from app.core.rate_limit import login_limiter
+from app.core.tokens import refresh_tokens, revoked_tokens
 from app.utils import verify_password_reset_token
 
-limiter = Limiter(key_func=get_remote_address)
+router = APIRouter(route_class=SessionReleasingRoute)
 
-
-router = APIRouter()
+limit_logins = deps.rate_limit(
+    login_limiter, "Too many login attempts. Please try again later."
+)
 
 
-@router.post("/login/access-token", response_model=schemas.Token)
-@limiter.limit(
-    limit_value=settings.RATE_LIMIT_TIME,
-    error_message="Too many login attempts. Please try again later.",
+@router.post(
+    "/login/access-token",
+    response_model=schemas.Token,
+    dependencies=[Depends(limit_logins)],
 )
-def login_access_token(
+async def login_access_token(
     request: Request,
     db: Session = Depends(deps.get_db),
     form_data: OAuth2PasswordRequestForm = Depends(),
 ) -> Any:
     """Log in and get access token.
 
+    Async so a login waiting on bcrypt holds no threadpool worker; Redis and
+    the database are still called from the threadpool.
+
     Args:
         request (Request): The request.
         db (Session, optional): The session database. Defaults to Depends(deps.get_db).
         form_data (OAuth2PasswordRequestForm, optional): The form data. Defaults to Depends().
 
     Raises:
+        HTTPException: Too many failed attempts for the account or client address.
         HTTPException: Invalid username or password.
 
     Returns:
         Any: The access token.
     """
-    user = crud.user.authenticate(
+    ip = get_remote_address(request)
+    # Checked before the user query and bcrypt, the costly part of an attempt.
+    retry_after = await run_in_threadpool(
+        login_lockout.retry_after, form_data.username, ip
+    )
+    if retry_after:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many failed login attempts. Please try again later.",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+    user = await crud.user.authenticate_async(
         db, email=form_data.username, password=form_data.password
     )
     if not user:
+        await run_in_threadpool(login_lockout.record_failure, form_data.username, ip)
         raise HTTPException(status_code=400, detail="Invalid username or password.")
+    await run_in_threadpool(login_lockout.reset, form_data.username)
+    if not crud.user.is_active(user):
+        raise HTTPException(status_code=400, detail="Inactive user.")
+    refresh_token = await run_in_threadpool(
+        refresh_tokens.issue, user.id, user.token_version
+    )
+    return issue_tokens(user, refresh_token)
+
+
+@router.post(
+    "/login/refresh-token",
+    response_model=schemas.Token,
+    dependencies=[Depends(limit_logins)],
+)
+def refresh_access_token(
+    db: Session = Depends(deps.get_db),
+    refresh_token: str = Body(..., embed=True),
+) -> Any:
+    """Trade a refresh token for a new access token and refresh token.
+
+    Refresh tokens are single use. Presenting one that was already used
+    revokes every refresh token issued since the login it came from. A
+    password change revokes every refresh token of the user.
+
+    Args:
+        db (Session, optional): The database session. Defaults to Depends(deps.get_db).
+        refresh_token (str, optional): The refresh token. Defaults to Body(..., embed=True).
+
+    Raises:
+        HTTPException: Invalid, expired, reused or revoked refresh token.
+        HTTPException: User not found.
+        HTTPException: Inactive user.
+
+    Returns:
+        Any: The access token and the next refresh token.
+    """
+    rotated = refresh_tokens.rotate(
+        refresh_token,
+        lambda subject: crud.user.get_token_version(db, id=int(subject)),
+    )
+    if rotated is None:
+        raise HTTPException(status_code=401, detail="Invalid refresh token.")
+    user_id, next_refresh_token = rotated
+    user = crud.user.get_principal(db, id=int(user_id))
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found.")
     elif not crud.user.is_active(user):
         raise HTTPException(status_code=400, detail="Inactive user.")
+    return issue_tokens(user, next_refresh_token)
+
+
+@router.post("/logout", response_model=schemas.Msg)
+def logout(
+    token_data: schemas.TokenPayload = Depends(deps.get_token_data),
+    refresh_token: Optional[str] = Body(None, embed=True),
+) -> Any:
+    """Revoke the access token and, if given, the refresh token.
+
+    Args:
+        token_data (schemas.TokenPayload, optional): The access token payload. Defaults to Depends(deps.get_token_data).
+        refresh_token (Optional[str], optional): The refresh token. Defaults to Body(None, embed=True).
+
+    Returns:
+        Any: The message.
+    """
+    if token_data.jti is not None and token_data.exp is not None:
+        revoked_tokens.revoke(token_data.jti, token_data.exp)
+    if refresh_token:
+        refresh_tokens.revoke(refresh_token)
+    return {"msg": "Logged out successfully."}
+
+
+def issue_tokens(user: models.User, refresh_token: Optional[str]) -> schemas.Token:
+    """Pair a new access token for `user` with its refresh token.
+
+    Args:
+        user (models.User): The authenticated user.
+        refresh_token (Optional[str]): The refresh token, if one could be issued.
+
+    Returns:
+        schemas.Token: The tokens.
+    """
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    return {
-        "access_token": security.create_access_token(
-            user.id, expires_delta=access_token_expires
+    claims = crud.user.token_claims(user) if settings.STATELESS_AUTH else None
+    return schemas.Token(
+        access_token=security.create_access_token(
+            user.id, expires_delta=access_token_expires, claims=claims
         ),
-        "token_type": "bearer",
-    }
+        token_type="bearer",
+        refresh_token=refresh_token,
+    )
 
 
 @router.post("/reset-password/", response_model=schemas.Msg)
@@ -84,7 +188,7 @@ async def reset_password(
     if not user_id:
         raise HTTPException(status_code=400, detail="Invalid token.")
 
-    user = crud.user.get(db, id=user_id)
+    user = await run_in_threadpool(crud.user.get, db, id=user_id)
 
     if not user:
         raise HTTPException(
@@ -95,14 +199,16 @@ async def reset_password(
     elif not crud.user.is_active(user):
         raise HTTPException(status_code=400, detail="Inactive user.")
 
-    elif not verify_password(old_password, user.hashed_password):
+    elif not await check_password(old_password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Current password is invalid.")
 
-    hashed_password = get_password_hash(new_password)
-    user.hashed_password = hashed_password
     user.primeiro_acesso = False
-    db.add(user)
-    db.commit()
+    # Also revokes the stateless tokens issued before the change.
+    hashed_password = await hash_password(new_password)
+    # The update flushes; the database stays off the event loop.
+    await run_in_threadpool(
+        crud.user.update, db, db_obj=user, obj_in={"hashed_password": hashed_password}
+    )
     return {"msg": "Password changed successfully."}
 
 
@@ -129,7 +235,7 @@ async def create_password(
     if not user_id:
         raise HTTPException(status_code=400, detail="Invalid token.")
 
-    user = crud.user.get(db, id=user_id)
+    user = await run_in_threadpool(crud.user.get, db, id=user_id)
 
     if not user:
         raise HTTPException(
@@ -140,8 +246,8 @@ async def create_password(
     elif not crud.user.is_active(user):
         raise HTTPException(status_code=400, detail="Inactive user.")
 
-    hashed_password = get_password_hash(new_password)
-    user.hashed_password = hashed_password
-    db.add(user)
-    db.commit()
+    hashed_password = await hash_password(new_password)
+    await run_in_threadpool(
+        crud.user.update, db, db_obj=user, obj_in={"hashed_password": hashed_password}
+    )
     return {"msg": "Password created successfully."}
@@ -1,41 +1,144 @@
-from typing import Any, List
-
-from fastapi import APIRouter, Body, Depends, HTTPException
-from fastapi.encoders import jsonable_encoder
+import io
+from typing import Any, List, Optional
+
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    File,
+    HTTPException,
+    Query,
+    UploadFile,
+)
+from fastapi.responses import StreamingResponse
 from pydantic.networks import EmailStr
 from sqlalchemy.orm import Session
 
-from app import crud, models, schemas
+from app import crud, models, schemas, user_export, user_import
 from app.api import deps
+from app.api.routing import SessionReleasingRoute
 from app.core.config import settings
+from app.core.enums import FileFormatEnum
+from app.crud.pagination import InvalidCursor, next_cursor
 from app.utils import send_new_account_email
 
-router = APIRouter()
+# Only the columns the response needs, loaded as rows instead of ORM objects.
+USER_FIELDS = tuple(schemas.User.model_fields)
+
+router = APIRouter(route_class=SessionReleasingRoute)
 
 
 @router.get("/", response_model=List[schemas.User])
 def read_users(
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    order_by: str = "id",
     _: models.User = Depends(deps.get_current_active_superuser),
 ) -> Any:
     """List all users.
 
+    Pass the `X-Next-Cursor` response header back as `cursor` to get the next
+    page; `skip` is kept for offset paging and ignored when a cursor is given.
+
     Args:
-        db (Session, optional): The database session. Defaults to Depends(deps.get_db).
+        db (Session, optional): The read database session. Defaults to Depends(deps.get_read_db).
         skip (int, optional): The number of records to skip. Defaults to 0.
         limit (int, optional): The number of records to return. Defaults to 100.
+        cursor (Optional[str], optional): The cursor of the previous page. Defaults to None.
+        order_by (str, optional): id, email, cpf or phone. Defaults to "id".
         _ (models.User, optional): The current user. Defaults to Depends(deps.get_current_active_superuser).
 
     Raises:
         HTTPException: Unable to validate credentials.
+        HTTPException: Invalid cursor or ordering.
 
     Returns:
         Any: The list of users.
     """
-    users = crud.user.get_multi(db, skip=skip, limit=limit)
-    return users
+    try:
+        users = crud.user.get_multi(
+            db,
+            skip=skip,
+            limit=limit,
+            after=cursor,
+            order_by=order_by,
+            fields=USER_FIELDS,
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    cursor = next_cursor(users, limit=limit, order_by=order_by)
+    return schemas.user_serializer.response_many(
+        users, headers={"X-Next-Cursor": cursor} if cursor else None
+    )
+
+
+@router.get("/export", response_class=StreamingResponse)
+def export_users(
+    export_format: FileFormatEnum = Query(FileFormatEnum.NDJSON, alias="format"),
+    _: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """Stream all users as NDJSON or CSV.
+
+    Rows are read through a server-side cursor and encoded in chunks, so
+    memory use does not grow with the number of users.
+
+    Args:
+        export_format (FileFormatEnum, optional): ndjson or csv. Defaults to Query(FileFormatEnum.NDJSON, alias="format").
+        _ (models.User, optional): The current user. Defaults to Depends(deps.get_current_active_superuser).
+
+    Raises:
+        HTTPException: Unable to validate credentials.
+
+    Returns:
+        Any: The streaming response.
+    """
+    return StreamingResponse(
+        user_export.export_users(export_format),
+        media_type=user_export.MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="users.{export_format.value}"'
+        },
+    )
+
+
+# Large files take longer than a request budget; chunks commit as they go.
+@router.post(
+    "/import",
+    response_model=schemas.ImportResult,
+    dependencies=[Depends(deps.deadline(None))],
+)
+def import_users(
+    file: UploadFile = File(...),
+    file_format: Optional[FileFormatEnum] = Query(None, alias="format"),
+    _: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """Import users from a CSV or NDJSON file.
+
+    Rows are validated like `POST /users/`, hashed in parallel and loaded with
+    COPY; invalid rows and existing users are reported by line. No account
+    emails are sent.
+
+    Args:
+        file (UploadFile, optional): The CSV or NDJSON file. Defaults to File(...).
+        file_format (Optional[FileFormatEnum], optional): ndjson or csv, guessed from the file name when omitted. Defaults to Query(None, alias="format").
+        _ (models.User, optional): The current user. Defaults to Depends(deps.get_current_active_superuser).
+
+    Raises:
+        HTTPException: Unable to validate credentials.
+        HTTPException: The file is not UTF-8 encoded.
+
+    Returns:
+        Any: The number of inserted users and the per-line errors.
+    """
+    stream = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    try:
+        return user_import.import_users(
+            stream, file_format or user_import.guess_format(file.filename)
+        )
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="The file must be UTF-8 encoded.")
 
 
 @router.post("/", response_model=schemas.User)
@@ -71,7 +174,106 @@ def create_user(
             username=user_in.email,
             password=user_in.password,
         )
-    return user
+    return schemas.user_serializer.response(user)
+
+
+@router.post("/bulk", response_model=schemas.BulkResult)
+def create_users_bulk(
+    *,
+    db: Session = Depends(deps.get_db),
+    bulk_in: schemas.UserBulkCreate,
+    _: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """Create many users at once.
+
+    Items conflicting with an existing user or an earlier item are reported
+    in `errors` by position; no account emails are sent.
+
+    Args:
+        bulk_in (schemas.UserBulkCreate): The users data.
+        db (Session, optional): The database session. Defaults to Depends(deps.get_db).
+        _ (models.User, optional): The current user. Defaults to Depends(deps.get_current_active_superuser).
+
+    Returns:
+        Any: The new user IDs and the per-item errors.
+    """
+    users = crud.user.create_multi(db, objs_in=bulk_in.items)
+    return schemas.BulkResult(
+        ids=[user.id for user in users if user is not None],
+        errors=[
+            schemas.BulkItemError(
+                index=index,
+                detail="The user with this email, CPF or phone already exists.",
+            )
+            for index, user in enumerate(users)
+            if user is None
+        ],
+    )
+
+
+@router.put("/bulk", response_model=schemas.BulkResult)
+def update_users_bulk(
+    *,
+    db: Session = Depends(deps.get_db),
+    bulk_in: schemas.UserBulkUpdate,
+    _: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """Apply the same changes to many users at once.
+
+    Args:
+        bulk_in (schemas.UserBulkUpdate): The user IDs and the values to set.
+        db (Session, optional): The database session. Defaults to Depends(deps.get_db).
+        _ (models.User, optional): The current user. Defaults to Depends(deps.get_current_active_superuser).
+
+    Returns:
+        Any: The updated user IDs and the per-item errors.
+    """
+    updated = crud.user.update_multi(
+        db, ids=bulk_in.ids, obj_in=bulk_in.values.model_dump(exclude_none=True)
+    )
+    return bulk_result(bulk_in.ids, updated)
+
+
+@router.delete("/bulk", response_model=schemas.BulkResult)
+def remove_users_bulk(
+    *,
+    db: Session = Depends(deps.get_db),
+    bulk_in: schemas.BulkDelete,
+    _: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """Remove many users at once.
+
+    Args:
+        bulk_in (schemas.BulkDelete): The user IDs.
+        db (Session, optional): The database session. Defaults to Depends(deps.get_db).
+        _ (models.User, optional): The current user. Defaults to Depends(deps.get_current_active_superuser).
+
+    Returns:
+        Any: The removed user IDs and the per-item errors.
+    """
+    removed = crud.user.remove_multi(db, ids=bulk_in.ids)
+    return bulk_result(bulk_in.ids, removed)
+
+
+def bulk_result(ids: List[int], affected: List[int]) -> schemas.BulkResult:
+    """Report the requested IDs that were not found as per-item errors.
+
+    Args:
+        ids (List[int]): The requested user IDs.
+        affected (List[int]): The user IDs actually updated or removed.
+
+    Returns:
+        schemas.BulkResult: The bulk result.
+    """
+    found = set(affected)
+    return schemas.BulkResult(
+        ids=affected,
+        errors=[
+            schemas.BulkItemError(index=index, detail="User not found.")
+            for index, user_id in enumerate(ids)
+            if user_id not in found
+        ],
+    )
 
 
 @router.put("/me", response_model=schemas.User)
@@ -104,35 +306,34 @@ def update_user_me(
     Returns:
         Any: The updated user.
     """
-    current_user_data = jsonable_encoder(current_user)
-    user_in = schemas.UserUpdate(**current_user_data)
-
-    if first_name is not None:
-        user_in.first_name = first_name
-    if last_name is not None:
-        user_in.last_name = last_name
-    if cpf is not None:
-        user_in.cpf = cpf
-    if email is not None:
-        user_in.email = email
-    if phone is not None:
-        user_in.phone = phone
-    if password is not None:
-        user_in.password = password
+    # The current user may have been loaded from a replica session.
+    current_user = db.merge(current_user, load=False)
+    changes = {
+        "first_name": first_name,
+        "last_name": last_name,
+        "cpf": cpf,
+        "email": email,
+        "phone": phone,
+        "password": password,
+    }
+    # Only the given fields are set, so only they are written.
+    user_in = schemas.UserUpdate(
+        **{field: value for field, value in changes.items() if value is not None}
+    )
 
     user = crud.user.update(db, db_obj=current_user, obj_in=user_in)
-    return user
+    return schemas.user_serializer.response(user)
 
 
 @router.get("/me", response_model=schemas.User)
 def read_user_me(
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """Get the current user.
 
     Args:
-        db (Session, optional): The database session. Defaults to Depends(deps.get_db).
+        db (Session, optional): The read database session. Defaults to Depends(deps.get_read_db).
         current_user (models.User, optional): The current user. Defaults to Depends(deps.get_current_active_user).
 
     Raises:
@@ -141,7 +342,7 @@ def read_user_me(
     Returns:
         Any: The current user.
     """
-    return current_user
+    return schemas.user_serializer.response(current_user)
 
 
 @router.post("/open", response_model=schemas.User)
@@ -193,21 +394,21 @@ def create_user_open(
         password=password,
     )
     user = crud.user.create(db, obj_in=user_in)
-    return user
+    return schemas.user_serializer.response(user)
 
 
 @router.get("/{user_id}", response_model=schemas.User)
 def read_user_by_id(
     user_id: int,
     current_user: models.User = Depends(deps.get_current_active_user),
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
 ) -> Any:
     """Get a specific user by ID.
 
     Args:
         user_id (int): The user ID.
         current_user (models.User, optional): The current user. Defaults to Depends(deps.get_current_active_user).
-        db (Session, optional): The database session. Defaults to Depends(deps.get_db).
+        db (Session, optional): The read database session. Defaults to Depends(deps.get_read_db).
 
     Raises:
         HTTPException: The user does not have sufficient privileges.
@@ -217,13 +418,13 @@ def read_user_by_id(
     """
     user = crud.user.get(db, id=user_id)
     if user == current_user:
-        return user
+        return schemas.user_serializer.response(user)
     if not crud.user.is_superuser(current_user):
         raise HTTPException(
             status_code=400,
             detail="The user does not have sufficient privileges.",
         )
-    return user
+    return schemas.user_serializer.response(user)
 
 
 @router.put("/{user_id}", response_model=schemas.User)
@@ -255,4 +456,4 @@ def update_user(
             detail="The user with this username does not exist in the system.",
         )
     user = crud.user.update(db, db_obj=user, obj_in=user_in)
-    return user
+    return schemas.user_serializer.response(user)
@@ -0,0 +1,102 @@
+from typing import Any, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models, schemas
+from app.api import deps
+from app.api.api_v1.endpoints.users import USER_FIELDS
+from app.crud.pagination import InvalidCursor, next_cursor
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[schemas.User])
+async def read_users_async(
+    db: AsyncSession = Depends(deps.get_async_db),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    order_by: str = "id",
+    _: models.User = Depends(deps.get_current_active_superuser_async),
+) -> Any:
+    """List all users using the async database session.
+
+    Args:
+        db (AsyncSession, optional): The async database session. Defaults to Depends(deps.get_async_db).
+        skip (int, optional): The number of records to skip. Defaults to 0.
+        limit (int, optional): The number of records to return. Defaults to 100.
+        cursor (Optional[str], optional): The cursor of the previous page. Defaults to None.
+        order_by (str, optional): id, email, cpf or phone. Defaults to "id".
+        _ (models.User, optional): The current user. Defaults to Depends(deps.get_current_active_superuser_async).
+
+    Raises:
+        HTTPException: Unable to validate credentials.
+        HTTPException: Invalid cursor or ordering.
+
+    Returns:
+        Any: The list of users.
+    """
+    try:
+        users = await crud.async_user.get_multi(
+            db,
+            skip=skip,
+            limit=limit,
+            after=cursor,
+            order_by=order_by,
+            fields=USER_FIELDS,
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    cursor = next_cursor(users, limit=limit, order_by=order_by)
+    return schemas.user_serializer.response_many(
+        users, headers={"X-Next-Cursor": cursor} if cursor else None
+    )
+
+
+@router.get("/me", response_model=schemas.User)
+async def read_user_me_async(
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """Get the current user using the async database session.
+
+    Args:
+        current_user (models.User, optional): The current user. Defaults to Depends(deps.get_current_active_user_async).
+
+    Raises:
+        HTTPException: Unable to validate credentials.
+
+    Returns:
+        Any: The current user.
+    """
+    return schemas.user_serializer.response(current_user)
+
+
+@router.get("/{user_id}", response_model=schemas.User)
+async def read_user_by_id_async(
+    user_id: int,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+    db: AsyncSession = Depends(deps.get_async_db),
+) -> Any:
+    """Get a specific user by ID using the async database session.
+
+    Args:
+        user_id (int): The user ID.
+        current_user (models.User, optional): The current user. Defaults to Depends(deps.get_current_active_user_async).
+        db (AsyncSession, optional): The async database session. Defaults to Depends(deps.get_async_db).
+
+    Raises:
+        HTTPException: The user does not have sufficient privileges.
+
+    Returns:
+        Any: The user.
+    """
+    user = await crud.async_user.get(db, id=user_id)
+    if user == current_user:
+        return schemas.user_serializer.response(user)
+    if not crud.user.is_superuser(current_user):
+        raise HTTPException(
+            status_code=400,
+            detail="The user does not have sufficient privileges.",
+        )
+    return schemas.user_serializer.response(user)
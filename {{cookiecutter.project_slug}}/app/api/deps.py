@@ -1,26 +1,122 @@
-from typing import Generator
+import hashlib
+import math
+import time
+from typing import AsyncGenerator, Awaitable, Callable, Generator, Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
+from fastapi.security.utils import get_authorization_scheme_param
 from jose import jwt
 from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
+from app.api.routing import register_session
 from app.core import security
+from app.core.cache import verified_tokens
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.core.deadline import current_deadline
+from app.core.rate_limit import RedisRateLimiter
+from app.core.tokens import REFRESH_SCOPE, revoked_tokens
+from app.crud.crud_user import attach_user
+from app.db.session import (
+    AsyncSessionLocal,
+    LazySession,
+    ReadSessionLocal,
+    SessionLocal,
+    recent_writers,
+    replicas,
+)
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
 )
 
 
-def get_db() -> Generator:
+def get_token_subject(request: Request) -> Optional[str]:
+    """Get the bearer token subject without verifying the token.
+
+    Only used to route reads; authorization always goes through get_token_data.
+
+    Args:
+        request (Request): The request.
+
+    Returns:
+        Optional[str]: The token subject, if any.
+    """
+    scheme, token = get_authorization_scheme_param(request.headers.get("Authorization"))
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        subject = jwt.get_unverified_claims(token).get("sub")
+    except jwt.JWTError:
+        return None
+    return str(subject) if subject is not None else None
+
+
+def deadline(seconds: Optional[float]) -> Callable[[], Awaitable[None]]:
+    """Override REQUEST_TIMEOUT_SECONDS for a route.
+
+    Use it in the route's `dependencies` so it runs before any session opens.
+
+    Args:
+        seconds (Optional[float]): The route budget, None for no deadline.
+
+    Returns:
+        Callable[[], Awaitable[None]]: The dependency.
+    """
+
+    # Async so the request cancel scope is moved from the event loop.
+    async def set_deadline() -> None:
+        current = current_deadline.get()
+        if current is not None:
+            current.set(seconds)
+
+    return set_deadline
+
+
+def rate_limit(
+    limiter: Optional[RedisRateLimiter], detail: str
+) -> Callable[[Request], Awaitable[None]]:
+    """Limit the requests of each client address to a route.
+
+    Args:
+        limiter (Optional[RedisRateLimiter]): The limiter, None to let every request through.
+        detail (str): The error message.
+
+    Returns:
+        Callable[[Request], Awaitable[None]]: The dependency.
+    """
+
+    # Async so the Redis call does not take a threadpool worker.
+    async def check_rate_limit(request: Request) -> None:
+        if limiter is None:
+            return
+        client = request.client.host if request.client else "unknown"
+        retry_after = await limiter.hit(f"{request.url.path}:{client}")
+        if retry_after:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=detail,
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+
+    return check_rate_limit
+
+
+def get_db(request: Request) -> Generator:
     """Get the database session.
 
-    Raises:
-        HTTPException: Unable to validate credentials.
+    The session is lazy: no connection is checked out until the first statement,
+    and it is released as soon as the endpoint's response is built. Under a
+    SessionReleasingRoute it runs as a unit of work: CRUD methods only flush and
+    the route commits once at the end. Under any other route, each CRUD write
+    commits on its own, so no write is left uncommitted.
+
+    Args:
+        request (Request): The request.
 
     Returns:
         _type_: The database session.
@@ -28,41 +124,158 @@ def get_db() -> Generator:
     Yields:
         Generator: The database session.
     """
-    db: Session = None
+    db = LazySession(SessionLocal, expire_on_commit=False)
+    db.info["unit_of_work"] = getattr(request.state, "unit_of_work", False)
+    # Only needed to route reads: without replicas, writers are not marked.
+    db.info["subject"] = get_token_subject(request) if replicas.engines else None
+    register_session(request, db)
     try:
-        db = SessionLocal()
         yield db
     finally:
-        if db:
-            db.close()
+        db.close()
 
 
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(reusable_oauth2)
-) -> models.User:
-    """Get the current user.
+def get_read_db(request: Request, db: Session = Depends(get_db)) -> Generator:
+    """Get a session for read-only work, routed to a healthy replica.
+
+    Falls back to the primary session when no replica is configured or healthy,
+    and for subjects that wrote within READ_YOUR_WRITES_SECONDS.
+
+    Args:
+        request (Request): The request.
+        db (Session, optional): The primary database session. Defaults to Depends(get_db).
+
+    Yields:
+        Generator: The read database session.
+    """
+    replica = None
+    if replicas.engines and not recent_writers.is_recent(db.info.get("subject")):
+        replica = replicas.choose()
+    if replica is None:
+        yield db
+        return
+    read_db = LazySession(ReadSessionLocal, bind=replica)
+    register_session(request, read_db)
+    try:
+        yield read_db
+    finally:
+        read_db.close()
+
+
+async def get_async_db() -> AsyncGenerator:
+    """Get the async database session.
+
+    Raises:
+        RuntimeError: ASYNC_DATABASE is disabled.
+
+    Yields:
+        AsyncGenerator: The async database session.
+    """
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Set ASYNC_DATABASE to use the async database session.")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_token_data(
+    token: str = Depends(reusable_oauth2),
+) -> schemas.TokenPayload:
+    """Decode and validate the access token.
+
+    Tokens that were verified before are served from `verified_tokens` by
+    their SHA-256 digest until they expire, skipping the HMAC check and the
+    JSON parsing. The returned payload is shared, do not modify it. Either
+    way, the token ID is checked against the revocation list.
+
+    Async so a request takes no threadpool worker to authenticate: only a
+    token ID matching the revocation filter is looked up in Redis, from the
+    threadpool.
 
     Args:
-        db (Session, optional): The database session. Defaults to Depends(get_db).
         token (str, optional): The token. Defaults to Depends(reusable_oauth2).
 
     Raises:
         HTTPException: Unable to validate credentials.
+        HTTPException: The token has been revoked.
 
     Returns:
-        models.User: The current user.
+        schemas.TokenPayload: The token payload.
     """
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
-        )
-        token_data = schemas.TokenPayload(**payload)
-    except (jwt.JWTError, ValidationError):
+    digest = hashlib.sha256(token.encode()).digest()
+    cached = verified_tokens.get(digest)
+    if cached is not None and cached[1] > time.time():
+        token_data = cached[0]
+    else:
+        try:
+            payload = jwt.decode(
+                token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
+            )
+            token_data = schemas.TokenPayload(**payload)
+        except (jwt.JWTError, ValidationError):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Unable to validate credentials.",
+            )
+        if token_data.scope == REFRESH_SCOPE:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Unable to validate credentials.",
+            )
+        if isinstance(payload.get("exp"), (int, float)):
+            verified_tokens.set(digest, (token_data, payload["exp"]))
+    if (
+        token_data.jti is not None
+        and revoked_tokens.may_be_revoked(token_data.jti)
+        and await run_in_threadpool(revoked_tokens.is_revoked, token_data.jti)
+    ):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="Unable to validate credentials.",
+            detail="Token has been revoked.",
+        )
+    return token_data
+
+
+def get_current_user(
+    db: Session = Depends(get_read_db),
+    token_data: schemas.TokenPayload = Depends(get_token_data),
+) -> models.User:
+    """Get the current user, through the principal cache.
+
+    With STATELESS_AUTH, tokens carrying claims only have their token_version
+    checked against an in-memory map; the user is built from the claims and
+    the rest of its columns load from the database on first access.
+
+    Args:
+        db (Session, optional): The read database session. Defaults to Depends(get_read_db).
+        token_data (schemas.TokenPayload, optional): The token payload. Defaults to Depends(get_token_data).
+
+    Raises:
+        HTTPException: The token has been revoked.
+        HTTPException: User not found.
+
+    Returns:
+        models.User: The current user.
+    """
+    if settings.STATELESS_AUTH and token_data.token_version is not None:
+        version = crud.user.get_token_version(db, id=token_data.sub)
+        if version is None:
+            raise HTTPException(status_code=404, detail="User not found.")
+        if version != token_data.token_version:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Token has been revoked.",
+            )
+        return attach_user(
+            db,
+            {
+                "id": token_data.sub,
+                "is_active": token_data.is_active,
+                "is_superuser": token_data.is_superuser,
+                "permission": token_data.permission,
+                "token_version": token_data.token_version,
+            },
         )
-    user = crud.user.get(db, id=token_data.sub)
+    user = crud.user.get_principal(db, id=token_data.sub)
     if not user:
         raise HTTPException(status_code=404, detail="User not found.")
     return user
@@ -107,3 +320,80 @@ def get_current_active_superuser(
             detail="The user does not have sufficient privileges.",
         )
     return current_user
+
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    token_data: schemas.TokenPayload = Depends(get_token_data),
+) -> models.User:
+    """Get the current user using the async database session.
+
+    With STATELESS_AUTH, tokens carrying claims are checked against the
+    user's token_version. The user is loaded either way: an async session
+    can not load the columns missing from the claims on first access.
+
+    Args:
+        db (AsyncSession, optional): The async database session. Defaults to Depends(get_async_db).
+        token_data (schemas.TokenPayload, optional): The token payload. Defaults to Depends(get_token_data).
+
+    Raises:
+        HTTPException: User not found.
+        HTTPException: The token has been revoked.
+
+    Returns:
+        models.User: The current user.
+    """
+    user = await crud.async_user.get(db, id=token_data.sub)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found.")
+    if (
+        settings.STATELESS_AUTH
+        and token_data.token_version is not None
+        and user.token_version != token_data.token_version
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Token has been revoked.",
+        )
+    return user
+
+
+async def get_current_active_user_async(
+    current_user: models.User = Depends(get_current_user_async),
+) -> models.User:
+    """Get the current active user using the async database session.
+
+    Args:
+        current_user (models.User, optional): The user authenticated. Defaults to Depends(get_current_user_async).
+
+    Raises:
+        HTTPException: The user is not active.
+
+    Returns:
+        models.User: The current active user.
+    """
+    if not crud.user.is_active(current_user):
+        raise HTTPException(status_code=400, detail="Inactive user.")
+    return current_user
+
+
+async def get_current_active_superuser_async(
+    current_user: models.User = Depends(get_current_active_user_async),
+) -> models.User:
+    """Get the current superuser using the async database session.
+
+    Args:
+        current_user (models.User, optional): The user authenticated. Defaults to Depends(get_current_active_user_async).
+
+    Raises:
+        HTTPException: The user does not have sufficient privileges.
+
+    Returns:
+        models.User: The current superuser.
+    """
+    if not crud.user.is_superuser(current_user):
+        raise HTTPException(
+            status_code=400,
+            detail="The user does not have sufficient privileges.",
+        )
+    return current_user
@@ -0,0 +1,55 @@
+from typing import Any, Callable, Coroutine, List
+
+from anyio import CancelScope
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.routing import APIRoute
+
+from app.db.session import LazySession
+
+
+def register_session(request: Request, db: LazySession) -> None:
+    """Attach a request session so the route can release it early.
+
+    Args:
+        request (Request): The request.
+        db (LazySession): The request database session.
+    """
+    sessions: List[LazySession] = getattr(request.state, "db_sessions", [])
+    sessions.append(db)
+    request.state.db_sessions = sessions
+
+
+class SessionReleasingRoute(APIRoute):
+    """Route that commits and closes the request sessions once the response is built.
+
+    Request sessions opened under this route run as a unit of work: CRUD
+    methods only flush, and sessions with pending writes are committed once
+    after the endpoint succeeds; if the endpoint raises, closing rolls them back.
+
+    Dependencies with `yield` only run their teardown after the response has
+    been sent, so a slow client would otherwise keep a pooled connection
+    checked out for the whole transfer.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def release_sessions_handler(request: Request) -> Response:
+            # Read by get_db; routes without this handler commit per CRUD call.
+            request.state.unit_of_work = True
+            try:
+                response = await handler(request)
+                for db in getattr(request.state, "db_sessions", []):
+                    if db.info.get("unit_of_work") and db.has_writes:
+                        await run_in_threadpool(db.commit)
+                return response
+            finally:
+                # Shielded: a request cancelled at its deadline still returns
+                # its connections to the pool.
+                with CancelScope(shield=True):
+                    for db in getattr(request.state, "db_sessions", []):
+                        if db.started:
+                            await run_in_threadpool(db.close)
+
+        return release_sessions_handler
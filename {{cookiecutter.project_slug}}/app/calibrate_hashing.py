@@ -0,0 +1,86 @@
+"""Pick the bcrypt cost for this machine from a login latency budget.
+
+    python -m app.calibrate_hashing --budget-ms 250
+
+Each cost step doubles the hashing time, so the highest cost that hashes
+within the budget is the one to set as PASSWORD_HASH_ROUNDS. Run it on the
+hardware that serves logins.
+"""
+
+import argparse
+import logging
+import statistics
+import time
+from typing import List, Tuple
+
+from passlib.hash import bcrypt
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Below this cost bcrypt is too cheap to slow down offline guessing.
+MIN_ROUNDS = 10
+MAX_ROUNDS = 31
+
+
+def measure(rounds: int, samples: int = 3) -> float:
+    """Time one bcrypt hash.
+
+    Args:
+        rounds (int): The bcrypt cost.
+        samples (int, optional): The hashes to time. Defaults to 3.
+
+    Returns:
+        float: The median time in seconds.
+    """
+    hasher = bcrypt.using(rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash("calibration password")
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def calibrate(budget: float, samples: int = 3) -> Tuple[int, List[Tuple[int, float]]]:
+    """Find the highest bcrypt cost hashing within `budget`.
+
+    Args:
+        budget (float): The time allowed for a hash, in seconds.
+        samples (int, optional): The hashes timed per cost. Defaults to 3.
+
+    Returns:
+        Tuple[int, List[Tuple[int, float]]]: The cost, and the time measured for each cost tried.
+    """
+    timings = []
+    rounds = MIN_ROUNDS
+    while rounds <= MAX_ROUNDS:
+        seconds = measure(rounds, samples)
+        timings.append((rounds, seconds))
+        if seconds > budget:
+            break
+        rounds += 1
+    within = [rounds for rounds, seconds in timings if seconds <= budget]
+    return max(within, default=MIN_ROUNDS), timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--budget-ms", type=float, default=250.0)
+    parser.add_argument("--samples", type=int, default=3)
+    args = parser.parse_args()
+
+    rounds, timings = calibrate(args.budget_ms / 1000, args.samples)
+    for cost, seconds in timings:
+        logger.info("cost %s: %.1f ms per hash", cost, seconds * 1000)
+    if timings[0][1] > args.budget_ms / 1000:
+        logger.warning(
+            "Even cost %s takes longer than %s ms; raise the budget or add CPUs.",
+            MIN_ROUNDS,
+            args.budget_ms,
+        )
+    print(f"PASSWORD_HASH_ROUNDS={rounds}")
+
+
+if __name__ == "__main__":
+    main()
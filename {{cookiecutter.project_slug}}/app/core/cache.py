@@ -0,0 +1,233 @@
+"""In-process caches with hit-rate counters and cross-worker invalidation."""
+
+import logging
+import threading
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence
+
+from cachetools import TTLCache
+from redis import Redis, RedisError
+
+from app.core.config import settings
+from app.core.redis import CircuitBreaker, circuit_breaker, redis_client
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class LocalCache:
+    """A bounded, thread-safe TTL cache evicting the least recently used entries.
+
+    Args:
+        name (str): The cache name reported by the admin endpoint.
+        maxsize (int): The maximum number of entries.
+        ttl (float): How long an entry is served, in seconds. 0 disables the cache.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl or 1)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a cached value.
+
+        Args:
+            key (Hashable): The key.
+
+        Returns:
+            Optional[Any]: The value, None on a miss.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return value
+
+    @property
+    def generation(self) -> int:
+        """A counter bumped by every invalidation, read before loading a value."""
+        return self._generation
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        """Cache a value.
+
+        Pass the `generation` read before loading the value: if anything was
+        invalidated meanwhile, the value may predate that write and is dropped.
+
+        Args:
+            key (Hashable): The key.
+            value (Any): The value.
+            generation (Optional[int], optional): The generation the value was loaded at. Defaults to None.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if generation is None or generation == self._generation:
+                self._data[key] = value
+
+    def invalidate(self, keys: Iterable[Hashable]) -> None:
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self.invalidations += 1
+                self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the cache size and counters.
+
+        Returns:
+            Dict[str, Any]: The cache status, compatible with schemas.CacheStatus.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class RedisInvalidator:
+    """Broadcast cache invalidations to every worker through Redis pub/sub.
+
+    Invalidations are applied locally first, so a Redis outage only delays
+    other workers until their entries expire. The local cache is cleared
+    whenever the subscription is (re)established, since messages published
+    while disconnected are lost.
+
+    Args:
+        caches (Sequence[LocalCache]): The caches sharing the keys to keep in sync.
+        redis (Redis): The Redis client.
+        breaker (CircuitBreaker): The circuit of the publications.
+        channel (str): The pub/sub channel.
+    """
+
+    def __init__(
+        self,
+        caches: Sequence[LocalCache],
+        redis: Redis,
+        breaker: CircuitBreaker,
+        channel: str,
+    ):
+        self.caches = list(caches)
+        self.channel = channel
+        self._redis = redis
+        self._breaker = breaker
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def invalidate(self, keys: Iterable[Hashable]) -> None:
+        """Invalidate `keys` here and in every subscribed worker.
+
+        Args:
+            keys (Iterable[Hashable]): The keys, sent as strings.
+        """
+        keys = [str(key) for key in keys]
+        if not keys:
+            return
+        self._apply(keys)
+        if not self.enabled:
+            return
+        try:
+            with self._breaker.guard():
+                self._redis.publish(self.channel, ",".join(keys))
+        except RedisError:
+            logger.warning("Could not publish invalidations on %s.", self.channel)
+
+    @property
+    def enabled(self) -> bool:
+        return any(cache.enabled for cache in self.caches)
+
+    def start(self) -> None:
+        """Listen for invalidations from other workers in a daemon thread."""
+        if not self.enabled or self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._listen, name=self.channel, daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _listen(self) -> None:
+        backoff = 0.5
+        while not self._stopped.is_set():
+            try:
+                with self._redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    pubsub.subscribe(**{self.channel: self._on_message})
+                    self._resync()
+                    backoff = 0.5
+                    while not self._stopped.is_set():
+                        pubsub.get_message(timeout=0.5)
+            except RedisError:
+                logger.warning(
+                    "Lost the %s subscription, retrying in %ss.", self.channel, backoff
+                )
+                self._stopped.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+    def _on_message(self, message: Dict[str, Any]) -> None:
+        self._apply(message["data"].decode().split(","))
+
+    def _apply(self, keys: List[str]) -> None:
+        for cache in self.caches:
+            cache.invalidate(keys)
+
+    def _resync(self) -> None:
+        """Catch up on the messages missed while unsubscribed."""
+        for cache in self.caches:
+            cache.clear()
+
+
+principal_cache = LocalCache(
+    "principal",
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_SECONDS,
+)
+# User ID to token_version, checked by stateless tokens (STATELESS_AUTH).
+token_versions = LocalCache(
+    "token_version",
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_SECONDS,
+)
+# Token digest to (schemas.TokenPayload, exp) for tokens whose signature checked out.
+verified_tokens = LocalCache(
+    "verified_token",
+    maxsize=settings.TOKEN_CACHE_SIZE,
+    ttl=settings.TOKEN_CACHE_SECONDS,
+)
+principal_invalidations = RedisInvalidator(
+    [principal_cache, token_versions],
+    redis_client,
+    circuit_breaker("principal-invalidations"),
+    "principal-invalidations",
+)
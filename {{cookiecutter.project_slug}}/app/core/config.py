@@ -31,7 +31,16 @@ def is_running_in_docker() -> bool:
 class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     SECRET_KEY: str = secrets.token_urlsafe(32)
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 100000
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    # Refresh tokens are single use: each refresh returns the next one
+    REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 30
+    # Revoked access tokens are mirrored per worker into a Bloom filter sized
+    # for this many tokens; only its false positives are looked up in Redis
+    REVOCATION_FILTER_CAPACITY: int = 1_000_000
+    REVOCATION_FILTER_ERROR_RATE: float = 0.001
+    # Put is_active, is_superuser, permission and token_version in access tokens
+    # and authorize from them, checking only the cached token_version
+    STATELESS_AUTH: bool = False
     SERVER_HOST: AnyHttpUrl
     # BACKEND_CORS_ORIGINS is a JSON-formatted list of origins
     # e.g: '["http://localhost", "http://localhost:4200", "http://localhost:3000", \
@@ -57,7 +66,31 @@ class Settings(BaseSettings):
     SQLALCHEMY_DATABASE_URI: Optional[PostgresDsn] = None
     SQLALCHEMY_DATABASE_URI_TEST: Optional[PostgresDsn] = None
     REDIS_HOST: str
+    # Connection pools shared by every Redis feature, one sync and one async
+    # per worker; threads wait REDIS_POOL_TIMEOUT for a connection when full
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT: float = 1.0
+    REDIS_SOCKET_TIMEOUT: float = 1.0
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = 1.0
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
+    # A feature stops calling Redis for REDIS_BREAKER_RESET_SECONDS after this
+    # many errors or calls slower than REDIS_BREAKER_SLOW_SECONDS in a row
+    REDIS_BREAKER_FAILURES: int = 5
+    REDIS_BREAKER_RESET_SECONDS: float = 5.0
+    REDIS_BREAKER_SLOW_SECONDS: float = 0.25
+    # Limit per client address on each login route, counted in Redis for every worker
     RATE_LIMIT_TIME: Optional[str] = "1000/minute"
+    # Limit per client address on every route but the health check, decided
+    # in process and synced to Redis every RATE_LIMIT_SYNC_SECONDS
+    RATE_LIMIT_DEFAULT: Optional[str] = None
+    RATE_LIMIT_SYNC_SECONDS: float = 0.25
+    # Failed logins lock the account, or the client address, once they reach
+    # these counts (0 disables); the lockout doubles with every further failure
+    LOGIN_LOCKOUT_ACCOUNT_FAILURES: int = 5
+    LOGIN_LOCKOUT_IP_FAILURES: int = 50
+    LOGIN_LOCKOUT_SECONDS: float = 1.0
+    LOGIN_LOCKOUT_MAX_SECONDS: float = 900.0
+    LOGIN_FAILURE_WINDOW_SECONDS: int = 900
 
     @field_validator("SQLALCHEMY_DATABASE_URI", mode="before")
     @classmethod
@@ -95,6 +128,72 @@ class Settings(BaseSettings):
         else:
             return None
 
+    # SQLALCHEMY_REPLICA_URIS is a JSON-formatted or comma-separated list of DSNs
+    SQLALCHEMY_REPLICA_URIS: List[PostgresDsn] = []
+    REPLICA_EJECT_SECONDS: int = 30
+    READ_YOUR_WRITES_SECONDS: int = 5
+
+    @field_validator("SQLALCHEMY_REPLICA_URIS", mode="before")
+    @classmethod
+    def assemble_replica_uris(cls, v: Union[str, List[str]]) -> Union[List[str], str]:
+        if isinstance(v, str) and not v.startswith("["):
+            return [i.strip() for i in v.split(",") if i.strip()]
+        elif isinstance(v, (list, str)):
+            return v
+        raise ValueError(v)
+
+    ASYNC_DATABASE: bool = False
+    SQLALCHEMY_ASYNC_DATABASE_URI: Optional[PostgresDsn] = None
+
+    @field_validator("SQLALCHEMY_ASYNC_DATABASE_URI", mode="before")
+    @classmethod
+    def assemble_async_db_connection(
+        cls, v: Optional[str], info: ValidationInfo
+    ) -> Any:
+        if isinstance(v, str):
+            return v
+        uri = info.data.get("SQLALCHEMY_DATABASE_URI")
+        if uri is None:
+            return None
+        return str(uri).replace("postgresql://", "postgresql+asyncpg://", 1)
+
+    # Connection pool, applied per engine and per worker process
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_RECYCLE: int = -1
+    DATABASE_POOL_TIMEOUT: float = 30.0
+    DATABASE_POOL_PRE_PING: bool = True
+
+    # Users looked up by get_current_user are cached per worker for this long;
+    # writes invalidate them in every worker through Redis. 0 disables it.
+    PRINCIPAL_CACHE_SECONDS: float = 30.0
+    PRINCIPAL_CACHE_SIZE: int = 10_000
+
+    # Verified access tokens, keyed by digest, skip the signature check and
+    # JSON parsing until they expire or fall out of the cache. 0 disables it.
+    TOKEN_CACHE_SECONDS: float = 300.0
+    TOKEN_CACHE_SIZE: int = 10_000
+
+    # bcrypt cost, as log2 of the rounds; `python -m app.calibrate_hashing`
+    # picks one for the hardware. Stored hashes are updated on login.
+    PASSWORD_HASH_ROUNDS: int = 12
+
+    # bcrypt runs in HASHING_PROCESSES worker processes, 0 for one per CPU;
+    # calls beyond those and HASHING_QUEUE_SIZE waiting ones get a 503
+    HASHING_PROCESSES: int = 0
+    HASHING_QUEUE_SIZE: int = 64
+
+    # Time budget of a request, also applied as the Postgres statement_timeout
+    # of its transactions; 0 disables it. Routes can override it.
+    REQUEST_TIMEOUT_SECONDS: float = 30.0
+
+    # Per-request SQL stats: X-DB-* response headers in DEBUG, a warning log
+    # when a request goes over any of the thresholds
+    DEBUG: bool = False
+    QUERY_WARN_STATEMENTS: int = 20
+    QUERY_WARN_SECONDS: float = 0.5
+    QUERY_WARN_REPEATS: int = 5
+
     SMTP_TLS: bool = True
     SMTP_PORT: Optional[int] = None
     SMTP_HOST: Optional[str] = None
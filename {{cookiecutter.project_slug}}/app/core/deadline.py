@@ -0,0 +1,136 @@
+"""Request deadlines shared by everything a request runs."""
+
+import math
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from anyio import CancelScope
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import DBAPIError
+
+# Postgres SQLSTATE for a statement cancelled by statement_timeout.
+QUERY_CANCELED = "57014"
+
+
+class DeadlineExceeded(Exception):
+    """The request ran out of time."""
+
+
+class Deadline:
+    """The time budget of one request.
+
+    The same object is seen from the event loop and from the threadpool, so
+    setting it in a route dependency also bounds the statements the endpoint
+    runs. Times are `time.monotonic()`, the clock of the asyncio event loop.
+
+    Args:
+        seconds (Optional[float]): The budget from now, None for no deadline.
+    """
+
+    def __init__(self, seconds: Optional[float]):
+        self.started = time.monotonic()
+        self.expires_at: Optional[float] = None
+        self.cancel_scope: Optional[CancelScope] = None
+        self.set(seconds)
+
+    def bind(self, cancel_scope: CancelScope) -> None:
+        """Cancel `cancel_scope` when the deadline passes, following later changes.
+
+        Args:
+            cancel_scope (CancelScope): The scope wrapping the request.
+        """
+        self.cancel_scope = cancel_scope
+        cancel_scope.deadline = math.inf if self.expires_at is None else self.expires_at
+
+    def set(self, seconds: Optional[float]) -> None:
+        """Move the deadline to `seconds` after the request started.
+
+        Must be called from the event loop once a cancel scope is attached.
+
+        Args:
+            seconds (Optional[float]): The budget, None for no deadline.
+        """
+        self.expires_at = None if seconds is None else self.started + seconds
+        if self.cancel_scope is not None:
+            self.bind(self.cancel_scope)
+
+    def remaining(self) -> Optional[float]:
+        """Get the seconds left.
+
+        Raises:
+            DeadlineExceeded: The deadline has passed.
+
+        Returns:
+            Optional[float]: The seconds left, None when there is no deadline.
+        """
+        if self.expires_at is None:
+            return None
+        remaining = self.expires_at - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded("Request deadline exceeded.")
+        return remaining
+
+
+current_deadline: ContextVar[Optional[Deadline]] = ContextVar(
+    "current_deadline", default=None
+)
+
+
+def statement_timeout_ms() -> Optional[int]:
+    """Get the remaining request budget as a Postgres statement_timeout.
+
+    Raises:
+        DeadlineExceeded: The deadline has passed.
+
+    Returns:
+        Optional[int]: The milliseconds left, None outside of a request or without a deadline.
+    """
+    deadline = current_deadline.get()
+    remaining = deadline.remaining() if deadline is not None else None
+    if remaining is None:
+        return None
+    return math.ceil(remaining * 1000)
+
+
+def deadline_exceeded_response() -> JSONResponse:
+    """Build the response of a request that ran out of time.
+
+    Returns:
+        JSONResponse: The 504 response.
+    """
+    return JSONResponse({"detail": "Request deadline exceeded."}, status_code=504)
+
+
+async def deadline_exceeded_handler(
+    request: Request, exc: DeadlineExceeded
+) -> JSONResponse:
+    """Answer 504 for a request that ran out of time outside the middleware.
+
+    Args:
+        request (Request): The request.
+        exc (DeadlineExceeded): The deadline error.
+
+    Returns:
+        JSONResponse: The 504 response.
+    """
+    return deadline_exceeded_response()
+
+
+async def database_error_handler(request: Request, exc: DBAPIError) -> JSONResponse:
+    """Answer 504 for statements cancelled by the request statement_timeout.
+
+    Args:
+        request (Request): The request.
+        exc (DBAPIError): The database error.
+
+    Raises:
+        DBAPIError: Any other database error, unchanged.
+
+    Returns:
+        JSONResponse: The 504 response.
+    """
+    if getattr(exc.orig, "pgcode", None) != QUERY_CANCELED:
+        raise exc
+    return deadline_exceeded_response()
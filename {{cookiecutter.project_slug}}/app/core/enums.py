@@ -11,3 +11,15 @@ class UserPermissionEnum(str, Enum):
 
     ADMINISTRATOR = "Administrator"
     USER = "User"
+
+
+class FileFormatEnum(str, Enum):
+    """The FileFormatEnum class defines the data import and export formats.
+
+    Args:
+        str (_type_): The file format.
+        Enum (_type_): The file format enum type.
+    """
+
+    NDJSON = "ndjson"
+    CSV = "csv"
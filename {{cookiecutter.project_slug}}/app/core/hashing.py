@@ -0,0 +1,233 @@
+"""Password hashing in worker processes, with a bounded queue."""
+
+import asyncio
+import concurrent.futures
+import itertools
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Deque, Iterable, Iterator, Optional
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.deadline import Deadline, DeadlineExceeded, current_deadline
+from app.core.security import get_password_hash, verify_password
+
+
+class HashingBusy(Exception):
+    """Every hashing process is busy and the queue is full."""
+
+
+class HashingPool:
+    """A process pool for bcrypt, failing fast instead of queueing without limit.
+
+    bcrypt takes hundreds of milliseconds of CPU per call; in worker processes
+    it runs in parallel across cores without holding up the event loop or the
+    request threadpool. Calls over `processes + queue_size` in flight raise
+    HashingBusy, answered with a 503, so a login burst can not pile up behind
+    the pool and starve every other request.
+
+    Args:
+        processes (Optional[int], optional): The hashing processes. Defaults to the CPU count.
+        queue_size (int, optional): The calls waiting for a free process. Defaults to 0.
+    """
+
+    def __init__(self, processes: Optional[int] = None, queue_size: int = 0):
+        self.processes = processes or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self._slots = threading.BoundedSemaphore(self.processes + queue_size)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> ProcessPoolExecutor:
+        """Start the processes, if not started yet.
+
+        Returns:
+            ProcessPoolExecutor: The executor.
+        """
+        with self._lock:
+            if self._executor is None:
+                # Spawned processes do not inherit the locks of a threaded server.
+                self._executor = ProcessPoolExecutor(
+                    self.processes, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def stop(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+
+    def __enter__(self) -> "HashingPool":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        # The caller holds a slot, released once the call is done.
+        try:
+            future = self.start().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Schedule `fn(*args)` in a hashing process.
+
+        Args:
+            fn (Callable[..., Any]): A picklable, module-level function.
+
+        Raises:
+            HashingBusy: The processes and the queue are full.
+
+        Returns:
+            Future: The result.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy("Too many password operations in progress.")
+        return self._submit(fn, *args)
+
+    @staticmethod
+    def _result(future: Future, deadline: Optional[Deadline]) -> Any:
+        timeout = deadline.remaining() if deadline is not None else None
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise DeadlineExceeded("Request deadline exceeded.")
+
+    def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Call `fn(*args)` in a hashing process, waiting in the calling thread.
+
+        The wait is bounded by the request deadline.
+
+        Args:
+            fn (Callable[..., Any]): A picklable, module-level function.
+
+        Raises:
+            HashingBusy: The processes and the queue are full.
+            DeadlineExceeded: The request deadline passed while waiting.
+
+        Returns:
+            Any: The result.
+        """
+        return self._result(self.submit(fn, *args), current_deadline.get())
+
+    async def run_async(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Await `fn(*args)` in a hashing process.
+
+        Cancelling the await, e.g. at the request deadline, drops the call if
+        it has not started yet.
+
+        Args:
+            fn (Callable[..., Any]): A picklable, module-level function.
+
+        Raises:
+            HashingBusy: The processes and the queue are full.
+
+        Returns:
+            Any: The result.
+        """
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def map(
+        self,
+        fn: Callable[[Any], Any],
+        iterable: Iterable[Any],
+        window: Optional[int] = None,
+    ) -> Iterator[Any]:
+        """Map `fn` over `iterable` in the hashing processes.
+
+        At most `window` calls are in flight, each holding a slot like `submit`
+        but waiting for a free one instead of failing. A batch on the shared
+        pool thus runs in parallel without crowding the queue logins rely on.
+        The first calls are submitted right away, the next ones as results
+        are read. Every wait is bounded by the request deadline.
+
+        Args:
+            fn (Callable[[Any], Any]): A picklable, module-level function.
+            iterable (Iterable[Any]): The arguments.
+            window (Optional[int], optional): The calls in flight. Defaults to the process count.
+
+        Raises:
+            DeadlineExceeded: The request deadline passed while waiting.
+
+        Returns:
+            Iterator[Any]: The results, in order.
+        """
+        deadline = current_deadline.get()
+        args = iter(iterable)
+        pending: Deque[Future] = deque()
+
+        def submit_next() -> None:
+            for arg in itertools.islice(args, 1):
+                timeout = deadline.remaining() if deadline is not None else None
+                if not self._slots.acquire(timeout=timeout):
+                    raise DeadlineExceeded("Request deadline exceeded.")
+                pending.append(self._submit(fn, arg))
+
+        def results() -> Iterator[Any]:
+            try:
+                while pending:
+                    result = self._result(pending.popleft(), deadline)
+                    submit_next()
+                    yield result
+            finally:
+                for future in pending:
+                    future.cancel()
+
+        try:
+            for _ in range(window or self.processes):
+                submit_next()
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+        return results()
+
+
+hashing_pool = HashingPool(settings.HASHING_PROCESSES, settings.HASHING_QUEUE_SIZE)
+
+
+async def hash_password(password: str) -> str:
+    """Hash a password without blocking the event loop.
+
+    Args:
+        password (str): The plain password.
+
+    Returns:
+        str: The password hash.
+    """
+    return await hashing_pool.run_async(get_password_hash, password)
+
+
+async def check_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password without blocking the event loop.
+
+    Args:
+        plain_password (str): The plain password.
+        hashed_password (str): The hashed password.
+
+    Returns:
+        bool: True if the password is valid.
+    """
+    return await hashing_pool.run_async(
+        verify_password, plain_password, hashed_password
+    )
+
+
+async def hashing_busy_handler(request: Request, exc: HashingBusy) -> JSONResponse:
+    return JSONResponse(
+        {"detail": "Too many password operations in progress. Try again shortly."},
+        status_code=503,
+        headers={"Retry-After": "1"},
+    )
@@ -0,0 +1,188 @@
+"""Exponential lockout after repeated login failures, per account and per IP."""
+
+import logging
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from cachetools import TTLCache
+from redis import Redis, RedisError
+
+from app.core.config import settings
+from app.core.redis import CircuitBreaker, circuit_breaker, redis_client
+
+logger = logging.getLogger(__name__)
+
+# Lockout doubles with every failure past the threshold, up to this exponent.
+MAX_DOUBLINGS = 30
+
+
+class LoginLockout:
+    """Lock accounts and client addresses out after too many failed logins.
+
+    Failures are counted in Redis so every worker sees them. Once a counter
+    reaches its threshold, each further failure locks the key for
+    `base_seconds * 2 ** (failures - threshold)`, up to `max_seconds`.
+    Locks are remembered in memory until they expire, so a locked attempt
+    is turned away without a round trip to Redis, let alone a user query or
+    a bcrypt verify. If Redis is down, failures are counted per worker.
+
+    Args:
+        redis (Redis): The Redis client.
+        breaker (CircuitBreaker): The circuit of the Redis calls.
+        account_failures (int): The failures locking an account, 0 to disable.
+        ip_failures (int): The failures locking a client address, 0 to disable.
+        base_seconds (float): The first lockout, in seconds.
+        max_seconds (float): The longest lockout, in seconds.
+        window_seconds (int): How long failures are remembered, in seconds.
+        maxsize (int, optional): The keys kept in memory. Defaults to 100_000.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        breaker: CircuitBreaker,
+        *,
+        account_failures: int,
+        ip_failures: int,
+        base_seconds: float,
+        max_seconds: float,
+        window_seconds: int,
+        maxsize: int = 100_000,
+    ):
+        self.account_failures = account_failures
+        self.ip_failures = ip_failures
+        self.base_seconds = base_seconds
+        self.max_seconds = max_seconds
+        self.window_seconds = window_seconds
+        self._redis = redis
+        self._breaker = breaker
+        self._lock = threading.Lock()
+        # Key to the time.time() its lock ends.
+        self._locked_until: TTLCache = TTLCache(maxsize=maxsize, ttl=max_seconds or 1)
+        # Key to failures, counted here only while Redis is unreachable.
+        self._failures: TTLCache = TTLCache(maxsize=maxsize, ttl=window_seconds or 1)
+
+    def _keys(self, email: str, ip: Optional[str]) -> List[Tuple[str, int]]:
+        keys = [(f"account:{email.strip().lower()}", self.account_failures)]
+        if ip is not None:
+            keys.append((f"ip:{ip}", self.ip_failures))
+        return [(key, threshold) for key, threshold in keys if threshold > 0]
+
+    def retry_after(self, email: str, ip: Optional[str]) -> float:
+        """Get how long logins for `email` or from `ip` are locked.
+
+        Args:
+            email (str): The username of the attempt.
+            ip (Optional[str]): The client address.
+
+        Returns:
+            float: The seconds left, 0 if neither is locked.
+        """
+        keys = [key for key, _ in self._keys(email, ip)]
+        if not keys:
+            return 0.0
+        now = time.time()
+        with self._lock:
+            local = max(self._locked_until.get(key, 0.0) for key in keys) - now
+        if local > 0:
+            return local
+        try:
+            with self._breaker.guard():
+                pipeline = self._redis.pipeline(transaction=False)
+                for key in keys:
+                    pipeline.pttl(f"login-lock:{key}")
+                ttls = pipeline.execute()
+        except RedisError:
+            logger.warning("Could not read login lockouts from Redis.")
+            return 0.0
+        remaining = 0.0
+        with self._lock:
+            for key, ttl in zip(keys, ttls):
+                if ttl > 0:
+                    self._locked_until[key] = now + ttl / 1000
+                    remaining = max(remaining, ttl / 1000)
+        return remaining
+
+    def record_failure(self, email: str, ip: Optional[str]) -> float:
+        """Count a failed login, locking the keys that reached their threshold.
+
+        Args:
+            email (str): The username of the attempt.
+            ip (Optional[str]): The client address.
+
+        Returns:
+            float: The seconds the attempt locked logins for, 0 if none.
+        """
+        keys = self._keys(email, ip)
+        if not keys:
+            return 0.0
+        try:
+            with self._breaker.guard():
+                pipeline = self._redis.pipeline(transaction=False)
+                for key, _ in keys:
+                    pipeline.incr(f"login-failures:{key}")
+                    pipeline.expire(f"login-failures:{key}", self.window_seconds)
+                counts = pipeline.execute()[::2]
+        except RedisError:
+            logger.warning("Could not count login failures in Redis.")
+            with self._lock:
+                counts = []
+                for key, _ in keys:
+                    self._failures[key] = self._failures.get(key, 0) + 1
+                    counts.append(self._failures[key])
+        locked = 0.0
+        now = time.time()
+        for (key, threshold), count in zip(keys, counts):
+            if count < threshold:
+                continue
+            doublings = min(count - threshold, MAX_DOUBLINGS)
+            seconds = min(self.base_seconds * 2**doublings, self.max_seconds)
+            with self._lock:
+                self._locked_until[key] = now + seconds
+            try:
+                with self._breaker.guard():
+                    self._redis.set(
+                        f"login-lock:{key}", 1, px=max(1, int(seconds * 1000))
+                    )
+            except RedisError:
+                logger.warning("Could not store a login lockout in Redis.")
+            locked = max(locked, seconds)
+        return locked
+
+    def reset(self, email: str, ip: Optional[str] = None) -> None:
+        """Forget the failures and lockouts of `email`, and of `ip` if given.
+
+        Args:
+            email (str): The username.
+            ip (Optional[str], optional): The client address. Defaults to None.
+        """
+        keys = [key for key, _ in self._keys(email, ip)]
+        if not keys:
+            return
+        with self._lock:
+            for key in keys:
+                self._locked_until.pop(key, None)
+                self._failures.pop(key, None)
+        try:
+            with self._breaker.guard():
+                self._redis.delete(
+                    *(
+                        f"login-{kind}:{key}"
+                        for key in keys
+                        for kind in ("failures", "lock")
+                    )
+                )
+        except RedisError:
+            logger.warning("Could not reset login failures in Redis.")
+
+
+login_lockout = LoginLockout(
+    redis_client,
+    circuit_breaker("login-lockout"),
+    account_failures=settings.LOGIN_LOCKOUT_ACCOUNT_FAILURES,
+    ip_failures=settings.LOGIN_LOCKOUT_IP_FAILURES,
+    base_seconds=settings.LOGIN_LOCKOUT_SECONDS,
+    max_seconds=settings.LOGIN_LOCKOUT_MAX_SECONDS,
+    window_seconds=settings.LOGIN_FAILURE_WINDOW_SECONDS,
+)
@@ -0,0 +1,153 @@
+import logging
+import math
+from typing import Iterable, Optional
+
+from anyio import CancelScope
+from anyio.lowlevel import checkpoint
+from fastapi.responses import JSONResponse
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.deadline import Deadline, current_deadline, deadline_exceeded_response
+from app.core.rate_limit import TwoTierLimiter
+from app.db.instrumentation import QueryStats, request_stats
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStatsMiddleware:
+    """Count the SQL statements, database time and repeated statements per request.
+
+    With DEBUG on, the figures are sent as `X-DB-Statements`, `X-DB-Time-Ms`
+    and `X-DB-Repeated` response headers. Requests over any of the
+    QUERY_WARN_* thresholds are logged with their statements.
+
+    Args:
+        app (ASGIApp): The wrapped application.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = request_stats.set(stats)
+
+        async def send_with_stats(message: Message) -> None:
+            if message["type"] == "http.response.start" and settings.DEBUG:
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Statements"] = str(stats.statements)
+                headers["X-DB-Time-Ms"] = f"{stats.seconds * 1000:.1f}"
+                headers["X-DB-Repeated"] = str(stats.max_repeats)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            request_stats.reset(token)
+            if (
+                stats.statements > settings.QUERY_WARN_STATEMENTS
+                or stats.seconds > settings.QUERY_WARN_SECONDS
+                or stats.max_repeats >= settings.QUERY_WARN_REPEATS
+            ):
+                logger.warning(
+                    "%s %s ran %s",
+                    scope["method"],
+                    scope["path"],
+                    stats.describe(),
+                )
+
+
+class DeadlineMiddleware:
+    """Bound the time until a response starts to REQUEST_TIMEOUT_SECONDS.
+
+    Awaits still running at the deadline are cancelled and the client gets a
+    504. Threadpool work can not be interrupted, so database sessions apply
+    the time left as statement_timeout, and a response built too late is
+    replaced by the 504. Streamed bodies are not bounded once started.
+
+    Args:
+        app (ASGIApp): The wrapped application.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        deadline = Deadline(settings.REQUEST_TIMEOUT_SECONDS or None)
+        started = False
+
+        async def send_unbounded_body(message: Message) -> None:
+            nonlocal started
+            if message["type"] == "http.response.start":
+                if cancel_scope.cancel_called:
+                    # Built after the deadline, e.g. by a threadpool endpoint
+                    # that could not be interrupted: raise the cancellation so
+                    # the 504 below is sent instead.
+                    await checkpoint()
+                deadline.set(None)
+                started = True
+            await send(message)
+
+        token = current_deadline.set(deadline)
+        try:
+            with CancelScope() as cancel_scope:
+                deadline.bind(cancel_scope)
+                await self.app(scope, receive, send_unbounded_body)
+        finally:
+            current_deadline.reset(token)
+        # cancel_called, not cancelled_caught: the latter is anyio 4 only.
+        if cancel_scope.cancel_called and not started:
+            await deadline_exceeded_response()(scope, receive, send)
+
+
+class RateLimitMiddleware:
+    """Limit the requests of each client address with a TwoTierLimiter.
+
+    Decisions are taken in process, so a request costs no Redis round trip.
+
+    Args:
+        app (ASGIApp): The wrapped application.
+        limiter (Optional[TwoTierLimiter]): The limiter, None to let every request through.
+        exempt (Iterable[str], optional): Paths never limited, e.g. health checks. Defaults to ().
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: Optional[TwoTierLimiter],
+        exempt: Iterable[str] = (),
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.exempt = frozenset(exempt)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or self.limiter is None
+            or scope["path"] in self.exempt
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        retry_after = self.limiter.hit(client[0] if client else "unknown")
+        if retry_after:
+            response = JSONResponse(
+                {"detail": "Too many requests. Please try again later."},
+                status_code=429,
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
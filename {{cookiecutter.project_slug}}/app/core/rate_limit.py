@@ -0,0 +1,266 @@
+"""Rate limits decided in process and reconciled across workers through Redis."""
+
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from cachetools import TTLCache
+from redis import Redis, RedisError
+from redis.asyncio import Redis as AsyncRedis
+
+from app.core.config import settings
+from app.core.redis import (
+    CircuitBreaker,
+    async_redis_client,
+    circuit_breaker,
+    redis_client,
+)
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+RATE = re.compile(r"^\s*(\d+)\s*(?:/|per)\s*(second|minute|hour|day)s?\s*$")
+
+# GCRA: the key holds the theoretical arrival time (TAT) of the next request,
+# pushed `interval` further by each one allowed. A request is refused while
+# that would put the TAT more than `period` ahead of now. Redis' own clock
+# is used, so every worker sees the same time. Floats are returned as strings,
+# since Lua numbers are truncated to integers on the way out.
+GCRA_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local tat = math.max(tonumber(redis.call('GET', KEYS[1])) or now, now) + interval
+if tat - now > period then
+    return tostring(tat - period - now)
+end
+redis.call('SET', KEYS[1], tostring(tat), 'PX', math.ceil((tat - now) * 1000))
+return '0'
+"""
+
+
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """Parse a rate such as "1000/minute" or "10 per second".
+
+    Args:
+        rate (str): The rate.
+
+    Raises:
+        ValueError: The rate is not in a known format.
+
+    Returns:
+        Tuple[int, int]: The number of requests and the period, in seconds.
+    """
+    match = RATE.match(rate)
+    if match is None:
+        raise ValueError(f"Invalid rate limit: {rate!r}.")
+    return int(match.group(1)), PERIODS[match.group(2)]
+
+
+@dataclass
+class Bucket:
+    tokens: float
+    updated: float
+    # Requests allowed here and not yet added to the Redis counter.
+    pending: int = 0
+    # time.monotonic() until which the key is over its global limit.
+    blocked_until: float = 0.0
+
+
+class TwoTierLimiter:
+    """A token bucket per key, kept in process and synced to Redis in batches.
+
+    Each decision is taken locally, without a round trip. Every
+    `sync_seconds`, the requests allowed since the last sync are added to a
+    per-window counter in Redis, which returns the total across every worker
+    and node: keys over the limit are refused until the window ends, and the
+    others keep at most the budget left. The limit is thus enforced
+    approximately, overshooting by what the workers allow within one sync
+    interval. Without Redis, each worker applies the limit on its own.
+
+    Args:
+        redis (Redis): The Redis client.
+        breaker (CircuitBreaker): The circuit of the syncs.
+        rate (str): The limit per key, e.g. "1000/minute".
+        sync_seconds (float): The interval between syncs.
+        maxsize (int, optional): The keys tracked in memory. Defaults to 100_000.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        breaker: CircuitBreaker,
+        rate: str,
+        sync_seconds: float,
+        maxsize: int = 100_000,
+    ):
+        self.limit, self.period = parse_rate(rate)
+        self.sync_seconds = sync_seconds
+        self._buckets: TTLCache = TTLCache(maxsize=maxsize, ttl=2 * self.period)
+        self._lock = threading.Lock()
+        self._redis = redis
+        self._breaker = breaker
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def hit(self, key: str) -> float:
+        """Count a request for `key`, if allowed.
+
+        Args:
+            key (str): The key, e.g. the client address.
+
+        Returns:
+            float: 0 if allowed, otherwise the seconds until a request may be.
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = Bucket(tokens=self.limit, updated=now)
+            refill = (now - bucket.updated) * self.limit / self.period
+            bucket.tokens = min(self.limit, bucket.tokens + refill)
+            bucket.updated = now
+            if bucket.blocked_until > now:
+                return bucket.blocked_until - now
+            if bucket.tokens < 1:
+                return (1 - bucket.tokens) * self.period / self.limit
+            bucket.tokens -= 1
+            bucket.pending += 1
+            return 0.0
+
+    def sync(self) -> None:
+        """Add the requests allowed here to Redis and apply the global totals."""
+        with self._lock:
+            pending: Dict[str, int] = {}
+            for key, bucket in self._buckets.items():
+                if bucket.pending:
+                    pending[key] = bucket.pending
+                    bucket.pending = 0
+        if not pending:
+            return
+        window = int(time.time() // self.period)
+        try:
+            with self._breaker.guard():
+                pipeline = self._redis.pipeline(transaction=False)
+                for key, count in pending.items():
+                    pipeline.incrby(f"rate-limit:{key}:{window}", count)
+                    pipeline.expire(f"rate-limit:{key}:{window}", self.period + 1)
+                totals = pipeline.execute()[::2]
+        except RedisError:
+            logger.warning("Could not sync rate limits with Redis.")
+            return
+        window_end = time.monotonic() + (window + 1) * self.period - time.time()
+        with self._lock:
+            for key, total in zip(pending, totals):
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    continue
+                left = self.limit - total
+                if left <= 0:
+                    bucket.blocked_until = window_end
+                else:
+                    bucket.tokens = min(bucket.tokens, left)
+
+    def start(self) -> None:
+        """Sync every `sync_seconds` in a daemon thread."""
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="rate-limit-sync", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.sync()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.sync_seconds):
+            self.sync()
+
+
+class RedisRateLimiter:
+    """An exact limit per key, decided by one atomic Redis script.
+
+    Implements the generic cell rate algorithm (GCRA): a key may burst up to
+    the limit, then gets one request every `period / limit` seconds. The
+    decision is a single script call on an async client, so it is consistent
+    across every worker and does not block the event loop. If Redis is down,
+    each worker applies the same algorithm in memory.
+
+    Args:
+        redis (AsyncRedis): The async Redis client.
+        breaker (CircuitBreaker): The circuit of the Redis calls.
+        rate (str): The limit per key, e.g. "10/minute".
+        maxsize (int, optional): The keys tracked in memory without Redis. Defaults to 100_000.
+    """
+
+    def __init__(
+        self,
+        redis: AsyncRedis,
+        breaker: CircuitBreaker,
+        rate: str,
+        maxsize: int = 100_000,
+    ):
+        self.limit, self.period = parse_rate(rate)
+        self.interval = self.period / self.limit
+        self._breaker = breaker
+        self._script = redis.register_script(GCRA_SCRIPT)
+        # Key to its TAT, tracked here only while Redis is unreachable.
+        self._local: TTLCache = TTLCache(maxsize=maxsize, ttl=self.period)
+
+    async def hit(self, key: str) -> float:
+        """Count a request for `key`, if allowed.
+
+        Args:
+            key (str): The key, e.g. the route and client address.
+
+        Returns:
+            float: 0 if allowed, otherwise the seconds until a request may be.
+        """
+        try:
+            with self._breaker.guard():
+                retry_after = await self._script(
+                    keys=[f"rate-limit-gcra:{key}"], args=[self.interval, self.period]
+                )
+        except RedisError:
+            logger.warning("Could not check a rate limit in Redis.")
+            return self._hit_locally(key)
+        return float(retry_after)
+
+    def _hit_locally(self, key: str) -> float:
+        now = time.time()
+        tat = max(self._local.get(key, now), now) + self.interval
+        if tat - now > self.period:
+            return tat - self.period - now
+        self._local[key] = tat
+        return 0.0
+
+
+default_limiter = (
+    TwoTierLimiter(
+        redis_client,
+        circuit_breaker("rate-limit"),
+        settings.RATE_LIMIT_DEFAULT,
+        sync_seconds=settings.RATE_LIMIT_SYNC_SECONDS,
+    )
+    if settings.RATE_LIMIT_DEFAULT
+    else None
+)
+login_limiter = (
+    RedisRateLimiter(
+        async_redis_client,
+        circuit_breaker("login-rate-limit"),
+        settings.RATE_LIMIT_TIME,
+    )
+    if settings.RATE_LIMIT_TIME
+    else None
+)
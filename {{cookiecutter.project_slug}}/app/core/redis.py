@@ -0,0 +1,225 @@
+"""Shared Redis connection pools and per-feature circuit breakers."""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from redis import BlockingConnectionPool, Redis, RedisError
+from redis.asyncio import ConnectionPool as AsyncConnectionPool
+from redis.asyncio import Redis as AsyncRedis
+
+from app.core.config import settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpen(RedisError):
+    """Raised instead of calling Redis while a feature's circuit is open."""
+
+
+class CircuitBreaker:
+    """Stop calling Redis for a feature while it keeps failing or stalling.
+
+    Wrap each Redis call of the feature in `with breaker.guard():`. Errors,
+    and calls slower than `slow_seconds`, count as failures; after `failures`
+    in a row the circuit opens and calls raise CircuitOpen right away,
+    without touching the pool, for `reset_seconds`. Then a single trial call
+    is let through, closing the circuit if it succeeds.
+
+    CircuitOpen is a RedisError, so each feature falls back exactly as it
+    does when Redis is down: rate limits and lockouts fail open, counting in
+    memory, while revocation checks fail closed.
+
+    Args:
+        name (str): The feature name reported by the admin endpoint.
+        failures (int): The failures in a row opening the circuit, 0 to disable.
+        reset_seconds (float): How long the circuit stays open before a trial.
+        slow_seconds (float): The latency over which a call counts as failed.
+    """
+
+    def __init__(
+        self, name: str, failures: int, reset_seconds: float, slow_seconds: float
+    ):
+        self.name = name
+        self.failures = failures
+        self.reset_seconds = reset_seconds
+        self.slow_seconds = slow_seconds
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self.consecutive_failures = 0
+        self.calls = 0
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._reset_due():
+                return HALF_OPEN
+            return self._state
+
+    def _reset_due(self) -> bool:
+        return time.monotonic() - self._opened_at >= self.reset_seconds
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """Run a Redis call through the circuit.
+
+        Raises:
+            CircuitOpen: The circuit is open.
+        """
+        with self._lock:
+            if self._state == OPEN and self._reset_due():
+                # This call is the trial; the others keep failing fast.
+                self._state = HALF_OPEN
+            elif self._state != CLOSED:
+                self.rejected += 1
+                raise CircuitOpen(f"The {self.name} circuit is open.")
+            self.calls += 1
+        started = time.perf_counter()
+        try:
+            yield
+        except RedisError:
+            self._record(failed=True)
+            raise
+        except BaseException:
+            # Redis answered; the error is the caller's.
+            self._record(failed=False)
+            raise
+        self._record(failed=time.perf_counter() - started > self.slow_seconds)
+
+    def _record(self, failed: bool) -> None:
+        with self._lock:
+            if not failed:
+                self._state = CLOSED
+                self.consecutive_failures = 0
+                return
+            self.consecutive_failures += 1
+            if self._state == HALF_OPEN or (
+                self.failures and self.consecutive_failures >= self.failures
+            ):
+                if self._state != OPEN:
+                    self.opened += 1
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the circuit state and counters.
+
+        Returns:
+            Dict[str, Any]: The circuit status, compatible with schemas.CircuitStatus.
+        """
+        state = self.state
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": state,
+                "consecutive_failures": self.consecutive_failures,
+                "calls": self.calls,
+                "rejected": self.rejected,
+                "opened": self.opened,
+            }
+
+
+circuit_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def circuit_breaker(name: str) -> CircuitBreaker:
+    """Get the circuit breaker of a feature, configured from the settings.
+
+    Args:
+        name (str): The feature name reported by the admin endpoint.
+
+    Returns:
+        CircuitBreaker: The feature's circuit breaker.
+    """
+    return circuit_breakers.setdefault(
+        name,
+        CircuitBreaker(
+            name,
+            failures=settings.REDIS_BREAKER_FAILURES,
+            reset_seconds=settings.REDIS_BREAKER_RESET_SECONDS,
+            slow_seconds=settings.REDIS_BREAKER_SLOW_SECONDS,
+        ),
+    )
+
+
+def pool_snapshot(name: str, pool: Any) -> Dict[str, Any]:
+    """Get the utilization of a Redis connection pool.
+
+    Args:
+        name (str): The pool name reported by the admin endpoint.
+        pool (Any): A blocking sync pool or an async pool.
+
+    Returns:
+        Dict[str, Any]: The pool status, compatible with schemas.RedisPoolStatus.
+    """
+    if isinstance(pool, BlockingConnectionPool):
+        # Its queue holds idle connections and None for those not opened yet.
+        idle = sum(connection is not None for connection in list(pool.pool.queue))
+        in_use = len(pool._connections) - idle
+    else:
+        idle = len(pool._available_connections)
+        in_use = len(pool._in_use_connections)
+    return {
+        "name": name,
+        "max_connections": pool.max_connections,
+        "in_use": in_use,
+        "idle": idle,
+        "utilization": in_use / pool.max_connections,
+    }
+
+
+def _connection_options() -> Dict[str, Any]:
+    return {
+        "max_connections": settings.REDIS_MAX_CONNECTIONS,
+        "socket_timeout": settings.REDIS_SOCKET_TIMEOUT,
+        "socket_connect_timeout": settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+        "health_check_interval": settings.REDIS_HEALTH_CHECK_INTERVAL,
+    }
+
+
+# Threads wait up to REDIS_POOL_TIMEOUT for a connection once all are in use.
+redis_pool = BlockingConnectionPool.from_url(
+    settings.REDIS_HOST, timeout=settings.REDIS_POOL_TIMEOUT, **_connection_options()
+)
+# The event loop never waits for a connection: past the limit, calls fail fast.
+async_redis_pool = AsyncConnectionPool.from_url(
+    settings.REDIS_HOST, **_connection_options()
+)
+redis_client = Redis(connection_pool=redis_pool)
+async_redis_client = AsyncRedis(connection_pool=async_redis_pool)
+
+redis_pools = {"sync": redis_pool, "async": async_redis_pool}
+
+
+async def close_redis_pools() -> None:
+    """Close the connections, the async ones being bound to the event loop."""
+    redis_pool.disconnect()
+    await async_redis_pool.disconnect()
+
+
+async def redis_unavailable_handler(request: Request, exc: RedisError) -> JSONResponse:
+    """Answer 503 when a feature that can not fall back needs Redis.
+
+    Args:
+        request (Request): The request.
+        exc (RedisError): The Redis error, CircuitOpen included.
+
+    Returns:
+        JSONResponse: The 503 response.
+    """
+    return JSONResponse(
+        {"detail": "A backing service is unavailable. Try again shortly."},
+        status_code=503,
+        headers={
+            "Retry-After": str(max(1, math.ceil(settings.REDIS_BREAKER_RESET_SECONDS)))
+        },
+    )
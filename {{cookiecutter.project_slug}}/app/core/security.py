@@ -1,25 +1,32 @@
+import secrets
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, Dict, Optional, Tuple, Union
 
 from jose import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes made with other rounds report needs_update and are redone on login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.PASSWORD_HASH_ROUNDS
+)
 
 
 ALGORITHM = "HS256"
 
 
 def create_access_token(
-    subject: Union[str, Any], expires_delta: timedelta = None
+    subject: Union[str, Any],
+    expires_delta: timedelta = None,
+    claims: Optional[Dict[str, Any]] = None,
 ) -> str:
     """Create an access token.
 
     Args:
         subject (Union[str, Any]): The subject.
         expires_delta (timedelta, optional): The expiration time. Defaults to None.
+        claims (Optional[Dict[str, Any]], optional): Extra claims to sign. Defaults to None.
 
     Returns:
         str: The access token.
@@ -30,7 +37,12 @@ def create_access_token(
         expire = datetime.utcnow() + timedelta(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {
+        "jti": secrets.token_urlsafe(16),
+        **(claims or {}),
+        "exp": expire,
+        "sub": str(subject),
+    }
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -58,3 +70,18 @@ def get_password_hash(password: str) -> str:
         str: The password hash.
     """
     return pwd_context.hash(password)
+
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Verify the password, rehashing it when the hash settings are out of date.
+
+    Args:
+        plain_password (str): The plain password.
+        hashed_password (str): The hashed password.
+
+    Returns:
+        Tuple[bool, Optional[str]]: True if the password is valid, and the new hash to store, if any.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
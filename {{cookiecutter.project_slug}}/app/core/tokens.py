@@ -0,0 +1,286 @@
+"""Refresh token rotation and access token revocation."""
+
+import hashlib
+import logging
+import math
+import secrets
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from jose import jwt
+from redis import Redis, RedisError
+
+from app.core import security
+from app.core.cache import RedisInvalidator
+from app.core.config import settings
+from app.core.redis import CircuitBreaker, circuit_breaker, redis_client
+
+logger = logging.getLogger(__name__)
+
+REFRESH_SCOPE = "refresh"
+
+
+class BloomFilter:
+    """A set membership test without false negatives, in a fixed bit array.
+
+    Args:
+        capacity (int): The keys it is sized for.
+        error_rate (float): The false positive rate at capacity.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = max(
+            64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> Iterator[int]:
+        # Double hashing: k positions from the two halves of one digest.
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+class RevocationList(RedisInvalidator):
+    """Revoked token IDs, in Redis and mirrored into a local Bloom filter.
+
+    Redis keeps the IDs in a sorted set scored by the token expiry, so they
+    are dropped once the token could not be used anyway. Every worker mirrors
+    the set into a Bloom filter, rebuilt whenever its subscription to new
+    revocations is (re)established: most tokens are cleared by a memory
+    probe, and only filter hits are looked up in Redis.
+
+    Args:
+        redis (Redis): The Redis client.
+        breaker (CircuitBreaker): The circuit of the Redis calls.
+        capacity (int): The revoked tokens the filter is sized for; it grows on rebuild.
+        error_rate (float): The share of valid tokens looked up in Redis at capacity.
+    """
+
+    key = "revoked-tokens"
+
+    def __init__(
+        self, redis: Redis, breaker: CircuitBreaker, capacity: int, error_rate: float
+    ):
+        super().__init__([], redis, breaker, "token-revocations")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._filter = BloomFilter(capacity, error_rate)
+        self._filter_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return True
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        """Revoke a token in every worker until it expires.
+
+        Args:
+            jti (str): The token ID.
+            expires_at (float): The token expiry, as a UNIX timestamp.
+
+        Raises:
+            RedisError: The revocation could not be stored.
+        """
+        with self._breaker.guard():
+            pipeline = self._redis.pipeline()
+            pipeline.zadd(self.key, {jti: expires_at})
+            pipeline.zremrangebyscore(self.key, "-inf", time.time())
+            pipeline.execute()
+        self.invalidate([jti])
+
+    def may_be_revoked(self, jti: str) -> bool:
+        """Probe the local filter, without calling Redis.
+
+        Args:
+            jti (str): The token ID.
+
+        Returns:
+            bool: False if surely not revoked, True if is_revoked must confirm it.
+        """
+        return jti in self._filter
+
+    def is_revoked(self, jti: str) -> bool:
+        """Check a token ID, asking Redis only when the filter matches.
+
+        Args:
+            jti (str): The token ID.
+
+        Returns:
+            bool: True if revoked, or if a match can not be confirmed.
+        """
+        if not self.may_be_revoked(jti):
+            return False
+        try:
+            with self._breaker.guard():
+                expires_at = self._redis.zscore(self.key, jti)
+        except RedisError:
+            logger.warning("Could not check a revoked token in Redis.")
+            return True
+        return expires_at is not None and expires_at > time.time()
+
+    def _apply(self, keys: List[str]) -> None:
+        with self._filter_lock:
+            for jti in keys:
+                self._filter.add(jti)
+
+    def _resync(self) -> None:
+        # Held while reading Redis, so revocations stored meanwhile land in the new filter.
+        with self._filter_lock:
+            pipeline = self._redis.pipeline()
+            pipeline.zremrangebyscore(self.key, "-inf", time.time())
+            pipeline.zrange(self.key, 0, -1)
+            _, revoked = pipeline.execute()
+            bloom = BloomFilter(max(self.capacity, 2 * len(revoked)), self.error_rate)
+            for jti in revoked:
+                bloom.add(jti.decode())
+            self._filter = bloom
+
+
+class RefreshTokens:
+    """Single-use refresh tokens, rotated on every use.
+
+    Each token is stored in Redis until used or expired. Refreshing consumes
+    it and issues the next token of the same family; presenting a consumed
+    token means it was copied, so the whole family is revoked, ending the
+    session of both the legitimate client and whoever replayed it.
+
+    Tokens carry the user's token_version, so a password change, which bumps
+    it, revokes every family issued before.
+
+    Args:
+        redis (Redis): The Redis client.
+        breaker (CircuitBreaker): The circuit of the Redis calls.
+        minutes (int): The lifetime of a refresh token.
+    """
+
+    def __init__(self, redis: Redis, breaker: CircuitBreaker, minutes: int):
+        self.lifetime = timedelta(minutes=minutes)
+        self._redis = redis
+        self._breaker = breaker
+
+    def issue(
+        self, subject: Union[str, int], version: int, family: Optional[str] = None
+    ) -> Optional[str]:
+        """Create a refresh token.
+
+        Args:
+            subject (Union[str, int]): The user ID.
+            version (int): The user's token_version.
+            family (Optional[str], optional): The family of the token it replaces. Defaults to a new one.
+
+        Returns:
+            Optional[str]: The refresh token, None if it could not be stored.
+        """
+        jti = secrets.token_urlsafe(16)
+        family = family or secrets.token_urlsafe(16)
+        token = security.create_access_token(
+            subject,
+            expires_delta=self.lifetime,
+            claims={
+                "jti": jti,
+                "scope": REFRESH_SCOPE,
+                "family": family,
+                "version": version,
+            },
+        )
+        try:
+            with self._breaker.guard():
+                self._redis.set(f"refresh-token:{jti}", family, ex=self.lifetime)
+        except RedisError:
+            logger.warning("Could not store a refresh token in Redis.")
+            return None
+        return token
+
+    @staticmethod
+    def decode(token: str) -> Optional[Dict[str, Any]]:
+        """Verify a refresh token.
+
+        Args:
+            token (str): The refresh token.
+
+        Returns:
+            Optional[Dict[str, Any]]: The claims, None if invalid, expired or not a refresh token.
+        """
+        try:
+            payload = jwt.decode(
+                token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
+            )
+        except jwt.JWTError:
+            return None
+        if payload.get("scope") != REFRESH_SCOPE:
+            return None
+        return payload
+
+    def rotate(
+        self, token: str, version_of: Callable[[str], Optional[int]]
+    ) -> Optional[Tuple[str, Optional[str]]]:
+        """Consume a refresh token and issue the next one of its family.
+
+        Args:
+            token (str): The refresh token.
+            version_of (Callable[[str], Optional[int]]): Get the current token_version of a user ID, None if the user does not exist.
+
+        Returns:
+            Optional[Tuple[str, Optional[str]]]: The user ID and the next refresh token, None if invalid, reused or issued before a password change.
+        """
+        payload = self.decode(token)
+        if payload is None:
+            return None
+        version = version_of(payload["sub"])
+        if version is None or version != payload.get("version"):
+            self.revoke_family(payload["family"])
+            return None
+        with self._breaker.guard():
+            pipeline = self._redis.pipeline()
+            pipeline.getdel(f"refresh-token:{payload['jti']}")
+            pipeline.exists(f"refresh-family:{payload['family']}")
+            stored, family_revoked = pipeline.execute()
+        if stored is None or family_revoked:
+            self.revoke_family(payload["family"])
+            return None
+        return payload["sub"], self.issue(payload["sub"], version, payload["family"])
+
+    def revoke(self, token: str) -> None:
+        """Revoke a refresh token and every token rotated from the same login.
+
+        Args:
+            token (str): The refresh token.
+        """
+        payload = self.decode(token)
+        if payload is not None:
+            self.revoke_family(payload["family"])
+
+    def revoke_family(self, family: str) -> None:
+        with self._breaker.guard():
+            self._redis.set(f"refresh-family:{family}", 1, ex=self.lifetime)
+
+
+revoked_tokens = RevocationList(
+    redis_client,
+    circuit_breaker("token-revocations"),
+    capacity=settings.REVOCATION_FILTER_CAPACITY,
+    error_rate=settings.REVOCATION_FILTER_ERROR_RATE,
+)
+refresh_tokens = RefreshTokens(
+    redis_client,
+    circuit_breaker("refresh-tokens"),
+    minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES,
+)
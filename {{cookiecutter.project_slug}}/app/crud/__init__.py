@@ -1 +1 @@
-from .crud_user import user  # noqa
+from .crud_user import async_user, user  # noqa
@@ -1,9 +1,32 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
-from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from sqlalchemy import (
+    ARRAY,
+    any_,
+    bindparam,
+    delete,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.crud.pagination import page_statement
 from app.db.base_class import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
@@ -11,6 +34,35 @@ CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
+def save(db: Session) -> None:
+    """Flush inside a request unit of work, commit otherwise.
+
+    Request sessions under a SessionReleasingRoute set `info["unit_of_work"]`
+    and are committed once by the route after the endpoint returns; other
+    routes, scripts and tests commit per call.
+
+    Args:
+        db (Session): The database session.
+    """
+    if db.info.get("unit_of_work"):
+        db.flush()
+    else:
+        db.commit()
+
+
+def ids_in(model: Type[ModelType], ids: Sequence[Any]) -> Any:
+    """Build an `id = ANY(:ids)` criterion that binds all ids as a single array.
+
+    Args:
+        model (Type[ModelType]): The model.
+        ids (Sequence[Any]): The object IDs.
+
+    Returns:
+        Any: The where criterion.
+    """
+    return model.id == any_(bindparam("ids", list(ids), type_=ARRAY(model.id.type)))
+
+
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     """The CRUD object with default methods to Create, Read, Update, Delete (CRUD) objects.
 
@@ -21,6 +73,9 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         _type_: The CRUD object.
     """
 
+    #: Unique, indexed columns that keyset pagination may order by.
+    cursor_columns: Tuple[str, ...] = ("id",)
+
     def __init__(self, model: Type[ModelType]):
         """Initialize the CRUD object.
 
@@ -35,6 +90,8 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def get(self, db: Session, id: Any) -> Optional[ModelType]:
         """Get an object by ID.
 
+        Uses the identity map first, so repeated lookups in a session skip the query.
+
         Args:
             db (Session): The database session.
             id (Any): The object ID.
@@ -42,22 +99,73 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         Returns:
             Optional[ModelType]: The object.
         """
-        return db.query(self.model).filter(self.model.id == id).first()
+        return db.get(self.model, id)
 
     def get_multi(
-        self, db: Session, *, skip: int = 0, limit: int = 100
-    ) -> List[ModelType]:
-        """Get all objects.
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[str] = None,
+        order_by: str = "id",
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Any]:
+        """Get a page of objects, by offset or after a cursor.
+
+        With `fields`, only those columns are selected and read-only rows are
+        returned instead of ORM objects, skipping the identity map entirely.
 
         Args:
             db (Session): The database session.
             skip (int, optional): The number of records to skip. Defaults to 0.
             limit (int, optional): The number of records to return. Defaults to 100.
+            after (Optional[str], optional): The cursor of the previous page. Defaults to None.
+            order_by (str, optional): One of `cursor_columns`. Defaults to "id".
+            fields (Optional[Sequence[str]], optional): The columns to project. Defaults to None.
+
+        Raises:
+            InvalidCursor: The ordering is not allowed or the cursor is invalid.
 
         Returns:
-            List[ModelType]: The list of objects.
+            List[Any]: The list of objects, or of rows with `fields`.
+        """
+        stmt = page_statement(
+            self.model,
+            columns=self.cursor_columns,
+            limit=limit,
+            skip=skip,
+            after=after,
+            order_by=order_by,
+            fields=fields,
+        )
+        if fields is not None:
+            return list(db.execute(stmt).all())
+        return list(db.scalars(stmt).all())
+
+    def stream(
+        self, db: Session, *, columns: Sequence[str], batch_size: int = 1000
+    ) -> Iterator[Sequence[Row]]:
+        """Stream some columns of every object in batches, ordered by ID.
+
+        Rows come from a server-side cursor and are not tracked by the session,
+        so memory stays bounded by `batch_size` whatever the table size.
+
+        Args:
+            db (Session): The database session.
+            columns (Sequence[str]): The column names.
+            batch_size (int, optional): The number of rows per batch. Defaults to 1000.
+
+        Yields:
+            Iterator[Sequence[Row]]: The batches of rows.
         """
-        return db.query(self.model).offset(skip).limit(limit).all()
+        model = self.model
+        stmt = (
+            select(*(getattr(model, column) for column in columns))
+            .order_by(model.id)
+            .execution_options(yield_per=batch_size)
+        )
+        yield from db.execute(stmt).partitions()
 
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         """Create a new object.
@@ -69,11 +177,10 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         Returns:
             ModelType: The new object.
         """
-        obj_in_data = jsonable_encoder(obj_in)
+        obj_in_data = obj_in.model_dump(mode="json")
         db_obj = self.model(**obj_in_data)
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        save(db)
         return db_obj
 
     def update(
@@ -93,17 +200,17 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         Returns:
             ModelType: The updated object.
         """
-        obj_data = jsonable_encoder(db_obj)
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
             update_data = obj_in.model_dump(exclude_unset=True)
-        for field in obj_data:
+        # Mapped columns, not loaded attributes: objects attached with only
+        # some columns loaded (see crud_user.attach_user) update all the same.
+        for field in self.model.__mapper__.column_attrs.keys():
             if field in update_data:
                 setattr(db_obj, field, update_data[field])
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        save(db)
         return db_obj
 
     def remove(self, db: Session, *, id: int) -> ModelType:
@@ -118,5 +225,221 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         obj = db.get(self.model, id)
         db.delete(obj)
-        db.commit()
+        save(db)
+        return obj
+
+    def create_multi(
+        self, db: Session, *, objs_in: Sequence[CreateSchemaType]
+    ) -> List[ModelType]:
+        """Create many objects with batched INSERT ... RETURNING statements.
+
+        Args:
+            db (Session): The database session.
+            objs_in (Sequence[CreateSchemaType]): The objects data.
+
+        Returns:
+            List[ModelType]: The new objects, in the same order as `objs_in`.
+        """
+        if not objs_in:
+            return []
+        rows = [obj_in.model_dump(mode="json") for obj_in in objs_in]
+        stmt = insert(self.model).returning(self.model, sort_by_parameter_order=True)
+        objs = list(db.scalars(stmt, rows).all())
+        save(db)
+        return objs
+
+    def update_multi(
+        self,
+        db: Session,
+        *,
+        ids: Sequence[Any],
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+    ) -> List[Any]:
+        """Apply the same changes to many objects with a single UPDATE.
+
+        Args:
+            db (Session): The database session.
+            ids (Sequence[Any]): The object IDs.
+            obj_in (Union[UpdateSchemaType, Dict[str, Any]]): The object data.
+
+        Returns:
+            List[Any]: The IDs of the objects that exist and were updated.
+        """
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.model_dump(exclude_unset=True)
+        if not ids:
+            return []
+        if not update_data:
+            stmt = select(self.model.id).where(ids_in(self.model, ids))
+            return list(db.scalars(stmt))
+        stmt = (
+            update(self.model)
+            .where(ids_in(self.model, ids))
+            .values(**update_data)
+            .returning(self.model.id)
+        )
+        updated = list(
+            db.scalars(stmt, execution_options={"synchronize_session": "fetch"})
+        )
+        save(db)
+        return updated
+
+    def remove_multi(self, db: Session, *, ids: Sequence[Any]) -> List[Any]:
+        """Remove many objects with a single DELETE.
+
+        Args:
+            db (Session): The database session.
+            ids (Sequence[Any]): The object IDs.
+
+        Returns:
+            List[Any]: The IDs of the objects that existed and were removed.
+        """
+        if not ids:
+            return []
+        stmt = (
+            delete(self.model).where(ids_in(self.model, ids)).returning(self.model.id)
+        )
+        removed = list(
+            db.scalars(stmt, execution_options={"synchronize_session": "fetch"})
+        )
+        save(db)
+        return removed
+
+
+class AsyncCRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    """The async counterpart of CRUDBase, working on an AsyncSession.
+
+    Args:
+        Generic (_type_): The generic type.
+
+    Returns:
+        _type_: The async CRUD object.
+    """
+
+    cursor_columns: Tuple[str, ...] = ("id",)
+
+    def __init__(self, model: Type[ModelType]):
+        """Initialize the async CRUD object.
+
+        Args:
+            model (Type[ModelType]): The model.
+
+        Returns:
+            _type_: The async CRUD object.
+        """
+        self.model = model
+
+    async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        """Get an object by ID.
+
+        Args:
+            db (AsyncSession): The async database session.
+            id (Any): The object ID.
+
+        Returns:
+            Optional[ModelType]: The object.
+        """
+        return await db.get(self.model, id)
+
+    async def get_multi(
+        self,
+        db: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[str] = None,
+        order_by: str = "id",
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Any]:
+        """Get a page of objects, by offset or after a cursor.
+
+        With `fields`, only those columns are selected and read-only rows are
+        returned instead of ORM objects, skipping the identity map entirely.
+
+        Args:
+            db (AsyncSession): The async database session.
+            skip (int, optional): The number of records to skip. Defaults to 0.
+            limit (int, optional): The number of records to return. Defaults to 100.
+            after (Optional[str], optional): The cursor of the previous page. Defaults to None.
+            order_by (str, optional): One of `cursor_columns`. Defaults to "id".
+            fields (Optional[Sequence[str]], optional): The columns to project. Defaults to None.
+
+        Raises:
+            InvalidCursor: The ordering is not allowed or the cursor is invalid.
+
+        Returns:
+            List[Any]: The list of objects, or of rows with `fields`.
+        """
+        stmt = page_statement(
+            self.model,
+            columns=self.cursor_columns,
+            limit=limit,
+            skip=skip,
+            after=after,
+            order_by=order_by,
+            fields=fields,
+        )
+        if fields is not None:
+            return list((await db.execute(stmt)).all())
+        return list((await db.scalars(stmt)).all())
+
+    async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
+        """Create a new object.
+
+        Args:
+            db (AsyncSession): The async database session.
+            obj_in (CreateSchemaType): The object data.
+
+        Returns:
+            ModelType: The new object.
+        """
+        obj_in_data = obj_in.model_dump(mode="json")
+        db_obj = self.model(**obj_in_data)
+        db.add(db_obj)
+        await db.commit()
+        return db_obj
+
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: ModelType,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+    ) -> ModelType:
+        """Update an object.
+
+        Args:
+            db (AsyncSession): The async database session.
+            db_obj (ModelType): The object.
+            obj_in (Union[UpdateSchemaType, Dict[str, Any]]): The object data.
+
+        Returns:
+            ModelType: The updated object.
+        """
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.model_dump(exclude_unset=True)
+        for field in self.model.__mapper__.column_attrs.keys():
+            if field in update_data:
+                setattr(db_obj, field, update_data[field])
+        db.add(db_obj)
+        await db.commit()
+        return db_obj
+
+    async def remove(self, db: AsyncSession, *, id: int) -> ModelType:
+        """Remove an object.
+
+        Args:
+            db (AsyncSession): The async database session.
+            id (int): The object ID.
+
+        Returns:
+            ModelType: The removed object.
+        """
+        obj = await db.get(self.model, id)
+        await db.delete(obj)
+        await db.commit()
         return obj
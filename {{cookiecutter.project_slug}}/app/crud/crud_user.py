@@ -1,13 +1,70 @@
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
 
+from fastapi.concurrency import run_in_threadpool
 from pydantic import EmailStr
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect, lambda_stmt, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
 
-from app.core.security import get_password_hash, verify_password
-from app.crud.base import CRUDBase
+from app.core.cache import principal_cache, principal_invalidations, token_versions
+from app.core.hashing import hash_password, hashing_pool
+from app.core.security import get_password_hash, verify_and_update_password
+from app.crud.base import AsyncCRUDBase, CRUDBase, save
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 
+USER_COLUMNS = tuple(attr.key for attr in inspect(User).column_attrs)
+
+# Columns signed into stateless access tokens.
+TOKEN_CLAIMS = ("is_active", "is_superuser", "permission")
+# Changing any of these revokes the tokens issued so far.
+REVOKING_COLUMNS = frozenset({*TOKEN_CLAIMS, "hashed_password"})
+
+
+def invalidate_principals(db: Session, ids: Sequence[int]) -> None:
+    """Drop users from the principal cache of every worker once `db` commits.
+
+    Invalidating after the commit keeps a concurrent request from caching the
+    old row again before the write is visible.
+
+    Args:
+        db (Session): The database session.
+        ids (Sequence[int]): The user IDs.
+    """
+    db.info.setdefault("stale_principals", set()).update(ids)
+
+
+def bump_token_version(db_obj: User, update_data: Dict[str, Any]) -> None:
+    """Add a new token_version to `update_data` if it changes a revoking column.
+
+    Args:
+        db_obj (User): The user.
+        update_data (Dict[str, Any]): The new column values, modified in place.
+    """
+    if any(
+        key in update_data and update_data[key] != getattr(db_obj, key)
+        for key in REVOKING_COLUMNS
+    ):
+        update_data["token_version"] = db_obj.token_version + 1
+
+
+def attach_user(db: Session, values: Dict[str, Any]) -> User:
+    """Attach a user known to exist to `db` without a query.
+
+    Columns missing from `values` are expired and load on first access.
+
+    Args:
+        db (Session): The database session.
+        values (Dict[str, Any]): The user columns, at least `id`.
+
+    Returns:
+        User: The user, persistent in `db`.
+    """
+    user = User(**values)
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
+
 
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
     """The CRUD for User model.
@@ -19,6 +76,8 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         _type_: The CRUD for User model.
     """
 
+    cursor_columns = ("id", "email", "cpf", "phone")
+
     @staticmethod
     def get_by_email(db: Session, *, email: EmailStr) -> Optional[User]:
         """Filter by email.
@@ -30,7 +89,8 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         Returns:
             Optional[User]: The user.
         """
-        return db.query(User).filter(User.email == email).first()
+        stmt = lambda_stmt(lambda: select(User).where(User.email == email).limit(1))
+        return db.scalars(stmt).first()
 
     @staticmethod
     def get_by_cpf(db: Session, *, cpf: str) -> Optional[User]:
@@ -43,7 +103,8 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         Returns:
             Optional[User]: The user.
         """
-        return db.query(User).filter(User.cpf == cpf).first()
+        stmt = lambda_stmt(lambda: select(User).where(User.cpf == cpf).limit(1))
+        return db.scalars(stmt).first()
 
     def create(self, db: Session, *, obj_in: UserCreate) -> User:
         """Criar usuário.
@@ -62,12 +123,11 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             email=obj_in.email,
             phone=obj_in.phone,
             permission=obj_in.permission,
-            hashed_password=get_password_hash(obj_in.password),
+            hashed_password=hashing_pool.run(get_password_hash, obj_in.password),
             is_superuser=obj_in.is_superuser,
         )
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        save(db)
         return db_obj
 
     def update(
@@ -87,15 +147,204 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             update_data = obj_in
         else:
             update_data = obj_in.model_dump(exclude_unset=True)
-        if update_data["password"]:
-            hashed_password = get_password_hash(update_data["password"])
+        if update_data.get("password"):
+            hashed_password = hashing_pool.run(
+                get_password_hash, update_data["password"]
+            )
             del update_data["password"]
             update_data["hashed_password"] = hashed_password
+        bump_token_version(db_obj, update_data)
+        invalidate_principals(db, [db_obj.id])
         return super().update(db, db_obj=db_obj, obj_in=update_data)
 
+    def remove(self, db: Session, *, id: int) -> User:
+        """Remove user.
+
+        Args:
+            db (Session): The database session.
+            id (int): The user ID.
+
+        Returns:
+            User: The removed user.
+        """
+        invalidate_principals(db, [id])
+        return super().remove(db, id=id)
+
+    def create_multi(
+        self, db: Session, *, objs_in: Sequence[UserCreate]
+    ) -> List[Optional[User]]:
+        """Create many users, skipping the ones that would conflict.
+
+        Users whose email, CPF or phone repeats an earlier item or an existing
+        user are left out; everything else goes in batched INSERT statements.
+        The passwords are hashed in parallel in the hashing pool.
+
+        Args:
+            db (Session): The database session.
+            objs_in (Sequence[UserCreate]): The user creation models.
+
+        Returns:
+            List[Optional[User]]: The new users aligned with `objs_in`, None where skipped.
+        """
+        users: List[Optional[User]] = [None] * len(objs_in)
+        seen: Set[Tuple[str, str]] = set()
+        positions: Dict[str, int] = {}
+        rows = []
+        passwords = []
+        for index, obj_in in enumerate(objs_in):
+            keys = {
+                ("email", obj_in.email),
+                ("cpf", obj_in.cpf),
+                ("phone", obj_in.phone),
+            }
+            if keys & seen:
+                continue
+            seen |= keys
+            positions[obj_in.email] = index
+            rows.append(
+                {
+                    "first_name": obj_in.first_name,
+                    "last_name": obj_in.last_name,
+                    "cpf": obj_in.cpf,
+                    "email": obj_in.email,
+                    "phone": obj_in.phone,
+                    "permission": obj_in.permission,
+                    "is_superuser": obj_in.is_superuser,
+                }
+            )
+            passwords.append(obj_in.password)
+        for row, hashed_password in zip(
+            rows, hashing_pool.map(get_password_hash, passwords)
+        ):
+            row["hashed_password"] = hashed_password
+        if rows:
+            # Rows skipped by ON CONFLICT are not returned, so match them back by email.
+            stmt = insert(User).on_conflict_do_nothing().returning(User)
+            for user in db.scalars(stmt, rows):
+                users[positions[user.email]] = user
+            save(db)
+        return users
+
+    def update_multi(
+        self,
+        db: Session,
+        *,
+        ids: Sequence[int],
+        obj_in: Union[UserUpdate, Dict[str, Any]],
+    ) -> List[int]:
+        """Apply the same changes to many users.
+
+        Args:
+            db (Session): The database session.
+            ids (Sequence[int]): The user IDs.
+            obj_in (Union[UserUpdate, Dict[str, Any]]): The user update model.
+
+        Returns:
+            List[int]: The IDs of the users that exist and were updated.
+        """
+        if isinstance(obj_in, dict):
+            update_data = dict(obj_in)
+        else:
+            update_data = obj_in.model_dump(exclude_unset=True)
+        if update_data.get("password"):
+            update_data["hashed_password"] = hashing_pool.run(
+                get_password_hash, update_data["password"]
+            )
+        update_data.pop("password", None)
+        if update_data.keys() & REVOKING_COLUMNS:
+            update_data["token_version"] = User.token_version + 1
+        invalidate_principals(db, ids)
+        return super().update_multi(db, ids=ids, obj_in=update_data)
+
+    def remove_multi(self, db: Session, *, ids: Sequence[int]) -> List[int]:
+        """Remove many users with a single DELETE.
+
+        Args:
+            db (Session): The database session.
+            ids (Sequence[int]): The user IDs.
+
+        Returns:
+            List[int]: The IDs of the users that existed and were removed.
+        """
+        invalidate_principals(db, ids)
+        return super().remove_multi(db, ids=ids)
+
+    def revoke_tokens(self, db: Session, *, db_obj: User) -> User:
+        """Invalidate every stateless access token issued to the user so far.
+
+        Args:
+            db (Session): The database session.
+            db_obj (User): The user.
+
+        Returns:
+            User: The user.
+        """
+        return self.update(
+            db, db_obj=db_obj, obj_in={"token_version": db_obj.token_version + 1}
+        )
+
+    @staticmethod
+    def token_claims(user: User) -> Dict[str, Any]:
+        """Get the authorization claims of a stateless access token.
+
+        Args:
+            user (User): The user.
+
+        Returns:
+            Dict[str, Any]: The claims.
+        """
+        return {key: getattr(user, key) for key in (*TOKEN_CLAIMS, "token_version")}
+
+    def get_token_version(self, db: Session, *, id: int) -> Optional[int]:
+        """Get the current token_version of a user through an in-memory map.
+
+        Args:
+            db (Session): The database session.
+            id (int): The user ID.
+
+        Returns:
+            Optional[int]: The token version, None when the user does not exist.
+        """
+        version = token_versions.get(str(id))
+        if version is not None:
+            return version
+        generation = token_versions.generation
+        version = db.scalar(select(User.token_version).where(User.id == id))
+        if version is not None:
+            token_versions.set(str(id), version, generation)
+        return version
+
+    def get_principal(self, db: Session, *, id: int) -> Optional[User]:
+        """Get a user through the per-worker principal cache.
+
+        A hit builds the user from the cached columns and attaches it to `db`
+        without a query, so it behaves like a user loaded by `get`.
+
+        Args:
+            db (Session): The database session.
+            id (int): The user ID.
+
+        Returns:
+            Optional[User]: The user.
+        """
+        values = principal_cache.get(str(id))
+        if values is not None:
+            return attach_user(db, values)
+        generation = principal_cache.generation
+        user = self.get(db, id=id)
+        if user is not None:
+            principal_cache.set(
+                str(id),
+                {key: getattr(user, key) for key in USER_COLUMNS},
+                generation,
+            )
+        return user
+
     def authenticate(self, db: Session, *, email: str, password: str) -> Optional[User]:
         """Authenticate user.
 
+        Hashes made with other settings than PASSWORD_HASH_ROUNDS are replaced.
+
         Args:
             db (Session): The database session.
             email (str): The email.
@@ -107,10 +356,51 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         user = self.get_by_email(db, email=email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        valid, new_hash = hashing_pool.run(
+            verify_and_update_password, password, user.hashed_password
+        )
+        if not valid:
             return None
+        if new_hash:
+            self._rehash(db, user, new_hash)
         return user
 
+    async def authenticate_async(
+        self, db: Session, *, email: str, password: str
+    ) -> Optional[User]:
+        """Authenticate user from the event loop.
+
+        The queries run in the threadpool while the password check is awaited
+        in the hashing pool, so a login waiting on bcrypt holds no thread and
+        a burst past the hashing queue fails fast with HashingBusy.
+
+        Args:
+            db (Session): The database session.
+            email (str): The email.
+            password (str): The password.
+
+        Returns:
+            Optional[User]: The user.
+        """
+        user = await run_in_threadpool(self.get_by_email, db, email=email)
+        if not user:
+            return None
+        valid, new_hash = await hashing_pool.run_async(
+            verify_and_update_password, password, user.hashed_password
+        )
+        if not valid:
+            return None
+        if new_hash:
+            await run_in_threadpool(self._rehash, db, user, new_hash)
+        return user
+
+    @staticmethod
+    def _rehash(db: Session, user: User, new_hash: str) -> None:
+        # Same password, so the tokens issued so far stay valid.
+        user.hashed_password = new_hash
+        invalidate_principals(db, [user.id])
+        save(db)
+
     @staticmethod
     def is_active(user: User) -> bool:
         """Verify if the user is active.
@@ -136,4 +426,145 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         return user.is_superuser
 
 
+class AsyncCRUDUser(AsyncCRUDBase[User, UserCreate, UserUpdate]):
+    """The async CRUD for User model.
+
+    Password hashing runs in the hashing processes so bcrypt does not block the event loop.
+
+    Args:
+        AsyncCRUDBase (_type_): The base async CRUD.
+
+    Returns:
+        _type_: The async CRUD for User model.
+    """
+
+    cursor_columns = ("id", "email", "cpf", "phone")
+
+    @staticmethod
+    async def get_by_email(db: AsyncSession, *, email: EmailStr) -> Optional[User]:
+        """Filter by email.
+
+        Args:
+            db (AsyncSession): The async database session.
+            email (EmailStr): The email.
+
+        Returns:
+            Optional[User]: The user.
+        """
+        stmt = lambda_stmt(lambda: select(User).where(User.email == email).limit(1))
+        return (await db.scalars(stmt)).first()
+
+    @staticmethod
+    async def get_by_cpf(db: AsyncSession, *, cpf: str) -> Optional[User]:
+        """Filter by CPF.
+
+        Args:
+            db (AsyncSession): The async database session.
+            cpf (str): The CPF.
+
+        Returns:
+            Optional[User]: The user.
+        """
+        stmt = lambda_stmt(lambda: select(User).where(User.cpf == cpf).limit(1))
+        return (await db.scalars(stmt)).first()
+
+    async def create(self, db: AsyncSession, *, obj_in: UserCreate) -> User:
+        """Create user.
+
+        Args:
+            db (AsyncSession): The async database session.
+            obj_in (UserCreate): The user creation model.
+
+        Returns:
+            User: The user.
+        """
+        db_obj = User(
+            first_name=obj_in.first_name,
+            last_name=obj_in.last_name,
+            cpf=obj_in.cpf,
+            email=obj_in.email,
+            phone=obj_in.phone,
+            permission=obj_in.permission,
+            hashed_password=await hash_password(obj_in.password),
+            is_superuser=obj_in.is_superuser,
+        )
+        db.add(db_obj)
+        await db.commit()
+        return db_obj
+
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: User,
+        obj_in: Union[UserUpdate, Dict[str, Any]],
+    ) -> User:
+        """Update user.
+
+        Args:
+            db (AsyncSession): The async database session.
+            db_obj (User): The user.
+            obj_in (Union[UserUpdate, Dict[str, Any]]): The user update model.
+
+        Returns:
+            User: The user.
+        """
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.model_dump(exclude_unset=True)
+        if update_data.get("password"):
+            hashed_password = await hash_password(update_data["password"])
+            del update_data["password"]
+            update_data["hashed_password"] = hashed_password
+        bump_token_version(db_obj, update_data)
+        user = await super().update(db, db_obj=db_obj, obj_in=update_data)
+        await run_in_threadpool(principal_invalidations.invalidate, [user.id])
+        return user
+
+    async def remove(self, db: AsyncSession, *, id: int) -> User:
+        """Remove user.
+
+        Args:
+            db (AsyncSession): The async database session.
+            id (int): The user ID.
+
+        Returns:
+            User: The removed user.
+        """
+        user = await super().remove(db, id=id)
+        await run_in_threadpool(principal_invalidations.invalidate, [id])
+        return user
+
+    async def authenticate(
+        self, db: AsyncSession, *, email: str, password: str
+    ) -> Optional[User]:
+        """Authenticate user.
+
+        Hashes made with other settings than PASSWORD_HASH_ROUNDS are replaced.
+
+        Args:
+            db (AsyncSession): The async database session.
+            email (str): The email.
+            password (str): The password.
+
+        Returns:
+            Optional[User]: The user.
+        """
+        user = await self.get_by_email(db, email=email)
+        if not user:
+            return None
+        valid, new_hash = await hashing_pool.run_async(
+            verify_and_update_password, password, user.hashed_password
+        )
+        if not valid:
+            return None
+        if new_hash:
+            user.hashed_password = new_hash
+            await db.commit()
+            await run_in_threadpool(principal_invalidations.invalidate, [user.id])
+        return user
+
+
 user = CRUDUser(User)
+async_user = AsyncCRUDUser(User)
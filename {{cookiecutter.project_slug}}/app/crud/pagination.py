@@ -0,0 +1,122 @@
+"""Opaque cursors and statements for keyset pagination."""
+
+import base64
+import json
+from typing import Any, List, Optional, Sequence, Type
+
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.sql.lambdas import StatementLambdaElement
+
+from app.db.base_class import Base
+
+
+class InvalidCursor(ValueError):
+    """The cursor or the ordering can not be used to paginate."""
+
+
+def encode_cursor(order_by: str, value: Any) -> str:
+    """Encode the last seen value of the ordering column.
+
+    Args:
+        order_by (str): The ordering column name.
+        value (Any): The column value of the last item on the page.
+
+    Returns:
+        str: The opaque cursor.
+    """
+    payload = json.dumps({"o": order_by, "v": value}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, order_by: str, python_type: type) -> Any:
+    """Decode a cursor built by encode_cursor for the same ordering.
+
+    Args:
+        cursor (str): The opaque cursor.
+        order_by (str): The ordering column name.
+        python_type (type): The expected type of the column value.
+
+    Raises:
+        InvalidCursor: The cursor is malformed or was built for another ordering.
+
+    Returns:
+        Any: The last seen value of the ordering column.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        valid = payload["o"] == order_by and isinstance(payload["v"], python_type)
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor.") from e
+    if not valid:
+        raise InvalidCursor("Invalid cursor.")
+    return payload["v"]
+
+
+def next_cursor(objs: List[Base], *, limit: int, order_by: str = "id") -> Optional[str]:
+    """Get the cursor of the page following `objs`.
+
+    Args:
+        objs (List[Base]): The current page.
+        limit (int): The page size the page was requested with.
+        order_by (str, optional): The ordering column name. Defaults to "id".
+
+    Returns:
+        Optional[str]: The cursor, or None when this is the last page.
+    """
+    if not objs or len(objs) < limit:
+        return None
+    return encode_cursor(order_by, getattr(objs[-1], order_by))
+
+
+def page_statement(
+    model: Type[Base],
+    *,
+    columns: Sequence[str],
+    limit: int,
+    skip: int = 0,
+    after: Optional[str] = None,
+    order_by: str = "id",
+    fields: Optional[Sequence[str]] = None,
+) -> StatementLambdaElement:
+    """Build the SELECT for one page, by offset or after a cursor.
+
+    Keyset pages seek past the cursor through the column index, so their cost
+    does not grow with the page depth and rows inserted meanwhile do not shift them.
+
+    The statement is a cached lambda: the limit, the offset and the cursor
+    value are bound parameters, so every page of the same ordering and
+    projection reuses one compiled statement.
+
+    Args:
+        model (Type[Base]): The model.
+        columns (Sequence[str]): The unique, indexed columns allowed for ordering.
+        limit (int): The number of records to return.
+        skip (int, optional): The number of records to skip, ignored with a cursor. Defaults to 0.
+        after (Optional[str], optional): The cursor of the previous page. Defaults to None.
+        order_by (str, optional): The ordering column name. Defaults to "id".
+        fields (Optional[Sequence[str]], optional): Select only these columns, plus `order_by`, as rows. Defaults to None.
+
+    Raises:
+        InvalidCursor: `order_by` is not allowed or `after` is not a cursor for it.
+
+    Returns:
+        StatementLambdaElement: The page statement.
+    """
+    if order_by not in columns:
+        raise InvalidCursor(f"Can not order by {order_by}.")
+    column = getattr(model, order_by)
+    if fields is None:
+        stmt = lambda_stmt(lambda: select(model))
+    else:
+        # The ordering column is needed to build the next cursor from the last row.
+        names = list(fields) if order_by in fields else [*fields, order_by]
+        selected = tuple(getattr(model, name) for name in names)
+        stmt = lambda_stmt(lambda: select(*selected))
+    stmt += lambda s: s.order_by(column).limit(limit)
+    if after is not None:
+        value = decode_cursor(after, order_by, column.type.python_type)
+        stmt += lambda s: s.where(column > value)
+        return stmt
+    stmt += lambda s: s.offset(skip)
+    return stmt
@@ -14,6 +14,9 @@ class Base:
 
     id: Any
     __name__: str
+    # Fetch server-generated values with RETURNING at flush time instead of
+    # expiring them, so flushed objects can be serialized without a reload.
+    __mapper_args__ = {"eager_defaults": True}
 
     @declared_attr
     def __tablename__(cls) -> str:
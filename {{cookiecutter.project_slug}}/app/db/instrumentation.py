@@ -0,0 +1,97 @@
+"""Per-request SQL statement counts, timings and repeated statements."""
+
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@dataclass
+class QueryStats:
+    """Statements seen during a request, keyed by their normalized SQL.
+
+    Statements are compiled with bound parameters, so the SQL text works as a
+    fingerprint: the same lookup issued in a loop (N+1) shows up repeated.
+    """
+
+    statements: int = 0
+    seconds: float = 0.0
+    fingerprints: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.statements += 1
+        self.seconds += seconds
+        self.fingerprints[" ".join(statement.split())] += 1
+
+    @property
+    def max_repeats(self) -> int:
+        """The number of times the most repeated statement ran."""
+        most_common = self.fingerprints.most_common(1)
+        return most_common[0][1] if most_common else 0
+
+    def repeated(self) -> List[Tuple[str, int]]:
+        """Get the statements that ran more than once, most repeated first.
+
+        Returns:
+            List[Tuple[str, int]]: The statements and their counts.
+        """
+        return [(sql, n) for sql, n in self.fingerprints.most_common() if n > 1]
+
+    def describe(self) -> str:
+        lines = [f"{self.statements} statements in {self.seconds * 1000:.1f} ms"]
+        lines += [f"  x{n} {sql}" for sql, n in self.fingerprints.most_common()]
+        return "\n".join(lines)
+
+
+request_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "request_stats", default=None
+)
+
+_trackers: List[QueryStats] = []
+_trackers_lock = threading.Lock()
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Record every statement, from any thread or request, while active.
+
+    Yields:
+        Iterator[QueryStats]: The stats, filled as statements run.
+    """
+    stats = QueryStats()
+    with _trackers_lock:
+        _trackers.append(stats)
+    try:
+        yield stats
+    finally:
+        with _trackers_lock:
+            _trackers.remove(stats)
+
+
+def instrument(engine: Engine) -> None:
+    """Time every statement of `engine` into the current request's QueryStats.
+
+    Args:
+        engine (Engine): The engine, or the `sync_engine` of an async engine.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn: Any, cursor: Any, *args: Any) -> None:
+        conn.info["query_started"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(
+        conn: Any, cursor: Any, statement: str, *args: Any
+    ) -> None:
+        seconds = time.perf_counter() - conn.info.pop("query_started")
+        stats = request_stats.get()
+        if stats is not None:
+            stats.record(statement, seconds)
+        for tracker in _trackers:
+            tracker.record(statement, seconds)
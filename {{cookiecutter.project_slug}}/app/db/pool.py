@@ -0,0 +1,129 @@
+"""Connection pool configuration and instrumentation."""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional, Type
+
+from sqlalchemy import exc
+from sqlalchemy.pool import PoolProxiedConnection, QueuePool
+
+from app.core.config import settings
+
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class PoolMetrics:
+    """Checkout counters and a cumulative wait time histogram for one pool.
+
+    Args:
+        name (str): The pool name reported by the admin endpoint.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool: Optional[QueuePool] = None
+        self._lock = threading.Lock()
+        self._buckets = [0] * (len(WAIT_BUCKETS) + 1)
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.wait_seconds_sum = 0.0
+
+    def observe_checkout(self, seconds: float) -> None:
+        """Record a successful checkout.
+
+        Args:
+            seconds (float): How long the caller waited for the connection.
+        """
+        index = next(
+            (i for i, bound in enumerate(WAIT_BUCKETS) if seconds <= bound),
+            len(WAIT_BUCKETS),
+        )
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_sum += seconds
+            self._buckets[index] += 1
+
+    def observe_timeout(self) -> None:
+        """Record a checkout that gave up after the pool timeout."""
+        with self._lock:
+            self.checkout_timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the current pool status and counters.
+
+        Returns:
+            Dict[str, Any]: The pool status, compatible with schemas.PoolStatus.
+        """
+        pool = self.pool
+        with self._lock:
+            buckets = list(self._buckets)
+            data = {
+                "name": self.name,
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "wait_seconds_sum": self.wait_seconds_sum,
+            }
+        cumulative = 0
+        histogram: List[Dict[str, Any]] = []
+        for bound, count in zip(WAIT_BUCKETS + (None,), buckets):
+            cumulative += count
+            histogram.append({"le": bound, "count": cumulative})
+        data.update(
+            size=pool.size() if pool else 0,
+            checked_in=pool.checkedin() if pool else 0,
+            checked_out=pool.checkedout() if pool else 0,
+            overflow=max(pool.overflow(), 0) if pool else 0,
+            max_overflow=pool._max_overflow if pool else 0,
+            wait_histogram=histogram,
+        )
+        return data
+
+
+class InstrumentedPoolMixin:
+    """Pool mixin that times every checkout into the class-level PoolMetrics."""
+
+    metrics: PoolMetrics
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        # Pool.recreate() builds a new instance of the same class, which re-registers here.
+        self.metrics.pool = self
+
+    def connect(self) -> PoolProxiedConnection:
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.observe_timeout()
+            raise
+        self.metrics.observe_checkout(time.perf_counter() - start)
+        return connection
+
+
+pool_metrics: Dict[str, PoolMetrics] = {}
+
+
+def pool_options(name: str, poolclass: Type[QueuePool] = QueuePool) -> Dict[str, Any]:
+    """Build the engine keyword arguments for an instrumented, configured pool.
+
+    Args:
+        name (str): The pool name reported by the admin endpoint.
+        poolclass (Type[QueuePool], optional): The pool class to instrument. Defaults to QueuePool.
+
+    Returns:
+        Dict[str, Any]: Keyword arguments for create_engine/create_async_engine.
+    """
+    metrics = pool_metrics.setdefault(name, PoolMetrics(name))
+    instrumented = type(
+        f"Instrumented{poolclass.__name__}",
+        (InstrumentedPoolMixin, poolclass),
+        {"metrics": metrics},
+    )
+    return {
+        "poolclass": instrumented,
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+        "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
+    }
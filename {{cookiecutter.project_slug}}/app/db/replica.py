@@ -0,0 +1,139 @@
+"""Read replica routing: round-robin with ejection and read-your-writes."""
+
+import itertools
+import logging
+import threading
+import time
+from typing import Dict, Optional, Sequence
+
+from cachetools import TTLCache
+from redis import Redis, RedisError
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, ExceptionContext
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.redis import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaSet:
+    """Round-robin over replica engines, skipping the ones recently ejected.
+
+    A replica is ejected for `eject_seconds` when it fails to connect or drops
+    a connection. When every replica is ejected, callers fall back to the primary.
+
+    Args:
+        engines (Sequence[Engine]): The replica engines.
+        eject_seconds (float): How long an unhealthy replica is skipped.
+    """
+
+    def __init__(self, engines: Sequence[Engine], eject_seconds: float):
+        self.engines = list(engines)
+        self.eject_seconds = eject_seconds
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._ejected_until: Dict[Engine, float] = {}
+        for engine in self.engines:
+            event.listen(engine, "handle_error", self._on_error)
+
+    def choose(self) -> Optional[Engine]:
+        """Get the next healthy replica.
+
+        Returns:
+            Optional[Engine]: The replica engine, or None when none is healthy.
+        """
+        now = time.monotonic()
+        for _ in range(len(self.engines)):
+            engine = self.engines[next(self._counter) % len(self.engines)]
+            if self._ejected_until.get(engine, 0.0) <= now:
+                return engine
+        return None
+
+    def eject(self, engine: Engine) -> None:
+        """Skip a replica for the next `eject_seconds`.
+
+        Args:
+            engine (Engine): The unhealthy replica engine.
+        """
+        with self._lock:
+            self._ejected_until[engine] = time.monotonic() + self.eject_seconds
+
+    def is_ejected(self, engine: Engine) -> bool:
+        return self._ejected_until.get(engine, 0.0) > time.monotonic()
+
+    def _on_error(self, context: ExceptionContext) -> None:
+        # Query errors (timeouts, constraint violations) say nothing about the
+        # replica's health; only connect failures and dropped connections do.
+        if context.is_disconnect or context.connection is None:
+            self.eject(context.engine)
+
+
+class ReadYourWrites:
+    """Remember who wrote recently so their reads can stay on the primary.
+
+    Writers are marked in Redis, so the read that follows a write stays on
+    the primary whichever worker serves it. Marks are also kept in memory:
+    a writer read back by the same worker skips the round trip, and if Redis
+    is down each worker still routes the writers it served.
+
+    Args:
+        redis (Redis): The Redis client.
+        breaker (CircuitBreaker): The circuit of the Redis calls.
+        window (float): How long after a write the subject reads from the primary.
+        maxsize (int, optional): The subjects kept in memory. Defaults to 100000.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        breaker: CircuitBreaker,
+        window: float,
+        maxsize: int = 100_000,
+    ):
+        self.window = window
+        self._redis = redis
+        self._breaker = breaker
+        self._recent: TTLCache = TTLCache(maxsize=maxsize, ttl=window)
+        self._lock = threading.Lock()
+
+    def mark(self, subject: Optional[str]) -> None:
+        if subject is None:
+            return
+        with self._lock:
+            self._recent[subject] = True
+        try:
+            with self._breaker.guard():
+                self._redis.set(
+                    f"recent-writer:{subject}", 1, px=max(1, int(self.window * 1000))
+                )
+        except RedisError:
+            logger.warning("Could not mark a recent writer in Redis.")
+
+    def is_recent(self, subject: Optional[str]) -> bool:
+        if subject is None:
+            return False
+        with self._lock:
+            if subject in self._recent:
+                return True
+        try:
+            with self._breaker.guard():
+                return bool(self._redis.exists(f"recent-writer:{subject}"))
+        except RedisError:
+            # Reads may briefly lag the writes served by other workers.
+            logger.warning("Could not read recent writers from Redis.")
+            return False
+
+    def track(self, factory: sessionmaker) -> None:
+        """Mark `session.info["subject"]` whenever a session from `factory` commits writes.
+
+        Relies on `session.info["has_writes"]`, see app.db.session.track_writes.
+
+        Args:
+            factory (sessionmaker): The primary session factory.
+        """
+
+        @event.listens_for(factory, "after_commit")
+        def _after_commit(session: Session) -> None:
+            if session.info.pop("has_writes", False):
+                self.mark(session.info.get("subject"))
@@ -1,7 +1,176 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from typing import Any, Dict, Optional
 
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import ORMExecuteState, Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.cache import principal_invalidations
 from app.core.config import settings
+from app.core.deadline import statement_timeout_ms
+from app.core.redis import circuit_breaker, redis_client
+from app.db.instrumentation import instrument
+from app.db.pool import pool_options
+from app.db.replica import ReadYourWrites, ReplicaSet
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI), pool_pre_ping=True)
+engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI), **pool_options("primary"))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+replicas = ReplicaSet(
+    [
+        create_engine(str(uri), **pool_options(f"replica-{index}"))
+        for index, uri in enumerate(settings.SQLALCHEMY_REPLICA_URIS)
+    ],
+    eject_seconds=settings.REPLICA_EJECT_SECONDS,
+)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+
+def track_writes(factory: sessionmaker) -> None:
+    """Keep `session.info["has_writes"]` set while a transaction holds writes.
+
+    Flushes and bulk INSERT/UPDATE/DELETE statements both set it; a rollback
+    clears it. The commit side is handled by ReadYourWrites.track.
+
+    Args:
+        factory (sessionmaker): The primary session factory.
+    """
+
+    @event.listens_for(factory, "after_flush")
+    def _after_flush(session: Session, flush_context) -> None:
+        session.info["has_writes"] = True
+
+    @event.listens_for(factory, "do_orm_execute")
+    def _do_orm_execute(state: ORMExecuteState) -> None:
+        if state.is_insert or state.is_update or state.is_delete:
+            state.session.info["has_writes"] = True
+
+    @event.listens_for(factory, "after_rollback")
+    def _after_rollback(session: Session) -> None:
+        session.info.pop("has_writes", None)
+
+
+def apply_deadline(factory: sessionmaker) -> None:
+    """Bound each transaction opened during a request by the request's time left.
+
+    Issues `SET LOCAL statement_timeout` on Postgres, so a slow statement is
+    cancelled by the server and the pooled connection comes back.
+
+    Args:
+        factory (sessionmaker): The session factory.
+    """
+
+    @event.listens_for(factory, "after_begin")
+    def _after_begin(session: Session, transaction, connection) -> None:
+        timeout = statement_timeout_ms()
+        if timeout is not None and connection.dialect.name == "postgresql":
+            connection.exec_driver_sql(f"SET LOCAL statement_timeout = {timeout}")
+
+
+def track_stale_principals(factory: sessionmaker) -> None:
+    """Invalidate the cached users a session wrote to, once it commits.
+
+    Filled by app.crud.crud_user.invalidate_principals; a rollback drops them.
+
+    Args:
+        factory (sessionmaker): The primary session factory.
+    """
+
+    @event.listens_for(factory, "after_commit")
+    def _after_commit(session: Session) -> None:
+        stale = session.info.pop("stale_principals", None)
+        if stale:
+            principal_invalidations.invalidate(stale)
+
+    @event.listens_for(factory, "after_rollback")
+    def _after_rollback(session: Session) -> None:
+        session.info.pop("stale_principals", None)
+
+
+track_writes(SessionLocal)
+track_stale_principals(SessionLocal)
+apply_deadline(SessionLocal)
+apply_deadline(ReadSessionLocal)
+recent_writers = ReadYourWrites(
+    redis_client,
+    circuit_breaker("read-your-writes"),
+    window=settings.READ_YOUR_WRITES_SECONDS,
+)
+recent_writers.track(SessionLocal)
+
+for instrumented in (engine, *replicas.engines):
+    instrument(instrumented)
+
+# Only with ASYNC_DATABASE, so asyncpg is neither imported nor pooled otherwise.
+async_engine: Optional[AsyncEngine] = None
+AsyncSessionLocal: Optional[async_sessionmaker] = None
+if settings.ASYNC_DATABASE:
+    async_engine = create_async_engine(
+        str(settings.SQLALCHEMY_ASYNC_DATABASE_URI),
+        **pool_options("primary-async", AsyncAdaptedQueuePool),
+    )
+    instrument(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
+
+class LazySession:
+    """Session proxy that only creates its Session on first real use.
+
+    Requests rejected before touching the database never build a Session, and
+    `close()` can be called as soon as the endpoint is done to hand the
+    connection back to the pool before the response is sent.
+
+    Args:
+        factory (sessionmaker): The session factory.
+        **kwargs (Any): Extra arguments for the factory, e.g. `bind`.
+    """
+
+    def __init__(self, factory: sessionmaker, **kwargs: Any):
+        self._factory = factory
+        self._kwargs = kwargs
+        self._info: Dict[str, Any] = {}
+        self._session: Optional[Session] = None
+
+    @property
+    def started(self) -> bool:
+        return self._session is not None
+
+    @property
+    def session(self) -> Session:
+        if self._session is None:
+            self._session = self._factory(**self._kwargs)
+            self._session.info.update(self._info)
+        return self._session
+
+    @property
+    def info(self) -> Dict[str, Any]:
+        return self._session.info if self._session is not None else self._info
+
+    @property
+    def has_writes(self) -> bool:
+        """Whether the session holds changes or flushed writes not yet committed."""
+        session = self._session
+        if session is None:
+            return False
+        return bool(
+            session.new
+            or session.dirty
+            or session.deleted
+            or session.info.get("has_writes")
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.session, name)
+
+    def __contains__(self, instance: object) -> bool:
+        return self._session is not None and instance in self._session
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
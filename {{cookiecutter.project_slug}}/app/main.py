@@ -1,27 +1,40 @@
 from fastapi import FastAPI
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
-from slowapi.util import get_remote_address
+from fastapi.responses import ORJSONResponse
 from starlette.middleware.cors import CORSMiddleware
-from slowapi.middleware import SlowAPIMiddleware
+from redis import RedisError
+from sqlalchemy.exc import DBAPIError
 from app.api.api_v1.api import api_router
+from app.core.cache import principal_invalidations
 from app.core.config import settings
-from app import schemas
-
-limiter = Limiter(
-    key_func=get_remote_address,
-    storage_uri=settings.REDIS_HOST,
+from app.core.hashing import HashingBusy, hashing_busy_handler, hashing_pool
+from app.core.deadline import (
+    DeadlineExceeded,
+    database_error_handler,
+    deadline_exceeded_handler,
 )
-
+from app.core.middleware import (
+    DeadlineMiddleware,
+    QueryStatsMiddleware,
+    RateLimitMiddleware,
+)
+from app.core.rate_limit import default_limiter
+from app.core.redis import close_redis_pools, redis_unavailable_handler
+from app.core.tokens import revoked_tokens
+from app import schemas
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    default_response_class=ORJSONResponse,
 )
 
-app.state.limiter = limiter
+app.add_exception_handler(DeadlineExceeded, deadline_exceeded_handler)
+app.add_exception_handler(DBAPIError, database_error_handler)
+app.add_exception_handler(HashingBusy, hashing_busy_handler)
+# Refresh tokens and logouts fail closed while Redis is unreachable.
+app.add_exception_handler(RedisError, redis_unavailable_handler)
 
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+app.add_middleware(DeadlineMiddleware)
 
 # Definir todas as origens habilitadas para CORS
 
@@ -32,7 +45,49 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-app.add_middleware(SlowAPIMiddleware)
+app.add_middleware(
+    RateLimitMiddleware, limiter=default_limiter, exempt={"/actuator/health"}
+)
+app.add_middleware(QueryStatsMiddleware)
+
+
+@app.on_event("startup")
+def start_cache_invalidations() -> None:
+    principal_invalidations.start()
+    revoked_tokens.start()
+
+
+@app.on_event("startup")
+def start_rate_limit_sync() -> None:
+    if default_limiter is not None:
+        default_limiter.start()
+
+
+@app.on_event("startup")
+def start_hashing_pool() -> None:
+    hashing_pool.start()
+
+
+@app.on_event("shutdown")
+def stop_cache_invalidations() -> None:
+    principal_invalidations.stop()
+    revoked_tokens.stop()
+
+
+@app.on_event("shutdown")
+def stop_rate_limit_sync() -> None:
+    if default_limiter is not None:
+        default_limiter.stop()
+
+
+@app.on_event("shutdown")
+async def close_redis() -> None:
+    await close_redis_pools()
+
+
+@app.on_event("shutdown")
+def stop_hashing_pool() -> None:
+    hashing_pool.stop()
 
 
 @app.get("/actuator/health", response_model=schemas.Msg)
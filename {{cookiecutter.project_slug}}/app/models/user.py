@@ -22,6 +22,8 @@ class User(Base):
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean(), default=True)
     is_superuser = Column(Boolean(), default=False)
+    # Bumped to revoke the access tokens issued so far, see CRUDUser.revoke_tokens.
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     @property
     def full_name(self) -> str:
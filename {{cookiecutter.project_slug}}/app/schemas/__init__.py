@@ -1,5 +1,23 @@
 # flake8: noqa
 
+from .bulk import (
+    BulkDelete,
+    BulkItemError,
+    BulkResult,
+    ImportLineError,
+    ImportResult,
+    UserBulkCreate,
+    UserBulkUpdate,
+    UserBulkValues,
+)
+from .metrics import (
+    CacheStatus,
+    CircuitStatus,
+    HistogramBucket,
+    PoolStatus,
+    RedisPoolStatus,
+)
 from .msg import Msg
+from .serializers import SchemaSerializer, user_serializer
 from .token import Token, TokenPayload
 from .user import User, UserCreate, UserUpdate
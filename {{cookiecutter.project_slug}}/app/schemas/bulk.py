@@ -0,0 +1,52 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from app.core.enums import UserPermissionEnum
+from app.schemas.user import UserCreate
+
+MAX_BULK_ITEMS = 10_000
+# Each password costs a bcrypt hash; larger batches go through the import.
+MAX_BULK_PASSWORDS = 100
+
+
+class BulkItemError(BaseModel):
+    index: int
+    detail: str
+
+
+class BulkResult(BaseModel):
+    ids: List[int] = []
+    errors: List[BulkItemError] = []
+
+
+class UserBulkCreate(BaseModel):
+    items: List[UserCreate] = Field(..., min_length=1, max_length=MAX_BULK_PASSWORDS)
+
+
+class UserBulkValues(BaseModel):
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    permission: Optional[UserPermissionEnum] = None
+    is_active: Optional[bool] = None
+    is_superuser: Optional[bool] = None
+
+
+class UserBulkUpdate(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
+    values: UserBulkValues
+
+
+class BulkDelete(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
+
+
+class ImportLineError(BaseModel):
+    line: int
+    detail: str
+
+
+class ImportResult(BaseModel):
+    inserted: int = 0
+    failed: int = 0
+    errors: List[ImportLineError] = []
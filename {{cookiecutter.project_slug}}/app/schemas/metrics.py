@@ -0,0 +1,48 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class HistogramBucket(BaseModel):
+    le: Optional[float] = None
+    count: int
+
+
+class PoolStatus(BaseModel):
+    name: str
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    max_overflow: int
+    checkouts: int
+    checkout_timeouts: int
+    wait_seconds_sum: float
+    wait_histogram: List[HistogramBucket]
+
+
+class CacheStatus(BaseModel):
+    name: str
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    invalidations: int
+    hit_rate: float
+
+
+class RedisPoolStatus(BaseModel):
+    name: str
+    max_connections: int
+    in_use: int
+    idle: int
+    utilization: float
+
+
+class CircuitStatus(BaseModel):
+    name: str
+    state: str
+    consecutive_failures: int
+    calls: int
+    rejected: int
+    opened: int
@@ -0,0 +1,91 @@
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Type
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy.engine import Row
+from typing_extensions import TypedDict
+
+from .user import User
+
+
+class SchemaSerializer:
+    """Serialize ORM objects or rows to JSON in the shape of a response schema.
+
+    The schema fields become a TypedDict whose TypeAdapters are compiled once,
+    at import. Values are read straight from the object attributes or the row
+    columns and written to JSON bytes by pydantic-core in one pass, without
+    validating them into schema instances first: they come from the database,
+    which already enforces the schema's types.
+
+    Args:
+        schema (Type[BaseModel]): The response schema.
+    """
+
+    def __init__(self, schema: Type[BaseModel]):
+        self.fields = tuple(schema.model_fields)
+        row = TypedDict(
+            f"{schema.__name__}Row",
+            {name: field.annotation for name, field in schema.model_fields.items()},
+        )
+        self._one = TypeAdapter(row)
+        self._many = TypeAdapter(List[row])
+
+    def _values(self, obj: Any) -> Mapping[str, Any]:
+        if isinstance(obj, Row):
+            return obj._asdict()
+        return {field: getattr(obj, field) for field in self.fields}
+
+    def dump_json(self, obj: Any) -> bytes:
+        """Serialize one object or row.
+
+        Args:
+            obj (Any): The ORM object or row.
+
+        Returns:
+            bytes: The JSON document.
+        """
+        return self._one.dump_json(self._values(obj))
+
+    def dump_json_many(self, objs: Iterable[Any]) -> bytes:
+        """Serialize a list of objects or rows.
+
+        Args:
+            objs (Iterable[Any]): The ORM objects or rows.
+
+        Returns:
+            bytes: The JSON array.
+        """
+        return self._many.dump_json([self._values(obj) for obj in objs])
+
+    def response(self, obj: Any, headers: Optional[Dict[str, str]] = None) -> Response:
+        """Respond with one object, skipping the route's response_model.
+
+        Args:
+            obj (Any): The ORM object or row.
+            headers (Optional[Dict[str, str]], optional): The response headers. Defaults to None.
+
+        Returns:
+            Response: The JSON response.
+        """
+        return Response(
+            self.dump_json(obj), media_type="application/json", headers=headers
+        )
+
+    def response_many(
+        self, objs: Iterable[Any], headers: Optional[Dict[str, str]] = None
+    ) -> Response:
+        """Respond with a list of objects, skipping the route's response_model.
+
+        Args:
+            objs (Iterable[Any]): The ORM objects or rows.
+            headers (Optional[Dict[str, str]], optional): The response headers. Defaults to None.
+
+        Returns:
+            Response: The JSON response.
+        """
+        return Response(
+            self.dump_json_many(objs), media_type="application/json", headers=headers
+        )
+
+
+user_serializer = SchemaSerializer(User)
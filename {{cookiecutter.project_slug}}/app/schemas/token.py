@@ -6,7 +6,17 @@ from pydantic import BaseModel
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
 
 
 class TokenPayload(BaseModel):
     sub: Optional[int] = None
+    jti: Optional[str] = None
+    exp: Optional[int] = None
+    # "refresh" in refresh tokens, which are not accepted as access tokens.
+    scope: Optional[str] = None
+    # Only in tokens issued with STATELESS_AUTH.
+    is_active: Optional[bool] = None
+    is_superuser: Optional[bool] = None
+    permission: Optional[str] = None
+    token_version: Optional[int] = None
@@ -1,11 +1,13 @@
 from typing import Optional
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 
 from app.core.enums import UserPermissionEnum
 
 
 class User(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     first_name: Optional[str] = None
     last_name: Optional[str] = None
     email: Optional[EmailStr] = None
@@ -0,0 +1,64 @@
+from typing import Dict
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+
+
+class TestAdminPools:
+    def test_read_pools_superuser(
+        self, client: TestClient, superuser_token_headers: Dict[str, str]
+    ) -> None:
+        r = client.get(
+            f"{settings.API_V1_STR}/admin/pools", headers=superuser_token_headers
+        )
+        assert r.status_code == 200
+        pools = {pool["name"]: pool for pool in r.json()}
+        assert pools["primary"]["size"] == settings.DATABASE_POOL_SIZE
+        assert pools["primary"]["checkouts"] > 0
+        assert pools["primary"]["wait_histogram"][-1]["le"] is None
+
+    def test_read_pools_normal_user(
+        self, client: TestClient, normal_user_token_headers: Dict[str, str]
+    ) -> None:
+        r = client.get(
+            f"{settings.API_V1_STR}/admin/pools", headers=normal_user_token_headers
+        )
+        assert r.status_code == 400
+
+
+class TestAdminCaches:
+    def test_read_caches_superuser(
+        self, client: TestClient, superuser_token_headers: Dict[str, str]
+    ) -> None:
+        r = client.get(
+            f"{settings.API_V1_STR}/admin/caches", headers=superuser_token_headers
+        )
+        assert r.status_code == 200
+        caches = {cache["name"]: cache for cache in r.json()}
+        assert caches["principal"]["hits"] + caches["principal"]["misses"] > 0
+        assert 0 <= caches["principal"]["hit_rate"] <= 1
+
+
+class TestAdminRedis:
+    def test_read_redis_pools_superuser(
+        self, client: TestClient, superuser_token_headers: Dict[str, str]
+    ) -> None:
+        r = client.get(
+            f"{settings.API_V1_STR}/admin/redis", headers=superuser_token_headers
+        )
+        assert r.status_code == 200
+        pools = {pool["name"]: pool for pool in r.json()}
+        assert pools["sync"]["max_connections"] == settings.REDIS_MAX_CONNECTIONS
+        assert 0 <= pools["async"]["utilization"] <= 1
+
+    def test_read_redis_circuits_superuser(
+        self, client: TestClient, superuser_token_headers: Dict[str, str]
+    ) -> None:
+        r = client.get(
+            f"{settings.API_V1_STR}/admin/redis/circuits",
+            headers=superuser_token_headers,
+        )
+        assert r.status_code == 200
+        circuits = {circuit["name"]: circuit for circuit in r.json()}
+        assert circuits["login-lockout"]["state"] in ("closed", "open", "half-open")
@@ -1,12 +1,15 @@
 from typing import Dict
 
+import pytest
 from fastapi.encoders import jsonable_encoder
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
 from app import crud
 from app.core.config import settings
+from app.core.lockout import login_lockout
 from app.models.user import User
+from app.tests.utils.utils import random_email
 from app.utils import verify_password_reset_token
 
 
@@ -47,6 +50,110 @@ class TestLogin:
         assert r.status_code == 400
         assert r.json()["detail"] == "Inactive user."
 
+    def test_locked_account_skips_authentication(
+        self, client: TestClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        login_data = {"username": random_email(), "password": "wrongpassword"}
+        try:
+            for _ in range(settings.LOGIN_LOCKOUT_ACCOUNT_FAILURES):
+                r = client.post(
+                    f"{settings.API_V1_STR}/login/access-token", data=login_data
+                )
+                assert r.status_code == 400
+
+            def authenticate(*args, **kwargs):
+                raise AssertionError("Locked attempts must not authenticate.")
+
+            monkeypatch.setattr(crud.user, "authenticate", authenticate)
+            r = client.post(
+                f"{settings.API_V1_STR}/login/access-token", data=login_data
+            )
+            assert r.status_code == 429
+            assert int(r.headers["Retry-After"]) >= 1
+        finally:
+            login_lockout.reset(login_data["username"], "testclient")
+
+
+class TestRefreshToken:
+    def login(self, client: TestClient) -> Dict[str, str]:
+        login_data = {
+            "username": settings.FIRST_SUPERUSER,
+            "password": settings.FIRST_SUPERUSER_PASSWORD,
+        }
+        r = client.post(f"{settings.API_V1_STR}/login/access-token", data=login_data)
+        return r.json()
+
+    def test_rotation(self, client: TestClient) -> None:
+        tokens = self.login(client)
+        r = client.post(
+            f"{settings.API_V1_STR}/login/refresh-token",
+            json={"refresh_token": tokens["refresh_token"]},
+        )
+        assert r.status_code == 200
+        rotated = r.json()
+        assert rotated["refresh_token"] != tokens["refresh_token"]
+        r = client.get(
+            f"{settings.API_V1_STR}/users/me",
+            headers={"Authorization": f"Bearer {rotated['access_token']}"},
+        )
+        assert r.status_code == 200
+
+    def test_reuse_revokes_the_family(self, client: TestClient) -> None:
+        tokens = self.login(client)
+        url = f"{settings.API_V1_STR}/login/refresh-token"
+        rotated = client.post(url, json={"refresh_token": tokens["refresh_token"]})
+        r = client.post(url, json={"refresh_token": tokens["refresh_token"]})
+        assert r.status_code == 401
+        r = client.post(url, json={"refresh_token": rotated.json()["refresh_token"]})
+        assert r.status_code == 401
+
+    def test_password_change_revokes_refresh_tokens(
+        self, client: TestClient, db_user: User
+    ) -> None:
+        login_data = {"username": db_user.email, "password": "test@123"}
+        r = client.post(f"{settings.API_V1_STR}/login/access-token", data=login_data)
+        tokens = r.json()
+        r = client.post(
+            f"{settings.API_V1_STR}/reset-password/",
+            json={
+                "token": tokens["access_token"],
+                "old_password": "test@123",
+                "new_password": "test@456",
+            },
+        )
+        assert r.status_code == 200
+        r = client.post(
+            f"{settings.API_V1_STR}/login/refresh-token",
+            json={"refresh_token": tokens["refresh_token"]},
+        )
+        assert r.status_code == 401
+
+    def test_refresh_token_is_not_an_access_token(self, client: TestClient) -> None:
+        tokens = self.login(client)
+        r = client.get(
+            f"{settings.API_V1_STR}/users/me",
+            headers={"Authorization": f"Bearer {tokens['refresh_token']}"},
+        )
+        assert r.status_code == 403
+
+    def test_logout(self, client: TestClient) -> None:
+        tokens = self.login(client)
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        r = client.post(
+            f"{settings.API_V1_STR}/logout",
+            headers=headers,
+            json={"refresh_token": tokens["refresh_token"]},
+        )
+        assert r.status_code == 200
+        r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+        assert r.status_code == 403
+        assert r.json()["detail"] == "Token has been revoked."
+        r = client.post(
+            f"{settings.API_V1_STR}/login/refresh-token",
+            json={"refresh_token": tokens["refresh_token"]},
+        )
+        assert r.status_code == 401
+
 
 class TestUserMe:
     def test_user_me_superuser(
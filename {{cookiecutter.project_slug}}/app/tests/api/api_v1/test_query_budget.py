@@ -0,0 +1,55 @@
+from typing import Dict
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.config import settings
+from app.tests.utils.db import query_budget
+
+
+# Each request transaction starts with SET LOCAL statement_timeout.
+class TestQueryBudget:
+    def test_read_me(
+        self, client: TestClient, normal_user_token_headers: Dict[str, str]
+    ) -> None:
+        with query_budget(2):
+            r = client.get(
+                f"{settings.API_V1_STR}/users/me", headers=normal_user_token_headers
+            )
+        assert r.status_code == 200
+
+    def test_update_me(
+        self, client: TestClient, normal_user_token_headers: Dict[str, str]
+    ) -> None:
+        with query_budget(3):
+            r = client.put(
+                f"{settings.API_V1_STR}/users/me",
+                headers=normal_user_token_headers,
+                json={"first_name": "Budget"},
+            )
+        assert r.status_code == 200
+
+    def test_read_user_by_id(
+        self,
+        client: TestClient,
+        db: Session,
+        normal_user_token_headers: Dict[str, str],
+    ) -> None:
+        user = crud.user.get_by_email(db, email=settings.EMAIL_TEST_USER)
+        assert user
+        with query_budget(3):
+            r = client.get(
+                f"{settings.API_V1_STR}/users/{user.id}",
+                headers=normal_user_token_headers,
+            )
+        assert r.status_code == 200
+
+    def test_read_users_does_not_repeat(
+        self, client: TestClient, superuser_token_headers: Dict[str, str]
+    ) -> None:
+        with query_budget(3, max_repeats=1):
+            r = client.get(
+                f"{settings.API_V1_STR}/users/", headers=superuser_token_headers
+            )
+        assert r.status_code == 200
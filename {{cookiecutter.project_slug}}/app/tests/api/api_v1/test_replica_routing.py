@@ -0,0 +1,87 @@
+from typing import Generator
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.api import deps
+from app.core.config import settings
+from app.db.base_class import Base
+from app.db.replica import ReplicaSet
+from app.models.user import User
+from app.tests.utils.user import random_user_in, user_authentication_headers
+
+
+@pytest.fixture
+def replica(monkeypatch: pytest.MonkeyPatch) -> Generator:
+    # The test database stands in for a replica of the primary.
+    engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI_TEST))
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(deps, "replicas", ReplicaSet([engine], eject_seconds=30))
+    yield engine
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+def copy_to_replica(replica: Engine, user: User, **values) -> None:
+    row = {column.name: getattr(user, column.name) for column in User.__table__.c}
+    with replica.begin() as connection:
+        connection.execute(insert(User.__table__).values({**row, **values}))
+
+
+class TestReplicaRouting:
+    def test_reads_are_served_by_replica(
+        self, client: TestClient, db: Session, replica: Engine
+    ) -> None:
+        user_in = random_user_in()
+        user = crud.user.create(db, obj_in=user_in)
+        copy_to_replica(replica, user, first_name="replica")
+        headers = user_authentication_headers(
+            client=client,
+            email=user_in.email,
+            cpf=user_in.cpf,
+            password=user_in.password,
+        )
+        r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+        assert r.status_code == 200
+        assert r.json()["first_name"] == "replica"
+
+    def test_reads_after_own_write_use_primary(
+        self, client: TestClient, db: Session, replica: Engine
+    ) -> None:
+        user_in = random_user_in()
+        user = crud.user.create(db, obj_in=user_in)
+        copy_to_replica(replica, user, first_name="replica")
+        headers = user_authentication_headers(
+            client=client,
+            email=user_in.email,
+            cpf=user_in.cpf,
+            password=user_in.password,
+        )
+        r = client.put(
+            f"{settings.API_V1_STR}/users/me",
+            headers=headers,
+            json={"first_name": "primary"},
+        )
+        assert r.status_code == 200
+        r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+        assert r.json()["first_name"] == "primary"
+
+    def test_ejected_replica_falls_back_to_primary(
+        self, client: TestClient, db: Session, replica: Engine
+    ) -> None:
+        user_in = random_user_in()
+        crud.user.create(db, obj_in=user_in)
+        deps.replicas.eject(replica)
+        headers = user_authentication_headers(
+            client=client,
+            email=user_in.email,
+            cpf=user_in.cpf,
+            password=user_in.password,
+        )
+        r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+        assert r.status_code == 200
+        assert r.json()["email"] == user_in.email
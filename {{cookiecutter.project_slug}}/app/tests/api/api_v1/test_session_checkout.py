@@ -0,0 +1,118 @@
+from typing import Dict
+
+import pytest
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.api.routing import SessionReleasingRoute
+from app.core.cache import principal_cache
+from app.core.config import settings
+from app.db.pool import pool_metrics
+from app.tests.utils.db import count_statements
+
+
+def checkouts() -> int:
+    return pool_metrics["primary"].checkouts
+
+
+class TestSessionCheckout:
+    @pytest.mark.parametrize(
+        "headers",
+        [
+            {},
+            {"Authorization": "Bearer invalid_token"},
+        ],
+    )
+    def test_rejected_token_does_not_check_out(
+        self, client: TestClient, headers: Dict[str, str]
+    ) -> None:
+        before = checkouts()
+        r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+        assert r.status_code in (401, 403)
+        assert checkouts() == before
+
+    def test_health_does_not_check_out(self, client: TestClient) -> None:
+        before = checkouts()
+        r = client.get("/actuator/health")
+        assert r.status_code == 200
+        assert checkouts() == before
+
+    def test_authenticated_read_checks_out_once(
+        self, client: TestClient, superuser_token_headers: Dict[str, str]
+    ) -> None:
+        principal_cache.clear()
+        before = checkouts()
+        r = client.get(
+            f"{settings.API_V1_STR}/users/me", headers=superuser_token_headers
+        )
+        assert r.status_code == 200
+        assert checkouts() == before + 1
+        assert pool_metrics["primary"].snapshot()["checked_out"] == 0
+
+    def test_login_checks_out_once(self, client: TestClient) -> None:
+        before = checkouts()
+        r = client.post(
+            f"{settings.API_V1_STR}/login/access-token",
+            data={
+                "username": settings.FIRST_SUPERUSER,
+                "password": settings.FIRST_SUPERUSER_PASSWORD,
+            },
+        )
+        assert r.status_code == 200
+        assert checkouts() == before + 1
+
+    def test_update_me_writes_once_and_commits_once(
+        self, client: TestClient, normal_user_token_headers: Dict[str, str]
+    ) -> None:
+        with count_statements() as log:
+            r = client.put(
+                f"{settings.API_V1_STR}/users/me",
+                headers=normal_user_token_headers,
+                json={"first_name": "Ana"},
+            )
+        assert r.status_code == 200
+        assert r.json()["first_name"] == "Ana"
+        assert len(log.writes) == 1
+        assert log.commits == 1
+
+    def test_failed_request_does_not_commit(
+        self, client: TestClient, superuser_token_headers: Dict[str, str]
+    ) -> None:
+        with count_statements() as log:
+            r = client.put(
+                f"{settings.API_V1_STR}/users/0",
+                headers=superuser_token_headers,
+                json={"first_name": "Ana"},
+            )
+        assert r.status_code == 404
+        assert log.commits == 0
+
+    def test_cached_principal_does_not_check_out(
+        self, client: TestClient, superuser_token_headers: Dict[str, str]
+    ) -> None:
+        url = f"{settings.API_V1_STR}/users/me"
+        client.get(url, headers=superuser_token_headers)
+        before = checkouts()
+        r = client.get(url, headers=superuser_token_headers)
+        assert r.status_code == 200
+        assert checkouts() == before
+
+
+def test_unit_of_work_only_under_session_releasing_route() -> None:
+    releasing = APIRouter(route_class=SessionReleasingRoute)
+    plain = APIRouter()
+
+    def unit_of_work(db: Session = Depends(deps.get_db)) -> bool:
+        return db.info["unit_of_work"]
+
+    releasing.get("/releasing")(unit_of_work)
+    plain.get("/plain")(unit_of_work)
+    app = FastAPI()
+    app.include_router(releasing)
+    app.include_router(plain)
+    with TestClient(app) as client:
+        assert client.get("/releasing").json() is True
+        # CRUD writes commit per call, since nothing commits at the end.
+        assert client.get("/plain").json() is False
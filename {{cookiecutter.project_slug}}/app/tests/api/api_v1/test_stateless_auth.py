@@ -0,0 +1,82 @@
+from typing import Dict, Tuple
+
+import pytest
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core import security
+from app.core.config import settings
+from app.models.user import User
+from app.tests.utils.db import query_budget
+from app.tests.utils.user import random_user_in, user_authentication_headers
+
+
+@pytest.fixture
+def stateless_user(
+    client: TestClient, db: Session, monkeypatch: pytest.MonkeyPatch
+) -> Tuple[User, Dict[str, str]]:
+    monkeypatch.setattr(settings, "STATELESS_AUTH", True)
+    user_in = random_user_in(is_superuser=True)
+    user = crud.user.create(db, obj_in=user_in)
+    headers = user_authentication_headers(
+        client=client, email=user_in.email, cpf=user_in.cpf, password=user_in.password
+    )
+    return user, headers
+
+
+class TestStatelessAuth:
+    def test_token_carries_claims(
+        self, stateless_user: Tuple[User, Dict[str, str]]
+    ) -> None:
+        user, headers = stateless_user
+        token = headers["Authorization"].split()[1]
+        payload = jwt.decode(
+            token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
+        )
+        assert payload["is_superuser"] is True
+        assert payload["is_active"] is True
+        assert payload["permission"] == user.permission
+        assert payload["token_version"] == user.token_version
+
+    def test_authorizes_without_loading_the_user(
+        self, client: TestClient, stateless_user: Tuple[User, Dict[str, str]]
+    ) -> None:
+        _, headers = stateless_user
+        url = f"{settings.API_V1_STR}/admin/pools"
+        client.get(url, headers=headers)
+        with query_budget(0):
+            r = client.get(url, headers=headers)
+        assert r.status_code == 200
+
+    def test_loads_the_user_when_needed(
+        self, client: TestClient, stateless_user: Tuple[User, Dict[str, str]]
+    ) -> None:
+        user, headers = stateless_user
+        r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+        assert r.status_code == 200
+        assert r.json()["email"] == user.email
+
+    def test_revoked_token(
+        self,
+        client: TestClient,
+        db: Session,
+        stateless_user: Tuple[User, Dict[str, str]],
+    ) -> None:
+        user, headers = stateless_user
+        crud.user.revoke_tokens(db, db_obj=user)
+        r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+        assert r.status_code == 403
+        assert r.json()["detail"] == "Token has been revoked."
+
+    def test_deactivation_revokes(
+        self,
+        client: TestClient,
+        db: Session,
+        stateless_user: Tuple[User, Dict[str, str]],
+    ) -> None:
+        user, headers = stateless_user
+        crud.user.update(db, db_obj=user, obj_in={"is_active": False})
+        r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+        assert r.status_code == 403
@@ -1,3 +1,4 @@
+import json
 from typing import Dict
 
 from fastapi.testclient import TestClient
@@ -6,7 +7,9 @@ from sqlalchemy.orm import Session
 from app import crud
 from app.core.config import settings
 from app.core.enums import UserPermissionEnum
+from app.schemas.bulk import MAX_BULK_PASSWORDS
 from app.schemas.user import UserCreate
+from app.tests.utils.user import random_user_in
 from app.tests.utils.utils import (
     random_cpf,
     random_email,
@@ -150,3 +153,134 @@ class TestUserAPI:
         assert len(all_users) > 1
         for item in all_users:
             assert "email" in item
+
+    def test_retrieve_users_by_cursor(
+        self, client: TestClient, superuser_token_headers: dict, db: Session
+    ) -> None:
+        crud.user.create_multi(db, objs_in=[random_user_in() for _ in range(3)])
+        r = client.get(
+            f"{settings.API_V1_STR}/users/",
+            headers=superuser_token_headers,
+            params={"limit": 2},
+        )
+        assert r.status_code == 200
+        first_page = r.json()
+        cursor = r.headers["X-Next-Cursor"]
+        r = client.get(
+            f"{settings.API_V1_STR}/users/",
+            headers=superuser_token_headers,
+            params={"limit": 2, "cursor": cursor},
+        )
+        assert r.status_code == 200
+        second_page = r.json()
+        assert second_page
+        assert not {u["email"] for u in first_page} & {u["email"] for u in second_page}
+
+    def test_retrieve_users_invalid_cursor(
+        self, client: TestClient, superuser_token_headers: dict
+    ) -> None:
+        r = client.get(
+            f"{settings.API_V1_STR}/users/",
+            headers=superuser_token_headers,
+            params={"cursor": "invalid"},
+        )
+        assert r.status_code == 400
+        assert r.json()["detail"] == "Invalid cursor."
+
+    def test_export_users(
+        self, client: TestClient, superuser_token_headers: dict, db: Session
+    ) -> None:
+        user = crud.user.create(db, obj_in=random_user_in())
+        r = client.get(
+            f"{settings.API_V1_STR}/users/export", headers=superuser_token_headers
+        )
+        assert r.status_code == 200
+        assert r.headers["content-type"].startswith("application/x-ndjson")
+        exported = [json.loads(line) for line in r.text.splitlines()]
+        assert user.email in {item["email"] for item in exported}
+        assert all("hashed_password" not in item for item in exported)
+
+        r = client.get(
+            f"{settings.API_V1_STR}/users/export",
+            headers=superuser_token_headers,
+            params={"format": "csv"},
+        )
+        assert r.status_code == 200
+        assert r.text.splitlines()[0].startswith("id,first_name,last_name,email")
+        assert user.email in r.text
+
+    def test_create_users_bulk(
+        self, client: TestClient, superuser_token_headers: dict, db: Session
+    ) -> None:
+        existing = crud.user.create(db, obj_in=random_user_in())
+        items = [
+            random_user_in(),
+            random_user_in(email=existing.email),
+            random_user_in(),
+        ]
+        r = client.post(
+            f"{settings.API_V1_STR}/users/bulk",
+            headers=superuser_token_headers,
+            json={"items": [item.model_dump(mode="json") for item in items]},
+        )
+        assert r.status_code == 200
+        result = r.json()
+        assert len(result["ids"]) == 2
+        assert [error["index"] for error in result["errors"]] == [1]
+        assert crud.user.get_by_email(db, email=items[2].email)
+
+    def test_create_users_bulk_too_many_passwords(
+        self, client: TestClient, superuser_token_headers: dict
+    ) -> None:
+        item = random_user_in().model_dump(mode="json")
+        r = client.post(
+            f"{settings.API_V1_STR}/users/bulk",
+            headers=superuser_token_headers,
+            json={"items": [item] * (MAX_BULK_PASSWORDS + 1)},
+        )
+        assert r.status_code == 422
+
+    def test_update_users_bulk(
+        self, client: TestClient, superuser_token_headers: dict, db: Session
+    ) -> None:
+        users = crud.user.create_multi(db, objs_in=[random_user_in() for _ in range(2)])
+        ids = [user.id for user in users]
+        r = client.put(
+            f"{settings.API_V1_STR}/users/bulk",
+            headers=superuser_token_headers,
+            json={"ids": ids + [0], "values": {"first_name": "Bulk"}},
+        )
+        assert r.status_code == 200
+        result = r.json()
+        assert sorted(result["ids"]) == sorted(ids)
+        assert result["errors"] == [{"index": 2, "detail": "User not found."}]
+        db.expire_all()
+        for user_id in ids:
+            user = crud.user.get(db, id=user_id)
+            assert user
+            assert user.first_name == "Bulk"
+
+    def test_remove_users_bulk(
+        self, client: TestClient, superuser_token_headers: dict, db: Session
+    ) -> None:
+        users = crud.user.create_multi(db, objs_in=[random_user_in() for _ in range(2)])
+        ids = [user.id for user in users]
+        r = client.request(
+            "DELETE",
+            f"{settings.API_V1_STR}/users/bulk",
+            headers=superuser_token_headers,
+            json={"ids": ids},
+        )
+        assert r.status_code == 200
+        assert sorted(r.json()["ids"]) == sorted(ids)
+        assert r.json()["errors"] == []
+
+    def test_bulk_by_normal_user(
+        self, client: TestClient, normal_user_token_headers: Dict[str, str]
+    ) -> None:
+        r = client.post(
+            f"{settings.API_V1_STR}/users/bulk",
+            headers=normal_user_token_headers,
+            json={"items": [random_user_in().model_dump(mode="json")]},
+        )
+        assert r.status_code == 400
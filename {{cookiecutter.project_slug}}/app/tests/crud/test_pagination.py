@@ -0,0 +1,57 @@
+import pytest
+
+from app.crud.pagination import (
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    page_statement,
+)
+from app.models.user import User
+
+
+class TestCursor:
+    def test_round_trip(self) -> None:
+        cursor = encode_cursor("email", "user@email.com")
+        assert "=" not in cursor
+        assert decode_cursor(cursor, "email", str) == "user@email.com"
+
+    @pytest.mark.parametrize(
+        "cursor",
+        [
+            "not-a-cursor",
+            encode_cursor("email", "user@email.com"),
+            encode_cursor("id", "1"),
+        ],
+    )
+    def test_invalid_cursor(self, cursor: str) -> None:
+        with pytest.raises(InvalidCursor):
+            decode_cursor(cursor, "id", int)
+
+    def test_page_statement_seeks_past_cursor(self) -> None:
+        stmt = page_statement(
+            User, columns=("id",), limit=10, after=encode_cursor("id", 42)
+        )
+        sql = str(stmt.compile(compile_kwargs={"literal_binds": True}))
+        assert "users.id > 42" in sql
+        assert "OFFSET" not in sql
+
+    def test_page_statement_binds_page_values(self) -> None:
+        first = page_statement(
+            User, columns=("id",), limit=10, after=encode_cursor("id", 1)
+        )
+        second = page_statement(
+            User, columns=("id",), limit=20, after=encode_cursor("id", 2)
+        )
+        offset = page_statement(User, columns=("id",), limit=10, skip=10)
+        assert first._generate_cache_key() == second._generate_cache_key()
+        assert first._generate_cache_key() != offset._generate_cache_key()
+
+    def test_page_statement_rejects_ordering(self) -> None:
+        with pytest.raises(InvalidCursor):
+            page_statement(User, columns=("id",), limit=10, order_by="first_name")
+
+    def test_page_statement_projects_fields(self) -> None:
+        stmt = page_statement(
+            User, columns=("id", "email"), limit=10, order_by="email", fields=["cpf"]
+        )
+        assert [column.name for column in stmt.selected_columns] == ["cpf", "email"]
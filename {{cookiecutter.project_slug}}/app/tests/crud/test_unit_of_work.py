@@ -0,0 +1,51 @@
+from typing import Generator
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.db.session import SessionLocal
+from app.schemas.user import UserUpdate
+from app.tests.utils.db import count_statements
+from app.tests.utils.user import random_user_in
+
+
+@pytest.fixture
+def uow_db() -> Generator:
+    db = SessionLocal(expire_on_commit=False)
+    db.info["unit_of_work"] = True
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+class TestUnitOfWork:
+    def test_create_is_one_insert_and_one_commit(self, uow_db: Session) -> None:
+        user_in = random_user_in()
+        with count_statements() as log:
+            user = crud.user.create(uow_db, obj_in=user_in)
+            uow_db.commit()
+            assert user.id is not None
+            assert user.is_active is True
+            assert user.email == user_in.email
+        assert len(log.statements) == 1
+        assert log.statements[0].lstrip().upper().startswith("INSERT")
+        assert log.commits == 1
+
+    def test_update_is_one_update_and_one_commit(self, uow_db: Session) -> None:
+        user = crud.user.create(uow_db, obj_in=random_user_in())
+        uow_db.commit()
+        with count_statements() as log:
+            user_in = UserUpdate(first_name="Ana")
+            crud.user.update(uow_db, db_obj=user, obj_in=user_in)
+            uow_db.commit()
+            assert user.first_name == "Ana"
+        assert len(log.statements) == 1
+        assert log.statements[0].lstrip().upper().startswith("UPDATE")
+        assert log.commits == 1
+
+    def test_crud_only_flushes(self, uow_db: Session) -> None:
+        user = crud.user.create(uow_db, obj_in=random_user_in())
+        uow_db.rollback()
+        assert crud.user.get_by_email(uow_db, email=user.email) is None
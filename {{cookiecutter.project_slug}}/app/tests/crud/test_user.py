@@ -1,10 +1,19 @@
+from typing import Optional
+
+import anyio
 from fastapi.encoders import jsonable_encoder
+from passlib.hash import bcrypt
 from sqlalchemy.orm import Session
 
 from app import crud
+from app.core.cache import principal_cache
+from app.core.config import settings
 from app.core.enums import UserPermissionEnum
 from app.core.security import verify_password
+from app.crud.pagination import next_cursor
+from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
+from app.tests.utils.user import random_user_in
 from app.tests.utils.utils import (
     random_cpf,
     random_email,
@@ -91,6 +100,31 @@ class TestCrudUser:
         assert authenticated_user
         assert user.email == authenticated_user.email
 
+    def test_authenticate_rehashes_outdated_hash(self, db: Session) -> None:
+        user_in = random_user_in()
+        user = crud.user.create(db, obj_in=user_in)
+        user.hashed_password = bcrypt.using(rounds=4).hash(user_in.password)
+        db.commit()
+        version = user.token_version
+        crud.user.authenticate(db, email=user_in.email, password=user_in.password)
+        assert user.hashed_password.startswith(f"$2b${settings.PASSWORD_HASH_ROUNDS}$")
+        assert verify_password(user_in.password, user.hashed_password)
+        assert user.token_version == version
+
+    def test_authenticate_async(self, db: Session) -> None:
+        user_in = random_user_in()
+        user = crud.user.create(db, obj_in=user_in)
+
+        async def authenticate(password: str) -> Optional[User]:
+            return await crud.user.authenticate_async(
+                db, email=user_in.email, password=password
+            )
+
+        authenticated_user = anyio.run(authenticate, user_in.password)
+        assert authenticated_user
+        assert authenticated_user.id == user.id
+        assert anyio.run(authenticate, random_lower_string()) is None
+
     def test_not_authenticate_user(self, db: Session) -> None:
         email = random_email()
         password = random_lower_string()
@@ -211,3 +245,93 @@ class TestCrudUser:
         assert user.phone == user_2.phone
         assert user_2.is_superuser is True
         assert verify_password(new_password, user_2.hashed_password)
+
+    def test_get_multi(self, db: Session) -> None:
+        for _ in range(3):
+            crud.user.create(
+                db,
+                obj_in=UserCreate(
+                    cpf=random_cpf(),
+                    email=random_email(),
+                    phone=random_phone(),
+                    permission=UserPermissionEnum.USER.value,
+                    password=random_lower_string(),
+                ),
+            )
+        first_page = crud.user.get_multi(db, skip=0, limit=2)
+        second_page = crud.user.get_multi(db, skip=2, limit=2)
+        assert len(first_page) == 2
+        assert second_page
+        first_ids = {user.id for user in first_page}
+        assert not first_ids & {user.id for user in second_page}
+
+    def test_get_multi_after_cursor(self, db: Session) -> None:
+        crud.user.create_multi(db, objs_in=[random_user_in() for _ in range(3)])
+        first_page = crud.user.get_multi(db, limit=2, order_by="email")
+        cursor = next_cursor(first_page, limit=2, order_by="email")
+        assert cursor
+        second_page = crud.user.get_multi(db, limit=2, after=cursor, order_by="email")
+        assert second_page
+        assert first_page[-1].email < second_page[0].email
+
+    def test_get_multi_fields(self, db: Session) -> None:
+        crud.user.create(db, obj_in=random_user_in())
+        tracked = len(db.identity_map)
+        rows = crud.user.get_multi(db, limit=1, fields=["email", "is_active"])
+        assert len(rows) == 1
+        assert rows[0]._fields == ("email", "is_active", "id")
+        assert len(db.identity_map) == tracked
+
+    def test_create_multi(self, db: Session) -> None:
+        existing = crud.user.create(db, obj_in=random_user_in())
+        user_in = random_user_in()
+        users = crud.user.create_multi(
+            db,
+            objs_in=[
+                user_in,
+                random_user_in(email=existing.email),
+                random_user_in(cpf=user_in.cpf),
+            ],
+        )
+        assert users[0] is not None
+        assert users[0].email == user_in.email
+        assert users[1:] == [None, None]
+        assert crud.user.get_by_email(db, email=user_in.email)
+
+    def test_update_multi(self, db: Session) -> None:
+        users = crud.user.create_multi(db, objs_in=[random_user_in() for _ in range(3)])
+        ids = [user.id for user in users]
+        updated = crud.user.update_multi(db, ids=ids + [0], obj_in={"is_active": False})
+        assert sorted(updated) == sorted(ids)
+        for user_id in ids:
+            user = crud.user.get(db, id=user_id)
+            assert user
+            assert user.is_active is False
+
+    def test_remove_multi(self, db: Session) -> None:
+        users = crud.user.create_multi(db, objs_in=[random_user_in() for _ in range(2)])
+        ids = [user.id for user in users]
+        assert sorted(crud.user.remove_multi(db, ids=ids + [0])) == sorted(ids)
+        assert all(crud.user.get(db, id=user_id) is None for user_id in ids)
+
+    def test_get_principal_is_cached_until_update(self, db: Session) -> None:
+        user = crud.user.create(db, obj_in=random_user_in())
+        crud.user.get_principal(db, id=user.id)
+        db.expunge_all()
+        cached = crud.user.get_principal(db, id=user.id)
+        assert cached.email == user.email
+        assert cached in db
+        crud.user.update(db, db_obj=cached, obj_in={"first_name": "Cached"})
+        assert principal_cache.get(str(user.id)) is None
+        db.expunge_all()
+        assert crud.user.get_principal(db, id=user.id).first_name == "Cached"
+
+    def test_authorization_changes_bump_token_version(self, db: Session) -> None:
+        user = crud.user.create(db, obj_in=random_user_in())
+        version = user.token_version
+        crud.user.update(db, db_obj=user, obj_in={"first_name": "Same"})
+        assert user.token_version == version
+        crud.user.update(db, db_obj=user, obj_in={"is_superuser": True})
+        assert user.token_version == version + 1
+        crud.user.update_multi(db, ids=[user.id], obj_in={"is_active": False})
+        assert crud.user.get_token_version(db, id=user.id) == version + 2
@@ -0,0 +1,103 @@
+from typing import AsyncGenerator
+
+import pytest
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from app import crud
+from app.core.security import verify_password
+from app.core.config import settings
+from app.schemas.user import UserUpdate
+from app.tests.utils.user import random_user_in
+from app.tests.utils.utils import random_lower_string
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+async def async_db() -> AsyncGenerator:
+    # An engine of its own: the app only builds one with ASYNC_DATABASE, and
+    # each test runs on its own event loop, so connections can not be reused.
+    engine = create_async_engine(str(settings.SQLALCHEMY_ASYNC_DATABASE_URI))
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+class TestAsyncCrudUser:
+    async def test_create_user(self, async_db: AsyncSession) -> None:
+        user_in = random_user_in()
+        user = await crud.async_user.create(async_db, obj_in=user_in)
+        assert user.email == user_in.email
+        assert verify_password(user_in.password, user.hashed_password)
+
+    async def test_get_user(self, async_db: AsyncSession) -> None:
+        user = await crud.async_user.create(async_db, obj_in=random_user_in())
+        user_2 = await crud.async_user.get(async_db, id=user.id)
+        assert user_2
+        assert user_2.email == user.email
+
+    async def test_get_multi(self, async_db: AsyncSession) -> None:
+        await crud.async_user.create(async_db, obj_in=random_user_in())
+        users = await crud.async_user.get_multi(async_db, limit=1)
+        assert len(users) == 1
+
+    async def test_get_by_email(self, async_db: AsyncSession) -> None:
+        user = await crud.async_user.create(async_db, obj_in=random_user_in())
+        user_2 = await crud.async_user.get_by_email(async_db, email=user.email)
+        assert user_2
+        assert user_2.id == user.id
+
+    async def test_get_by_email_not_found(self, async_db: AsyncSession) -> None:
+        user = await crud.async_user.get_by_email(async_db, email="not_found@email.com")
+        assert user is None
+
+    async def test_authenticate_user(self, async_db: AsyncSession) -> None:
+        user_in = random_user_in()
+        user = await crud.async_user.create(async_db, obj_in=user_in)
+        authenticated_user = await crud.async_user.authenticate(
+            async_db, email=user_in.email, password=user_in.password
+        )
+        assert authenticated_user
+        assert authenticated_user.id == user.id
+
+    async def test_not_authenticate_user(self, async_db: AsyncSession) -> None:
+        user_in = random_user_in()
+        await crud.async_user.create(async_db, obj_in=user_in)
+        user = await crud.async_user.authenticate(
+            async_db, email=user_in.email, password=random_lower_string()
+        )
+        assert user is None
+
+    async def test_update_user(self, async_db: AsyncSession) -> None:
+        user = await crud.async_user.create(async_db, obj_in=random_user_in())
+        new_password = random_lower_string()
+        user_in_update = UserUpdate(password=new_password, is_superuser=True)
+        await crud.async_user.update(async_db, db_obj=user, obj_in=user_in_update)
+        user_2 = await crud.async_user.get(async_db, id=user.id)
+        assert user_2
+        assert user_2.is_superuser is True
+        assert verify_password(new_password, user_2.hashed_password)
+
+    async def test_update_revokes_tokens(self, async_db: AsyncSession) -> None:
+        user = await crud.async_user.create(async_db, obj_in=random_user_in())
+        version = user.token_version
+        await crud.async_user.update(
+            async_db, db_obj=user, obj_in={"first_name": "Ana"}
+        )
+        assert user.token_version == version
+        await crud.async_user.update(async_db, db_obj=user, obj_in={"is_active": False})
+        assert user.token_version == version + 1
+
+    async def test_remove_user(self, async_db: AsyncSession) -> None:
+        user = await crud.async_user.create(async_db, obj_in=random_user_in())
+        await crud.async_user.remove(async_db, id=user.id)
+        assert await crud.async_user.get(async_db, id=user.id) is None
@@ -0,0 +1,77 @@
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from app.core.middleware import QueryStatsMiddleware
+from app.db.instrumentation import QueryStats, instrument, track_queries
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    instrument(engine)
+    return engine
+
+
+@pytest.fixture
+def app(engine) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware)
+
+    @app.get("/items")
+    def items(n: int = 1) -> int:
+        with engine.connect() as conn:
+            for i in range(n):
+                conn.execute(text("SELECT :i"), {"i": i})
+        return n
+
+    return app
+
+
+class TestQueryStats:
+    def test_repeated_statements_share_a_fingerprint(self) -> None:
+        stats = QueryStats()
+        stats.record("SELECT *\n  FROM users WHERE id = %(id)s", 0.1)
+        stats.record("SELECT * FROM users   WHERE id = %(id)s", 0.2)
+        stats.record("SELECT 1", 0.0)
+        assert stats.statements == 3
+        assert stats.seconds == pytest.approx(0.3)
+        assert stats.max_repeats == 2
+        assert stats.repeated() == [("SELECT * FROM users WHERE id = %(id)s", 2)]
+        assert "x2 SELECT * FROM users" in stats.describe()
+
+    def test_track_queries(self, engine) -> None:
+        with track_queries() as stats:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 1"))
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 2"))
+        assert stats.statements == 2
+        assert stats.max_repeats == 2
+
+
+class TestQueryStatsMiddleware:
+    def test_headers_in_debug(self, app: FastAPI, monkeypatch) -> None:
+        monkeypatch.setattr(settings, "DEBUG", True)
+        r = TestClient(app).get("/items", params={"n": 3})
+        assert r.headers["X-DB-Statements"] == "3"
+        assert r.headers["X-DB-Repeated"] == "3"
+        assert float(r.headers["X-DB-Time-Ms"]) >= 0
+
+    def test_no_headers_by_default(self, app: FastAPI) -> None:
+        r = TestClient(app).get("/items")
+        assert r.status_code == 200
+        assert "X-DB-Statements" not in r.headers
+
+    def test_warns_over_threshold(self, app: FastAPI, monkeypatch, caplog) -> None:
+        monkeypatch.setattr(settings, "QUERY_WARN_REPEATS", 3)
+        with caplog.at_level(logging.WARNING, logger="app.core.middleware"):
+            TestClient(app).get("/items", params={"n": 2})
+            assert not caplog.records
+            TestClient(app).get("/items", params={"n": 3})
+        assert "GET /items ran 3 statements" in caplog.text
@@ -0,0 +1,29 @@
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from app.db.session import LazySession
+
+
+class TestLazySession:
+    def test_session_is_created_on_first_use(self) -> None:
+        engine = create_engine("sqlite://")
+        db = LazySession(sessionmaker(bind=engine))
+        db.info["subject"] = "1"
+        assert not db.started
+        assert db.execute(text("SELECT 1")).scalar() == 1
+        assert db.started
+        assert db.info["subject"] == "1"
+
+    def test_close_releases_connection(self) -> None:
+        engine = create_engine("sqlite://", poolclass=QueuePool)
+        db = LazySession(sessionmaker(bind=engine))
+        db.execute(text("SELECT 1"))
+        assert engine.pool.checkedout() == 1
+        db.close()
+        assert engine.pool.checkedout() == 0
+
+    def test_close_without_use_is_noop(self) -> None:
+        db = LazySession(sessionmaker())
+        db.close()
+        assert not db.started
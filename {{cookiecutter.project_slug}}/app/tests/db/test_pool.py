@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy import create_engine, exc
+
+from app.core.config import settings
+from app.db.pool import PoolMetrics, pool_options
+
+
+@pytest.fixture
+def sqlite_engine(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(settings, "DATABASE_POOL_SIZE", 1)
+    monkeypatch.setattr(settings, "DATABASE_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(settings, "DATABASE_POOL_TIMEOUT", 0.05)
+    engine = create_engine("sqlite://", **pool_options("test-sqlite"))
+    yield engine
+    engine.dispose()
+
+
+class TestPoolMetrics:
+    def test_observe_checkout_histogram(self) -> None:
+        metrics = PoolMetrics("test")
+        metrics.observe_checkout(0.0005)
+        metrics.observe_checkout(0.2)
+        metrics.observe_checkout(60)
+        snapshot = metrics.snapshot()
+        assert snapshot["checkouts"] == 3
+        histogram = {
+            bucket["le"]: bucket["count"] for bucket in snapshot["wait_histogram"]
+        }
+        assert histogram[0.001] == 1
+        assert histogram[0.25] == 2
+        assert histogram[None] == 3
+
+    def test_pool_options_follow_settings(self, sqlite_engine) -> None:
+        pool = sqlite_engine.pool
+        assert pool.size() == 1
+        assert pool._max_overflow == 0
+        assert pool._timeout == 0.05
+
+    def test_checkout_and_timeout_are_counted(self, sqlite_engine) -> None:
+        metrics = sqlite_engine.pool.metrics
+        checkouts = metrics.checkouts
+        with sqlite_engine.connect():
+            snapshot = metrics.snapshot()
+            assert snapshot["checked_out"] == 1
+            with pytest.raises(exc.TimeoutError):
+                sqlite_engine.connect()
+        snapshot = metrics.snapshot()
+        assert snapshot["checkouts"] == checkouts + 1
+        assert snapshot["checkout_timeouts"] == 1
+        assert snapshot["checked_out"] == 0
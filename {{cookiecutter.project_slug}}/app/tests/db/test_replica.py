@@ -0,0 +1,107 @@
+import pytest
+from fakeredis import FakeRedis, FakeServer
+from sqlalchemy import create_engine, exc, update
+from sqlalchemy.orm import sessionmaker
+
+from app.core.enums import UserPermissionEnum
+from app.db.base_class import Base
+from app.db.replica import ReadYourWrites, ReplicaSet
+from app.db.session import track_writes
+from app.models.user import User
+from app.tests.utils.utils import closed_breaker, unreachable_redis
+
+
+class TestReplicaSet:
+    def test_choose_round_robin(self) -> None:
+        engines = [create_engine("sqlite://") for _ in range(3)]
+        replicas = ReplicaSet(engines, eject_seconds=30)
+        assert [replicas.choose() for _ in range(6)] == engines + engines
+
+    def test_choose_skips_ejected(self) -> None:
+        engines = [create_engine("sqlite://") for _ in range(2)]
+        replicas = ReplicaSet(engines, eject_seconds=30)
+        replicas.eject(engines[0])
+        assert {replicas.choose() for _ in range(4)} == {engines[1]}
+
+    def test_choose_none_when_all_ejected(self) -> None:
+        engine = create_engine("sqlite://")
+        replicas = ReplicaSet([engine], eject_seconds=30)
+        replicas.eject(engine)
+        assert replicas.choose() is None
+
+    def test_ejection_expires(self) -> None:
+        engine = create_engine("sqlite://")
+        replicas = ReplicaSet([engine], eject_seconds=0)
+        replicas.eject(engine)
+        assert replicas.choose() is engine
+
+    def test_connect_failure_ejects(self, tmp_path) -> None:
+        broken = create_engine(f"sqlite:///{tmp_path}/missing/replica.db")
+        replicas = ReplicaSet([broken], eject_seconds=30)
+        with pytest.raises(exc.OperationalError):
+            broken.connect()
+        assert replicas.is_ejected(broken)
+
+    def test_query_error_does_not_eject(self) -> None:
+        engine = create_engine("sqlite://")
+        replicas = ReplicaSet([engine], eject_seconds=30)
+        with pytest.raises(exc.OperationalError), engine.connect() as connection:
+            connection.exec_driver_sql("SELECT * FROM missing_table")
+        assert not replicas.is_ejected(engine)
+
+
+class TestReadYourWrites:
+    def test_mark_and_expire(self) -> None:
+        recent = ReadYourWrites(FakeRedis(), closed_breaker(), window=30)
+        assert not recent.is_recent("1")
+        recent.mark("1")
+        assert recent.is_recent("1")
+        assert not recent.is_recent(None)
+
+    def test_marks_are_shared_by_workers(self) -> None:
+        server = FakeServer()
+        writer = ReadYourWrites(FakeRedis(server=server), closed_breaker(), window=30)
+        reader = ReadYourWrites(FakeRedis(server=server), closed_breaker(), window=30)
+        writer.mark("1")
+        assert reader.is_recent("1")
+        assert not reader.is_recent("2")
+
+    def test_redis_down_falls_back_to_local_marks(self) -> None:
+        recent = ReadYourWrites(unreachable_redis(), closed_breaker(), window=30)
+        recent.mark("1")
+        assert recent.is_recent("1")
+        assert not recent.is_recent("2")
+
+    def test_commit_with_writes_marks_subject(self) -> None:
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        factory = sessionmaker(bind=engine)
+        track_writes(factory)
+        recent = ReadYourWrites(FakeRedis(), closed_breaker(), window=30)
+        recent.track(factory)
+
+        with factory() as session:
+            session.info["subject"] = "reader"
+            session.query(User).all()
+            session.commit()
+        assert not recent.is_recent("reader")
+
+        with factory() as session:
+            session.info["subject"] = "writer"
+            session.add(
+                User(
+                    cpf="1",
+                    email="writer@email.com",
+                    phone="1",
+                    permission=UserPermissionEnum.USER.value,
+                    hashed_password="x",
+                )
+            )
+            session.commit()
+        assert recent.is_recent("writer")
+
+        with factory() as session:
+            session.info["subject"] = "bulk-writer"
+            session.execute(update(User).values(first_name="Ana"))
+            session.commit()
+        assert recent.is_recent("bulk-writer")
@@ -93,3 +93,22 @@ def test_email_enabled() -> None:
         }
     )
     assert settings.EMAILS_ENABLED is True
+
+
+def test_assemble_async_db_connection() -> None:
+    settings = make_settings(MANDATORY)
+    assert settings.ASYNC_DATABASE is False
+    assert str(settings.SQLALCHEMY_ASYNC_DATABASE_URI) == (
+        f"postgresql+asyncpg://{settings.POSTGRES_USER}:"
+        f"{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_SERVER}/"
+        f"{settings.POSTGRES_DB}"
+    )
+
+
+def test_database_pool_defaults() -> None:
+    settings = make_settings(MANDATORY)
+    assert settings.DATABASE_POOL_SIZE == 5
+    assert settings.DATABASE_MAX_OVERFLOW == 10
+    assert settings.DATABASE_POOL_RECYCLE == -1
+    assert settings.DATABASE_POOL_TIMEOUT == 30.0
+    assert settings.DATABASE_POOL_PRE_PING is True
@@ -0,0 +1,109 @@
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.cache import LocalCache, RedisInvalidator, verified_tokens
+from app.core.security import create_access_token
+from app.tests.utils.utils import (
+    closed_breaker,
+    get_token_data,
+    unreachable_redis,
+)
+
+
+class TestLocalCache:
+    def test_hits_and_misses(self) -> None:
+        cache = LocalCache("test", maxsize=10, ttl=60)
+        assert cache.get("1") is None
+        cache.set("1", {"id": 1})
+        assert cache.get("1") == {"id": 1}
+        status = cache.snapshot()
+        assert status["hits"] == 1
+        assert status["misses"] == 1
+        assert status["hit_rate"] == 0.5
+
+    def test_expires(self) -> None:
+        cache = LocalCache("test", maxsize=10, ttl=0.05)
+        cache.set("1", 1)
+        time.sleep(0.1)
+        assert cache.get("1") is None
+
+    def test_bounded(self) -> None:
+        cache = LocalCache("test", maxsize=2, ttl=60)
+        for key in "abc":
+            cache.set(key, key)
+        assert cache.snapshot()["size"] == 2
+        assert cache.get("a") is None
+
+    def test_disabled(self) -> None:
+        cache = LocalCache("test", maxsize=10, ttl=0)
+        cache.set("1", 1)
+        assert cache.get("1") is None
+        assert cache.snapshot()["misses"] == 0
+
+    def test_value_loaded_before_invalidation_is_dropped(self) -> None:
+        cache = LocalCache("test", maxsize=10, ttl=60)
+        generation = cache.generation
+        cache.invalidate(["1"])
+        cache.set("1", "stale", generation)
+        assert cache.get("1") is None
+        cache.set("1", "fresh", cache.generation)
+        assert cache.get("1") == "fresh"
+
+
+class TestRedisInvalidator:
+    def test_invalidates_locally_without_redis(self) -> None:
+        cache = LocalCache("test", maxsize=10, ttl=60)
+        invalidator = RedisInvalidator(
+            [cache], unreachable_redis(), closed_breaker(), "test"
+        )
+        cache.set("1", 1)
+        invalidator.invalidate([1])
+        assert cache.get("1") is None
+        assert cache.snapshot()["invalidations"] == 1
+
+    def test_applies_published_invalidations(self) -> None:
+        cache = LocalCache("test", maxsize=10, ttl=60)
+        invalidator = RedisInvalidator(
+            [cache], unreachable_redis(), closed_breaker(), "test"
+        )
+        cache.set("1", 1)
+        cache.set("2", 2)
+        invalidator._on_message({"data": b"1,3"})
+        assert cache.get("1") is None
+        assert cache.get("2") == 2
+
+
+class TestVerifiedTokens:
+    def test_cached_after_first_decode(self) -> None:
+        token = create_access_token(42)
+        first = get_token_data(token)
+        assert first.sub == 42
+        assert get_token_data(token) is first
+
+    def test_expired_entry_is_not_served(self) -> None:
+        token = create_access_token(42, expires_delta=timedelta(seconds=-1))
+        digest = hashlib.sha256(token.encode()).digest()
+        verified_tokens.set(digest, (get_token_data(create_access_token(42)), 0))
+        with pytest.raises(HTTPException):
+            get_token_data(token)
+
+    def test_invalid_token_is_not_cached(self) -> None:
+        token = create_access_token(42)[:-2] + "xx"
+        for _ in range(2):
+            with pytest.raises(HTTPException):
+                get_token_data(token)
+        assert verified_tokens.get(hashlib.sha256(token.encode()).digest()) is None
+
+    def test_concurrent_validation(self) -> None:
+        tokens = {user_id: create_access_token(user_id) for user_id in range(50)}
+
+        def validate(user_id: int) -> bool:
+            return get_token_data(tokens[user_id % 50]).sub == user_id % 50
+
+        with ThreadPoolExecutor(8) as executor:
+            assert all(executor.map(validate, range(5000)))
@@ -0,0 +1,129 @@
+import time
+
+import anyio
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError, OperationalError
+
+from app.api import deps
+from app.core.config import settings
+from app.core.deadline import (
+    Deadline,
+    DeadlineExceeded,
+    current_deadline,
+    database_error_handler,
+    deadline_exceeded_handler,
+    statement_timeout_ms,
+)
+from app.core.middleware import DeadlineMiddleware
+from app.db.session import SessionLocal
+
+
+@pytest.fixture
+def app(monkeypatch) -> FastAPI:
+    monkeypatch.setattr(settings, "REQUEST_TIMEOUT_SECONDS", 0.2)
+    app = FastAPI()
+    app.add_middleware(DeadlineMiddleware)
+    app.add_exception_handler(DeadlineExceeded, deadline_exceeded_handler)
+    app.add_exception_handler(DBAPIError, database_error_handler)
+
+    @app.get("/sleep")
+    async def sleep(seconds: float) -> float:
+        await anyio.sleep(seconds)
+        return seconds
+
+    @app.get("/sleep-sync")
+    def sleep_sync(seconds: float) -> float:
+        time.sleep(seconds)
+        return seconds
+
+    @app.get("/sleep-longer", dependencies=[Depends(deps.deadline(1))])
+    async def sleep_longer(seconds: float) -> float:
+        await anyio.sleep(seconds)
+        return seconds
+
+    @app.get("/stream")
+    def stream() -> StreamingResponse:
+        def chunks():
+            yield b"a"
+            time.sleep(0.3)
+            yield b"b"
+
+        return StreamingResponse(chunks())
+
+    @app.get("/pg-sleep")
+    def pg_sleep(seconds: float) -> float:
+        with SessionLocal() as db:
+            db.execute(text("SELECT pg_sleep(:seconds)"), {"seconds": seconds})
+        return seconds
+
+    return app
+
+
+class TestDeadline:
+    def test_remaining(self) -> None:
+        deadline = Deadline(10)
+        assert 9 < deadline.remaining() <= 10
+        deadline.set(None)
+        assert deadline.remaining() is None
+
+    def test_expired(self) -> None:
+        deadline = Deadline(0)
+        with pytest.raises(DeadlineExceeded):
+            deadline.remaining()
+
+    def test_statement_timeout_ms(self) -> None:
+        assert statement_timeout_ms() is None
+        token = current_deadline.set(Deadline(1.5))
+        try:
+            assert 1400 < statement_timeout_ms() <= 1500
+        finally:
+            current_deadline.reset(token)
+
+
+class TestDeadlineMiddleware:
+    def test_within_deadline(self, app: FastAPI) -> None:
+        r = TestClient(app).get("/sleep", params={"seconds": 0})
+        assert r.status_code == 200
+
+    def test_past_deadline(self, app: FastAPI) -> None:
+        start = time.monotonic()
+        r = TestClient(app).get("/sleep", params={"seconds": 5})
+        assert r.status_code == 504
+        assert r.json() == {"detail": "Request deadline exceeded."}
+        assert time.monotonic() - start < 1
+
+    def test_late_threadpool_response(self, app: FastAPI) -> None:
+        r = TestClient(app).get("/sleep-sync", params={"seconds": 0.4})
+        assert r.status_code == 504
+
+    def test_route_deadline(self, app: FastAPI) -> None:
+        r = TestClient(app).get("/sleep-longer", params={"seconds": 0.4})
+        assert r.status_code == 200
+        r = TestClient(app).get("/sleep-longer", params={"seconds": 5})
+        assert r.status_code == 504
+
+    def test_streamed_body_is_not_bounded(self, app: FastAPI) -> None:
+        r = TestClient(app).get("/stream")
+        assert r.content == b"ab"
+
+    def test_statement_timeout(self, app: FastAPI) -> None:
+        start = time.monotonic()
+        r = TestClient(app).get("/pg-sleep", params={"seconds": 5})
+        assert r.status_code == 504
+        assert time.monotonic() - start < 1
+
+    def test_statement_timeout_is_local(self) -> None:
+        token = current_deadline.set(Deadline(0.1))
+        try:
+            with SessionLocal() as db:
+                with pytest.raises(OperationalError):
+                    db.execute(text("SELECT pg_sleep(1)"))
+                db.rollback()
+                current_deadline.get().set(None)
+                assert db.scalar(text("SHOW statement_timeout")) == "0"
+        finally:
+            current_deadline.reset(token)
@@ -0,0 +1,85 @@
+import time
+from typing import Iterator
+
+import anyio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.calibrate_hashing import MIN_ROUNDS, calibrate
+from app.core.deadline import Deadline, DeadlineExceeded, current_deadline
+from app.core.hashing import HashingBusy, HashingPool, hashing_busy_handler
+from app.core.security import get_password_hash, verify_password
+
+
+@pytest.fixture(scope="module")
+def pool() -> Iterator[HashingPool]:
+    with HashingPool(1, queue_size=1) as pool:
+        yield pool
+
+
+class TestHashingPool:
+    def test_run(self, pool: HashingPool) -> None:
+        hashed_password = pool.run(get_password_hash, "secret")
+        assert pool.run(verify_password, "secret", hashed_password)
+        assert not pool.run(verify_password, "wrong", hashed_password)
+
+    def test_run_async(self, pool: HashingPool) -> None:
+        async def check() -> bool:
+            hashed_password = await pool.run_async(get_password_hash, "secret")
+            return await pool.run_async(verify_password, "secret", hashed_password)
+
+        assert anyio.run(check)
+
+    def test_busy(self, pool: HashingPool) -> None:
+        running = pool.submit(time.sleep, 0.5)
+        queued = pool.submit(time.sleep, 0)
+        with pytest.raises(HashingBusy):
+            pool.submit(time.sleep, 0)
+        running.result()
+        queued.result()
+        pool.submit(time.sleep, 0).result()
+
+    def test_deadline(self, pool: HashingPool) -> None:
+        token = current_deadline.set(Deadline(0.1))
+        try:
+            with pytest.raises(DeadlineExceeded):
+                pool.run(time.sleep, 1)
+        finally:
+            current_deadline.reset(token)
+
+    def test_map(self, pool: HashingPool) -> None:
+        assert list(pool.map(abs, [-1, -2, 3], window=2)) == [1, 2, 3]
+
+    def test_map_waits_for_slots(self, pool: HashingPool) -> None:
+        running = pool.submit(time.sleep, 0.2)
+        queued = pool.submit(time.sleep, 0)
+        assert list(pool.map(abs, [-1, -2])) == [1, 2]
+        assert running.done() and queued.done()
+
+    def test_map_deadline(self, pool: HashingPool) -> None:
+        token = current_deadline.set(Deadline(0.1))
+        try:
+            with pytest.raises(DeadlineExceeded):
+                list(pool.map(time.sleep, [1]))
+        finally:
+            current_deadline.reset(token)
+
+
+def test_calibrate() -> None:
+    rounds, timings = calibrate(budget=0, samples=1)
+    assert rounds == MIN_ROUNDS
+    assert [cost for cost, _ in timings] == [MIN_ROUNDS]
+
+
+def test_busy_response() -> None:
+    app = FastAPI()
+    app.add_exception_handler(HashingBusy, hashing_busy_handler)
+
+    @app.get("/busy")
+    def busy() -> None:
+        raise HashingBusy
+
+    r = TestClient(app).get("/busy")
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "1"
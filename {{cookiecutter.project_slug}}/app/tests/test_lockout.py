@@ -0,0 +1,51 @@
+import pytest
+
+from app.core.lockout import LoginLockout
+from app.tests.utils.utils import closed_breaker, unreachable_redis
+
+
+@pytest.fixture
+def lockout() -> LoginLockout:
+    # Without Redis, failures are counted in memory.
+    return LoginLockout(
+        unreachable_redis(),
+        closed_breaker(),
+        account_failures=3,
+        ip_failures=5,
+        base_seconds=10,
+        max_seconds=60,
+        window_seconds=60,
+    )
+
+
+class TestLoginLockout:
+    def test_account_lockout(self, lockout: LoginLockout) -> None:
+        for _ in range(2):
+            assert lockout.record_failure("User@Email.com", None) == 0
+        assert lockout.retry_after("user@email.com", None) == 0
+        assert lockout.record_failure("user@email.com", None) == 10
+        assert 9 < lockout.retry_after(" USER@email.com", None) <= 10
+        assert lockout.retry_after("other@email.com", None) == 0
+
+    def test_exponential(self, lockout: LoginLockout) -> None:
+        seconds = [lockout.record_failure("user@email.com", None) for _ in range(6)]
+        assert seconds == [0, 0, 10, 20, 40, 60]
+
+    def test_ip_lockout(self, lockout: LoginLockout) -> None:
+        for index in range(5):
+            lockout.record_failure(f"user{index}@email.com", "10.0.0.1")
+        assert lockout.retry_after("new@email.com", "10.0.0.1") > 0
+        assert lockout.retry_after("new@email.com", "10.0.0.2") == 0
+
+    def test_reset(self, lockout: LoginLockout) -> None:
+        for _ in range(3):
+            lockout.record_failure("user@email.com", "10.0.0.1")
+        lockout.reset("user@email.com")
+        assert lockout.retry_after("user@email.com", None) == 0
+        assert lockout.record_failure("user@email.com", None) == 0
+
+    def test_disabled(self, lockout: LoginLockout) -> None:
+        lockout.account_failures = 0
+        for _ in range(5):
+            assert lockout.record_failure("user@email.com", None) == 0
+        assert lockout.retry_after("user@email.com", None) == 0
@@ -0,0 +1,151 @@
+from collections import Counter
+from typing import Any, List
+
+import pytest
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from redis.asyncio import Redis as AsyncRedis
+
+from app.api import deps
+from app.core.middleware import RateLimitMiddleware
+from app.core.rate_limit import RedisRateLimiter, TwoTierLimiter, parse_rate
+from app.tests.utils.utils import closed_breaker, unreachable_redis
+
+
+class SharedCounters:
+    """The Redis commands the limiter syncs with, over one shared Counter."""
+
+    def __init__(self, counters: Counter):
+        self.counters = counters
+        self.commands: List[Any] = []
+
+    def pipeline(self, transaction: bool = True) -> "SharedCounters":
+        return SharedCounters(self.counters)
+
+    def incrby(self, key: str, amount: int) -> None:
+        self.commands.append(("incrby", key, amount))
+
+    def expire(self, key: str, seconds: int) -> None:
+        self.commands.append(("expire", key, seconds))
+
+    def execute(self) -> List[Any]:
+        results = []
+        for command, key, value in self.commands:
+            if command == "incrby":
+                self.counters[key] += value
+                results.append(self.counters[key])
+            else:
+                results.append(True)
+        return results
+
+
+def limiter(rate: str = "10/minute", redis: Any = None) -> TwoTierLimiter:
+    # Without Redis, each worker limits alone.
+    return TwoTierLimiter(
+        redis or unreachable_redis(), closed_breaker(), rate, sync_seconds=60
+    )
+
+
+def test_parse_rate() -> None:
+    assert parse_rate("1000/minute") == (1000, 60)
+    assert parse_rate("10 per seconds") == (10, 1)
+    with pytest.raises(ValueError):
+        parse_rate("often")
+
+
+class TestTwoTierLimiter:
+    def test_local_limit(self) -> None:
+        local = limiter()
+        assert all(local.hit("10.0.0.1") == 0 for _ in range(10))
+        assert 5 < local.hit("10.0.0.1") <= 6
+        assert local.hit("10.0.0.2") == 0
+
+    def test_sync_without_redis(self) -> None:
+        local = limiter()
+        local.hit("10.0.0.1")
+        local.sync()
+        assert local.hit("10.0.0.1") == 0
+
+    def test_global_limit(self) -> None:
+        counters: Counter = Counter()
+        workers = [limiter(redis=SharedCounters(counters)) for _ in range(2)]
+        for _ in range(6):
+            assert workers[0].hit("10.0.0.1") == 0
+        workers[0].sync()
+        for _ in range(4):
+            assert workers[1].hit("10.0.0.1") == 0
+        workers[1].sync()
+        assert workers[1].hit("10.0.0.1") > 0
+        workers[0].sync()
+        assert workers[0].hit("10.0.0.1") == 0
+        workers[0].sync()
+        assert workers[0].hit("10.0.0.1") > 0
+
+
+def test_middleware() -> None:
+    app = FastAPI()
+    app.add_middleware(
+        RateLimitMiddleware, limiter=limiter("2/minute"), exempt={"/health"}
+    )
+
+    @app.get("/")
+    def index() -> None:
+        return None
+
+    @app.get("/health")
+    def health() -> None:
+        return None
+
+    client = TestClient(app)
+    assert [client.get("/").status_code for _ in range(3)] == [200, 200, 429]
+    r = client.get("/")
+    assert r.json() == {"detail": "Too many requests. Please try again later."}
+    assert int(r.headers["Retry-After"]) >= 1
+    assert client.get("/health").status_code == 200
+
+
+def redis_limiter(server: FakeServer, rate: str = "10/minute") -> RedisRateLimiter:
+    return RedisRateLimiter(FakeRedis(server=server), closed_breaker(), rate)
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.mark.anyio
+class TestRedisRateLimiter:
+    async def test_shared_limit(self) -> None:
+        server = FakeServer()
+        workers = [redis_limiter(server), redis_limiter(server)]
+        for index in range(10):
+            assert await workers[index % 2].hit("10.0.0.1") == 0
+        assert 5 < await workers[0].hit("10.0.0.1") <= 6
+        assert 5 < await workers[1].hit("10.0.0.1") <= 6
+        assert await workers[1].hit("10.0.0.2") == 0
+
+    async def test_without_redis(self) -> None:
+        local = RedisRateLimiter(
+            AsyncRedis.from_url("redis://127.0.0.1:1/0"), closed_breaker(), "2/minute"
+        )
+        assert await local.hit("10.0.0.1") == 0
+        assert await local.hit("10.0.0.1") == 0
+        assert 29 < await local.hit("10.0.0.1") <= 30
+
+
+def test_rate_limit_dependency() -> None:
+    app = FastAPI()
+    limit = deps.rate_limit(redis_limiter(FakeServer(), "2/minute"), "Slow down.")
+
+    @app.post("/login", dependencies=[Depends(limit)])
+    def login() -> None:
+        return None
+
+    with TestClient(app) as client:
+        statuses = [client.post("/login").status_code for _ in range(3)]
+        r = client.post("/login")
+    assert statuses == [200, 200, 429]
+    assert r.json() == {"detail": "Slow down."}
+    assert 29 <= int(r.headers["Retry-After"]) <= 30
@@ -0,0 +1,92 @@
+import time
+
+import pytest
+from fakeredis import FakeConnection, FakeServer
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from redis import BlockingConnectionPool, RedisError
+
+from app.core.redis import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpen,
+    pool_snapshot,
+    redis_unavailable_handler,
+)
+
+
+def fail(breaker: CircuitBreaker) -> None:
+    with pytest.raises(RedisError):
+        with breaker.guard():
+            raise RedisError("down")
+
+
+class TestCircuitBreaker:
+    def test_opens_after_failures(self) -> None:
+        breaker = CircuitBreaker("test", failures=2, reset_seconds=60, slow_seconds=1)
+        fail(breaker)
+        assert breaker.state == CLOSED
+        fail(breaker)
+        assert breaker.state == OPEN
+        with pytest.raises(CircuitOpen):
+            with breaker.guard():
+                pytest.fail("Redis called while the circuit is open.")
+        snapshot = breaker.snapshot()
+        assert snapshot["calls"] == 2
+        assert snapshot["rejected"] == 1
+        assert snapshot["opened"] == 1
+
+    def test_slow_calls_fail(self) -> None:
+        breaker = CircuitBreaker("test", failures=1, reset_seconds=60, slow_seconds=0)
+        with breaker.guard():
+            time.sleep(0.001)
+        assert breaker.state == OPEN
+
+    def test_other_errors_do_not_count(self) -> None:
+        breaker = CircuitBreaker("test", failures=1, reset_seconds=60, slow_seconds=1)
+        with pytest.raises(ValueError):
+            with breaker.guard():
+                raise ValueError("not Redis")
+        assert breaker.state == CLOSED
+
+    def test_trial_after_reset(self) -> None:
+        breaker = CircuitBreaker("test", failures=1, reset_seconds=0, slow_seconds=1)
+        fail(breaker)
+        assert breaker.state == HALF_OPEN
+        fail(breaker)
+        assert breaker.snapshot()["opened"] == 2
+        with breaker.guard():
+            pass
+        assert breaker.state == CLOSED
+        assert breaker.snapshot()["consecutive_failures"] == 0
+
+
+def test_pool_snapshot() -> None:
+    pool = BlockingConnectionPool(
+        max_connections=4, connection_class=FakeConnection, server=FakeServer()
+    )
+    connection = pool.get_connection("PING")
+    assert pool_snapshot("test", pool) == {
+        "name": "test",
+        "max_connections": 4,
+        "in_use": 1,
+        "idle": 0,
+        "utilization": 0.25,
+    }
+    pool.release(connection)
+    assert pool_snapshot("test", pool)["idle"] == 1
+
+
+def test_unavailable_response() -> None:
+    app = FastAPI()
+    app.add_exception_handler(RedisError, redis_unavailable_handler)
+
+    @app.get("/open")
+    def circuit_open() -> None:
+        raise CircuitOpen("The test circuit is open.")
+
+    r = TestClient(app).get("/open")
+    assert r.status_code == 503
+    assert int(r.headers["Retry-After"]) >= 1
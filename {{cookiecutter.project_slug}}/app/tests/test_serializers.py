@@ -0,0 +1,55 @@
+import json
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, literal, select
+
+from app import schemas
+from app.core.enums import UserPermissionEnum
+from app.models.user import User
+
+users_adapter = TypeAdapter(List[schemas.User])
+
+
+def user(index: int) -> User:
+    return User(
+        id=index,
+        first_name=None,
+        last_name="Last",
+        cpf=f"{index:011d}",
+        email=f"user{index}@example.com",
+        phone=f"{index:010d}",
+        permission=UserPermissionEnum.USER.value,
+        hashed_password="secret",
+        is_active=True,
+        is_superuser=False,
+    )
+
+
+class TestUserSerializer:
+    def test_orm_objects_match_response_model(self) -> None:
+        users = [user(1), user(2)]
+        expected = users_adapter.dump_python(
+            users_adapter.validate_python(users, from_attributes=True), mode="json"
+        )
+        assert json.loads(schemas.user_serializer.dump_json_many(users)) == expected
+        assert "hashed_password" not in json.loads(
+            schemas.user_serializer.dump_json(users[0])
+        )
+
+    def test_rows(self) -> None:
+        values = schemas.User.model_validate(user(1)).model_dump(mode="json")
+        engine = create_engine("sqlite://")
+        with engine.connect() as connection:
+            row = connection.execute(
+                select(*(literal(value).label(key) for key, value in values.items()))
+            ).one()
+        assert json.loads(schemas.user_serializer.dump_json(row)) == values
+
+    def test_response(self) -> None:
+        response = schemas.user_serializer.response_many(
+            [user(1)], headers={"X-Next-Cursor": "next"}
+        )
+        assert response.media_type == "application/json"
+        assert response.headers["X-Next-Cursor"] == "next"
+        assert json.loads(response.body)[0]["email"] == "user1@example.com"
@@ -0,0 +1,69 @@
+import pytest
+from fastapi import HTTPException
+from redis import RedisError
+
+from app.api import deps
+from app.core.security import create_access_token
+from app.core.tokens import REFRESH_SCOPE, BloomFilter, RevocationList
+from app.tests.utils.utils import (
+    closed_breaker,
+    get_token_data,
+    unreachable_redis,
+)
+
+
+@pytest.fixture
+def revocations() -> RevocationList:
+    # Without Redis, filter hits can not be confirmed.
+    return RevocationList(
+        unreachable_redis(), closed_breaker(), capacity=1000, error_rate=0.01
+    )
+
+
+class TestBloomFilter:
+    def test_no_false_negatives(self) -> None:
+        bloom = BloomFilter(1000, 0.01)
+        keys = [f"revoked-{index}" for index in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        assert all(key in bloom for key in keys)
+
+    def test_false_positive_rate(self) -> None:
+        bloom = BloomFilter(1000, 0.01)
+        for index in range(1000):
+            bloom.add(f"revoked-{index}")
+        hits = sum(f"valid-{index}" in bloom for index in range(10_000))
+        assert hits < 300
+
+
+class TestRevocationList:
+    def test_filter_miss_skips_redis(self, revocations: RevocationList) -> None:
+        assert not revocations.may_be_revoked("valid")
+        assert not revocations.is_revoked("valid")
+
+    def test_unconfirmed_hit_is_revoked(self, revocations: RevocationList) -> None:
+        revocations._apply(["revoked"])
+        assert revocations.is_revoked("revoked")
+
+    def test_revoke_needs_redis(self, revocations: RevocationList) -> None:
+        with pytest.raises(RedisError):
+            revocations.revoke("revoked", 0)
+
+
+class TestGetTokenData:
+    def test_refresh_token_is_not_an_access_token(self) -> None:
+        token = create_access_token(42, claims={"scope": REFRESH_SCOPE})
+        with pytest.raises(HTTPException) as exc_info:
+            get_token_data(token)
+        assert exc_info.value.status_code == 403
+
+    def test_revoked_token(
+        self, revocations: RevocationList, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(deps, "revoked_tokens", revocations)
+        token = create_access_token(42)
+        token_data = get_token_data(token)
+        revocations._apply([token_data.jti])
+        with pytest.raises(HTTPException) as exc_info:
+            get_token_data(token)
+        assert exc_info.value.detail == "Token has been revoked."
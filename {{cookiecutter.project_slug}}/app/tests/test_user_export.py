@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+import resource
+from typing import Iterator, List, Tuple
+
+import pytest
+
+from app.core.enums import FileFormatEnum
+from app.user_export import EXPORT_COLUMNS, FORMATTERS, csv_chunks, ndjson_chunks
+
+ROWS = 1_000_000
+BATCH_SIZE = 1000
+
+
+def synthetic_batches(rows: int) -> Iterator[List[Tuple]]:
+    for start in range(0, rows, BATCH_SIZE):
+        yield [
+            (
+                index,
+                "First",
+                "Last",
+                f"user{index}@example.com",
+                f"{index:011d}",
+                f"{index:010d}",
+                "User",
+                True,
+                False,
+            )
+            for index in range(start, min(start + BATCH_SIZE, rows))
+        ]
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class TestUserExport:
+    def test_ndjson(self) -> None:
+        body = b"".join(ndjson_chunks(synthetic_batches(2), EXPORT_COLUMNS))
+        lines = [json.loads(line) for line in body.decode().splitlines()]
+        assert [line["email"] for line in lines] == [
+            "user0@example.com",
+            "user1@example.com",
+        ]
+        assert lines[0]["is_active"] is True
+
+    def test_csv(self) -> None:
+        body = b"".join(csv_chunks(synthetic_batches(2), EXPORT_COLUMNS))
+        rows = list(csv.reader(io.StringIO(body.decode())))
+        assert rows[0] == list(EXPORT_COLUMNS)
+        assert len(rows) == 3
+
+    def test_csv_without_rows_has_header(self) -> None:
+        body = b"".join(csv_chunks(iter([]), EXPORT_COLUMNS))
+        assert body.decode().strip() == ",".join(EXPORT_COLUMNS)
+
+    @pytest.mark.parametrize("export_format", list(FileFormatEnum))
+    def test_million_rows_in_constant_memory(
+        self, export_format: FileFormatEnum
+    ) -> None:
+        before = peak_rss_mb()
+        size = 0
+        for chunk in FORMATTERS[export_format](synthetic_batches(ROWS), EXPORT_COLUMNS):
+            size += len(chunk)
+        # The output is larger than the RSS budget, so it can not have been buffered.
+        assert size > 64 * 1024 * 1024
+        assert peak_rss_mb() - before < 50
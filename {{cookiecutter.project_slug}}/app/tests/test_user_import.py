@@ -0,0 +1,73 @@
+import io
+import json
+
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.enums import FileFormatEnum
+from app.core.hashing import HashingPool
+from app.core.security import verify_password
+from app.tests.utils.user import random_user_in
+from app.user_import import guess_format, import_users, validated_chunks
+
+CSV_HEADER = "email,cpf,phone,permission,password\n"
+
+
+def csv_line(**overrides: str) -> str:
+    user_in = random_user_in(**overrides)
+    return (
+        f"{user_in.email},{user_in.cpf},{user_in.phone},"
+        f"{user_in.permission.value},{user_in.password}\n"
+    )
+
+
+class TestUserImport:
+    def test_guess_format(self) -> None:
+        assert guess_format("users.CSV") == FileFormatEnum.CSV
+        assert guess_format("users.ndjson") == FileFormatEnum.NDJSON
+        assert guess_format(None) == FileFormatEnum.NDJSON
+
+    def test_validated_chunks_csv(self) -> None:
+        duplicate = random_user_in()
+        stream = io.StringIO(
+            CSV_HEADER
+            + csv_line(email=duplicate.email)
+            + "not-an-email,1,1,User,secret\n"
+            + csv_line(email=duplicate.email)
+            + csv_line()
+        )
+        chunks = list(validated_chunks(stream, FileFormatEnum.CSV, chunk_size=3))
+        assert [len(chunk) for chunk, _ in chunks] == [1, 1]
+        errors = [error for _, chunk_errors in chunks for error in chunk_errors]
+        assert [error.line for error in errors] == [3, 4]
+        assert errors[0].detail.startswith("email:")
+
+    def test_validated_chunks_ndjson(self) -> None:
+        user_in = random_user_in()
+        stream = io.StringIO(
+            user_in.model_dump_json() + "\n\n" + "{not json\n" + "[1, 2]\n"
+        )
+        ((chunk, errors),) = validated_chunks(
+            stream, FileFormatEnum.NDJSON, chunk_size=100
+        )
+        assert [(line, user.email) for line, user in chunk] == [(1, user_in.email)]
+        assert [error.line for error in errors] == [3, 4]
+
+    def test_import_users(self, db: Session) -> None:
+        existing = crud.user.create(db, obj_in=random_user_in())
+        users_in = [random_user_in() for _ in range(3)]
+        stream = io.StringIO(
+            "".join(user_in.model_dump_json() + "\n" for user_in in users_in)
+            + json.dumps(random_user_in(email=existing.email).model_dump(mode="json"))
+            + "\n"
+        )
+        with HashingPool(2) as pool:
+            result = import_users(
+                stream, FileFormatEnum.NDJSON, chunk_size=2, pool=pool
+            )
+        assert result.inserted == 3
+        assert result.failed == 1
+        assert result.errors[0].line == 4
+        user = crud.user.get_by_email(db, email=users_in[0].email)
+        assert user
+        assert verify_password(users_in[0].password, user.hashed_password)
@@ -0,0 +1,61 @@
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.db.instrumentation import QueryStats, track_queries
+from app.db.session import engine as primary_engine
+
+
+@dataclass
+class StatementLog:
+    statements: List[str] = field(default_factory=list)
+    commits: int = 0
+
+    @property
+    def writes(self) -> List[str]:
+        return [
+            s
+            for s in self.statements
+            if not s.lstrip().upper().startswith(("SELECT", "SET"))
+        ]
+
+
+@contextmanager
+def count_statements(engine: Engine = primary_engine) -> Iterator[StatementLog]:
+    """Record the statements and commits sent through `engine`."""
+    log = StatementLog()
+
+    def before_cursor_execute(
+        conn: Any, cursor: Any, statement: str, *args: Any
+    ) -> None:
+        log.statements.append(statement)
+
+    def commit(conn: Any) -> None:
+        log.commits += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "commit", commit)
+    try:
+        yield log
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+        event.remove(engine, "commit", commit)
+
+
+@contextmanager
+def query_budget(
+    max_statements: int, *, max_repeats: Optional[int] = None
+) -> Iterator[QueryStats]:
+    """Fail when the block runs more statements, or repeats one more, than allowed.
+
+    Use it around a test client call to pin the query count of an endpoint,
+    so an N+1 creeping in breaks the test instead of production latency.
+    """
+    with track_queries() as stats:
+        yield stats
+    assert stats.statements <= max_statements, stats.describe()
+    if max_repeats is not None:
+        assert stats.max_repeats <= max_repeats, stats.describe()
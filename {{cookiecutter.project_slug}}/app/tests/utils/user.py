@@ -8,7 +8,12 @@ from app.core.config import settings
 from app.core.enums import UserPermissionEnum
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
-from app.tests.utils.utils import random_cpf, random_email, random_lower_string
+from app.tests.utils.utils import (
+    random_cpf,
+    random_email,
+    random_lower_string,
+    random_phone,
+)
 
 
 def user_authentication_headers(
@@ -22,6 +27,18 @@ def user_authentication_headers(
     return headers
 
 
+def random_user_in(**kwargs) -> UserCreate:
+    data = {
+        "cpf": random_cpf(),
+        "email": random_email(),
+        "phone": random_phone(),
+        "permission": UserPermissionEnum.USER.value,
+        "password": random_lower_string(),
+    }
+    data.update(kwargs)
+    return UserCreate(**data)
+
+
 def create_random_user(db: Session) -> User:
     email = random_email()
     cpf = random_cpf()
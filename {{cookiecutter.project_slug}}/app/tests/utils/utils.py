@@ -3,9 +3,29 @@ import secrets
 import string
 from typing import Dict
 
+import anyio
 from fastapi.testclient import TestClient
+from redis import Redis
 
+from app import schemas
+from app.api import deps
 from app.core.config import settings
+from app.core.redis import CircuitBreaker
+
+
+def unreachable_redis() -> Redis:
+    # Nothing listens on port 1, so every call fails at once.
+    return Redis.from_url("redis://127.0.0.1:1/0", socket_connect_timeout=1)
+
+
+def closed_breaker() -> CircuitBreaker:
+    # Never opens, so each call reaches the client.
+    return CircuitBreaker("test", failures=0, reset_seconds=0, slow_seconds=60)
+
+
+def get_token_data(token: str) -> schemas.TokenPayload:
+    # The dependency is async; run it on an event loop of its own.
+    return anyio.run(deps.get_token_data, token)
 
 
 def random_lower_string() -> str:
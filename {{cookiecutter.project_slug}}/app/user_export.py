@@ -0,0 +1,102 @@
+"""Streaming user export as NDJSON or CSV."""
+
+import csv
+import io
+import json
+from typing import Callable, Dict, Iterable, Iterator, Sequence
+
+from sqlalchemy.engine import Row
+
+from app import crud
+from app.core.enums import FileFormatEnum
+from app.db.session import ReadSessionLocal, SessionLocal, replicas
+
+EXPORT_COLUMNS = (
+    "id",
+    "first_name",
+    "last_name",
+    "email",
+    "cpf",
+    "phone",
+    "permission",
+    "is_active",
+    "is_superuser",
+)
+
+MEDIA_TYPES = {
+    FileFormatEnum.NDJSON: "application/x-ndjson",
+    FileFormatEnum.CSV: "text/csv",
+}
+
+
+def ndjson_chunks(
+    batches: Iterable[Sequence[Row]], columns: Sequence[str]
+) -> Iterator[bytes]:
+    """Encode batches of rows as NDJSON, one chunk per batch.
+
+    Args:
+        batches (Iterable[Sequence[Row]]): The batches of rows.
+        columns (Sequence[str]): The column names, in row order.
+
+    Yields:
+        Iterator[bytes]: The encoded chunks.
+    """
+    for batch in batches:
+        yield "".join(
+            json.dumps(dict(zip(columns, row)), separators=(",", ":")) + "\n"
+            for row in batch
+        ).encode()
+
+
+def csv_chunks(
+    batches: Iterable[Sequence[Row]], columns: Sequence[str]
+) -> Iterator[bytes]:
+    """Encode batches of rows as CSV with a header line, one chunk per batch.
+
+    Args:
+        batches (Iterable[Sequence[Row]]): The batches of rows.
+        columns (Sequence[str]): The column names, in row order.
+
+    Yields:
+        Iterator[bytes]: The encoded chunks.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+Formatter = Callable[[Iterable[Sequence[Row]], Sequence[str]], Iterator[bytes]]
+
+FORMATTERS: Dict[FileFormatEnum, Formatter] = {
+    FileFormatEnum.NDJSON: ndjson_chunks,
+    FileFormatEnum.CSV: csv_chunks,
+}
+
+
+def export_users(
+    export_format: FileFormatEnum, *, batch_size: int = 1000
+) -> Iterator[bytes]:
+    """Stream every user in `export_format`.
+
+    The request session is released before the response body is sent, so the
+    stream reads through a session of its own, on a replica when one is healthy.
+
+    Args:
+        export_format (FileFormatEnum): The export format.
+        batch_size (int, optional): The number of rows per chunk. Defaults to 1000.
+
+    Yields:
+        Iterator[bytes]: The encoded chunks.
+    """
+    replica = replicas.choose()
+    db = ReadSessionLocal(bind=replica) if replica is not None else SessionLocal()
+    with db:
+        batches = crud.user.stream(db, columns=EXPORT_COLUMNS, batch_size=batch_size)
+        yield from FORMATTERS[export_format](batches, EXPORT_COLUMNS)
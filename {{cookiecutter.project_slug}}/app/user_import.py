@@ -0,0 +1,301 @@
+"""Bulk user import: validate in chunks, hash in parallel, COPY and merge.
+
+    python -m app.user_import users.csv --chunk-size 5000 --workers 8
+"""
+
+import argparse
+import csv
+import io
+import json
+import logging
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    TextIO,
+    Tuple,
+)
+
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app import schemas
+from app.core.enums import FileFormatEnum
+from app.core.hashing import HashingPool, hashing_pool
+from app.core.security import get_password_hash
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+MAX_REPORTED_ERRORS = 1000
+
+CREATE_STAGING = text(
+    """
+    CREATE TEMPORARY TABLE user_import (
+        line integer,
+        first_name text,
+        last_name text,
+        cpf text,
+        email text,
+        phone text,
+        permission text,
+        hashed_password text,
+        is_active boolean,
+        is_superuser boolean
+    ) ON COMMIT DROP
+    """
+)
+
+COPY_STAGING = "COPY user_import FROM STDIN WITH (FORMAT csv)"
+
+# Emails are unique within a chunk, so the staged rows missing from RETURNING
+# are exactly the ones skipped by ON CONFLICT.
+MERGE_STAGING = text(
+    """
+    WITH inserted AS (
+        INSERT INTO users (
+            first_name, last_name, cpf, email, phone, permission,
+            hashed_password, is_active, is_superuser
+        )
+        SELECT
+            first_name, last_name, cpf, email, phone, permission,
+            hashed_password, COALESCE(is_active, true), is_superuser
+        FROM user_import
+        ORDER BY line
+        ON CONFLICT DO NOTHING
+        RETURNING email
+    )
+    SELECT line FROM user_import
+    WHERE email NOT IN (SELECT email FROM inserted)
+    ORDER BY line
+    """
+)
+
+Chunk = List[Tuple[int, schemas.UserCreate]]
+
+
+def guess_format(filename: Optional[str]) -> FileFormatEnum:
+    """Guess the file format from its name, defaulting to NDJSON.
+
+    Args:
+        filename (Optional[str]): The file name.
+
+    Returns:
+        FileFormatEnum: The file format.
+    """
+    if filename and filename.lower().endswith(".csv"):
+        return FileFormatEnum.CSV
+    return FileFormatEnum.NDJSON
+
+
+def read_records(
+    stream: TextIO, file_format: FileFormatEnum
+) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+    """Read raw records with their line numbers.
+
+    Empty CSV cells are left out so optional fields get their defaults.
+
+    Args:
+        stream (TextIO): The text stream.
+        file_format (FileFormatEnum): The file format.
+
+    Yields:
+        Iterator[Tuple[int, Optional[Dict[str, Any]]]]: The line number and the record, None when unreadable.
+    """
+    if file_format == FileFormatEnum.CSV:
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, {k: v for k, v in record.items() if v != ""}
+        return
+    for line, raw in enumerate(stream, start=1):
+        if not raw.strip():
+            continue
+        try:
+            record = json.loads(raw)
+        except ValueError:
+            record = None
+        yield line, record if isinstance(record, dict) else None
+
+
+def validated_chunks(
+    stream: TextIO, file_format: FileFormatEnum, chunk_size: int
+) -> Iterator[Tuple[Chunk, List[schemas.ImportLineError]]]:
+    """Validate records with the UserCreate rules, `chunk_size` records at a time.
+
+    Args:
+        stream (TextIO): The text stream.
+        file_format (FileFormatEnum): The file format.
+        chunk_size (int): The number of records per chunk.
+
+    Yields:
+        Iterator[Tuple[Chunk, List[schemas.ImportLineError]]]: The valid users and the errors of each chunk.
+    """
+    chunk: Chunk = []
+    errors: List[schemas.ImportLineError] = []
+    seen: Set[Tuple[str, str]] = set()
+    count = 0
+    for line, record in read_records(stream, file_format):
+        count += 1
+        if record is None:
+            errors.append(schemas.ImportLineError(line=line, detail="Invalid record."))
+        else:
+            try:
+                user_in = schemas.UserCreate.model_validate(record)
+            except ValidationError as e:
+                detail = "; ".join(
+                    f"{'.'.join(map(str, error['loc']))}: {error['msg']}"
+                    for error in e.errors()
+                )
+                errors.append(schemas.ImportLineError(line=line, detail=detail))
+            else:
+                keys = {
+                    ("email", user_in.email),
+                    ("cpf", user_in.cpf),
+                    ("phone", user_in.phone),
+                }
+                if keys & seen:
+                    errors.append(
+                        schemas.ImportLineError(
+                            line=line,
+                            detail="Duplicate email, CPF or phone in the file.",
+                        )
+                    )
+                else:
+                    seen |= keys
+                    chunk.append((line, user_in))
+        if count == chunk_size:
+            yield chunk, errors
+            chunk, errors, seen, count = [], [], set(), 0
+    if count:
+        yield chunk, errors
+
+
+def copy_chunk(db: Session, chunk: Chunk, hashes: Iterable[str]) -> List[int]:
+    """COPY a chunk into a staging table and merge it into users in one transaction.
+
+    Args:
+        db (Session): The database session.
+        chunk (Chunk): The valid users with their line numbers.
+        hashes (Iterable[str]): The password hashes, in chunk order.
+
+    Returns:
+        List[int]: The lines skipped because the user already exists.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for (line, user_in), hashed_password in zip(chunk, hashes):
+        writer.writerow(
+            (
+                line,
+                user_in.first_name,
+                user_in.last_name,
+                user_in.cpf,
+                user_in.email,
+                user_in.phone,
+                user_in.permission.value,
+                hashed_password,
+                user_in.is_active,
+                user_in.is_superuser,
+            )
+        )
+    buffer.seek(0)
+    db.execute(CREATE_STAGING)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(COPY_STAGING, buffer)
+    finally:
+        cursor.close()
+    conflicts = list(db.scalars(MERGE_STAGING))
+    db.commit()
+    return conflicts
+
+
+def import_users(
+    stream: TextIO,
+    file_format: FileFormatEnum,
+    *,
+    chunk_size: int = 5000,
+    pool: HashingPool = hashing_pool,
+) -> schemas.ImportResult:
+    """Import users from a CSV or NDJSON stream.
+
+    Passwords are hashed across the processes of `pool`, and the next chunk
+    starts hashing while the current one is copied and merged, so throughput
+    is bound by CPU cores. On the shared pool, the import takes one call per
+    process at a time and logins keep their place in the queue. Each chunk
+    commits on its own; only the first MAX_REPORTED_ERRORS errors are listed,
+    all of them are counted.
+
+    Args:
+        stream (TextIO): The text stream.
+        file_format (FileFormatEnum): The file format.
+        chunk_size (int, optional): The number of records per chunk. Defaults to 5000.
+        pool (HashingPool, optional): The hashing pool. Defaults to hashing_pool.
+
+    Returns:
+        schemas.ImportResult: The number of inserted users and the failures.
+    """
+    result = schemas.ImportResult()
+
+    def fail(errors: Iterable[schemas.ImportLineError]) -> None:
+        for error in errors:
+            result.failed += 1
+            if len(result.errors) < MAX_REPORTED_ERRORS:
+                result.errors.append(error)
+
+    def load(db: Session, chunk: Chunk, hashes: Iterable[str]) -> None:
+        conflicts = copy_chunk(db, chunk, hashes)
+        result.inserted += len(chunk) - len(conflicts)
+        fail(
+            schemas.ImportLineError(
+                line=line,
+                detail="The user with this email, CPF or phone already exists.",
+            )
+            for line in conflicts
+        )
+
+    with SessionLocal() as db:
+        pending: Optional[Tuple[Chunk, Iterable[str]]] = None
+        for chunk, errors in validated_chunks(stream, file_format, chunk_size):
+            fail(errors)
+            hashes = pool.map(
+                get_password_hash, [user_in.password for _, user_in in chunk]
+            )
+            if pending:
+                load(db, *pending)
+            pending = (chunk, hashes)
+        if pending:
+            load(db, *pending)
+    result.errors.sort(key=lambda error: error.line)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import users from CSV or NDJSON.")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=[f.value for f in FileFormatEnum])
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    file_format = FileFormatEnum(args.format or guess_format(args.path))
+    logger.info("Importing users from %s.", args.path)
+    # A pool of its own, sized for the import rather than for logins.
+    with HashingPool(args.workers) as pool, open(
+        args.path, newline="", encoding="utf-8"
+    ) as stream:
+        result = import_users(
+            stream, file_format, chunk_size=args.chunk_size, pool=pool
+        )
+    logger.info("Imported %s users, %s failed.", result.inserted, result.failed)
+    print(result.model_dump_json(indent=2))
+
+
+if __name__ == "__main__":
+    main()
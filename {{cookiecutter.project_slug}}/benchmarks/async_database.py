@@ -0,0 +1,59 @@
+"""Compare the sync and async database modes under high concurrency.
+
+Starts the application once per mode and reports requests/sec and latency
+percentiles for `/users/me` and `/users/`. Requires the database from `.env`.
+
+    uv run python -m benchmarks.async_database --concurrency 256 --duration 15
+"""
+
+import argparse
+import asyncio
+
+import httpx
+
+from app.core.config import settings
+from benchmarks.utils import HEADER, LoadResult, run_load, serve, superuser_headers
+
+ENDPOINTS = ("/users/me", "/users/")
+
+
+async def measure(
+    base_url: str, mode: str, concurrency: int, duration: float
+) -> list[LoadResult]:
+    headers = superuser_headers(base_url)
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+        return [
+            await run_load(
+                client,
+                f"{mode} {endpoint}",
+                f"{settings.API_V1_STR}{endpoint}",
+                headers=headers,
+                concurrency=concurrency,
+                duration=duration,
+            )
+            for endpoint in ENDPOINTS
+        ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=128)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    results = []
+    for mode, flag in (("sync", "False"), ("async", "True")):
+        with serve({"ASYNC_DATABASE": flag}, workers=args.workers) as base_url:
+            results += asyncio.run(
+                measure(base_url, mode, args.concurrency, args.duration)
+            )
+
+    print(HEADER)
+    for result in results:
+        print(result.row())
+
+
+if __name__ == "__main__":
+    main()
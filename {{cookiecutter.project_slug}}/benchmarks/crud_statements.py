@@ -0,0 +1,82 @@
+"""Per-call overhead of the CRUD lookups: legacy Query vs cached statements.
+
+Runs against an in-memory SQLite database by default so the numbers are
+dominated by Python-side query construction and compilation; pass
+`--database-url` to measure against Postgres instead.
+
+    uv run python -m benchmarks.crud_statements --calls 20000
+"""
+
+import argparse
+import timeit
+from typing import Callable, Dict
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.enums import UserPermissionEnum
+from app.db.base_class import Base
+from app.models.user import User
+
+
+def legacy_paths(db: Session, user: User) -> Dict[str, Callable[[], object]]:
+    return {
+        "get": lambda: db.query(User).filter(User.id == user.id).first(),
+        "get_multi": lambda: db.query(User).offset(0).limit(100).all(),
+        "get_by_email": lambda: db.query(User).filter(User.email == user.email).first(),
+        "get_by_cpf": lambda: db.query(User).filter(User.cpf == user.cpf).first(),
+    }
+
+
+def cached_paths(db: Session, user: User) -> Dict[str, Callable[[], object]]:
+    return {
+        "get": lambda: crud.user.get(db, id=user.id),
+        "get_multi": lambda: crud.user.get_multi(db, skip=0, limit=100),
+        "get_by_email": lambda: crud.user.get_by_email(db, email=user.email),
+        "get_by_cpf": lambda: crud.user.get_by_cpf(db, cpf=user.cpf),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database-url", default="sqlite://")
+    parser.add_argument("--calls", type=int, default=10000)
+    parser.add_argument("--rows", type=int, default=100)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    if engine.dialect.name == "sqlite":
+        Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        if engine.dialect.name == "sqlite":
+            db.add_all(
+                User(
+                    cpf=f"{index:011d}",
+                    email=f"user{index}@example.com",
+                    phone=f"{index:010d}",
+                    permission=UserPermissionEnum.USER.value,
+                    hashed_password="x",
+                )
+                for index in range(args.rows)
+            )
+            db.commit()
+        user = db.query(User).first()
+
+        legacy = legacy_paths(db, user)
+        cached = cached_paths(db, user)
+        print(f"{'lookup':<14} {'legacy us':>10} {'cached us':>10} {'speedup':>8}")
+        for name in legacy:
+            # Warm up the compiled and lambda caches before timing.
+            legacy[name]()
+            cached[name]()
+            before = timeit.timeit(legacy[name], number=args.calls) / args.calls
+            after = timeit.timeit(cached[name], number=args.calls) / args.calls
+            print(
+                f"{name:<14} {before * 1e6:>10.1f} {after * 1e6:>10.1f} "
+                f"{before / after:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
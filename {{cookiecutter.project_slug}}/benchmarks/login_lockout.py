@@ -0,0 +1,97 @@
+"""Measure the server CPU spent per rejected login, with the lockout off and on.
+
+Sends wrong passwords for the first superuser as fast as possible. With the
+lockout off every attempt costs a user query and a bcrypt verify; with it on,
+the attempts after the first few are turned away before either. CPU is the
+user and system time of the server and its hashing processes, minus an idle
+run. Requires the database and Redis from `.env`.
+
+    uv run python -m benchmarks.login_lockout --concurrency 32 --duration 15
+"""
+
+import argparse
+import asyncio
+import resource
+import time
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+from app.core.lockout import login_lockout
+from benchmarks.utils import serve
+
+
+async def attack(base_url: str, concurrency: int, duration: float) -> Counter:
+    statuses: Counter = Counter()
+    data = {"username": settings.FIRST_SUPERUSER, "password": "wrong password"}
+    deadline = time.perf_counter() + duration
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        while time.perf_counter() < deadline:
+            response = await client.post(
+                f"{settings.API_V1_STR}/login/access-token", data=data
+            )
+            statuses[response.status_code] += 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=60
+    ) as client:
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+    return statuses
+
+
+def server_cpu(
+    env: Dict[str, str], concurrency: int, duration: Optional[float]
+) -> Tuple[float, Counter]:
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    with serve(env) as base_url:
+        statuses = (
+            asyncio.run(attack(base_url, concurrency, duration))
+            if duration
+            else Counter()
+        )
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    seconds = (after.ru_utime + after.ru_stime) - (before.ru_utime + before.ru_stime)
+    return seconds, statuses
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    unlimited = {"RATE_LIMIT_TIME": "1000000/minute"}
+    idle, _ = server_cpu(unlimited, args.concurrency, None)
+    print(
+        f"{'lockout':<8} {'attempts':>9} {'429s':>7} "
+        f"{'attempts/s':>11} {'cpu ms/attempt':>15}"
+    )
+    for mode, env in (
+        (
+            "off",
+            {
+                **unlimited,
+                "LOGIN_LOCKOUT_ACCOUNT_FAILURES": "0",
+                "LOGIN_LOCKOUT_IP_FAILURES": "0",
+            },
+        ),
+        ("on", unlimited),
+    ):
+        try:
+            seconds, statuses = server_cpu(env, args.concurrency, args.duration)
+        finally:
+            login_lockout.reset(settings.FIRST_SUPERUSER, "127.0.0.1")
+        attempts = sum(statuses.values())
+        print(
+            f"{mode:<8} {attempts:>9} {statuses[429]:>7} "
+            f"{attempts / args.duration:>11.1f} "
+            f"{max(seconds - idle, 0) / attempts * 1000:>15.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Page latency by depth: offset pagination vs keyset (cursor) pagination.
+
+Runs against an in-memory SQLite database by default; pass `--database-url`
+to measure against a Postgres database that already holds enough users.
+
+    uv run python -m benchmarks.pagination --rows 200000
+"""
+
+import argparse
+import timeit
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.enums import UserPermissionEnum
+from app.crud.pagination import encode_cursor
+from app.db.base_class import Base
+from app.models.user import User
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database-url", default="sqlite://")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--calls", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    if engine.dialect.name == "sqlite":
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(
+                insert(User),
+                [
+                    {
+                        "cpf": f"{index:011d}",
+                        "email": f"user{index}@example.com",
+                        "phone": f"{index:010d}",
+                        "permission": UserPermissionEnum.USER.value,
+                        "hashed_password": "x",
+                    }
+                    for index in range(args.rows)
+                ],
+            )
+
+    with Session(engine) as db:
+        ids = db.scalars(select(User.id).order_by(User.id)).all()
+        depths = [
+            depth
+            for depth in (0, 1_000, 10_000, 100_000, 1_000_000)
+            if depth < len(ids)
+        ]
+        print(f"{'depth':>9} {'offset ms':>10} {'cursor ms':>10}")
+        for depth in depths:
+            # The cursor a client would hold after paging down to `depth`.
+            cursor = encode_cursor("id", ids[depth - 1]) if depth else None
+
+            def offset_page() -> None:
+                crud.user.get_multi(db, skip=depth, limit=args.limit)
+                db.expunge_all()
+
+            def cursor_page() -> None:
+                crud.user.get_multi(db, limit=args.limit, after=cursor)
+                db.expunge_all()
+
+            offset_page()
+            cursor_page()
+            offset = timeit.timeit(offset_page, number=args.calls) / args.calls
+            keyset = timeit.timeit(cursor_page, number=args.calls) / args.calls
+            print(f"{depth:>9} {offset * 1e3:>10.2f} {keyset * 1e3:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
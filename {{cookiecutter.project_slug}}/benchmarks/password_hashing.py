@@ -0,0 +1,47 @@
+"""Measure logins/sec/core at each bcrypt cost.
+
+Verifies passwords through a HashingPool, as logins do, and divides the
+throughput by the hashing processes. Pick PASSWORD_HASH_ROUNDS with
+`python -m app.calibrate_hashing`, then check the capacity it leaves here.
+
+    uv run python -m benchmarks.password_hashing --rounds 10 11 12 13 --calls 64
+"""
+
+import argparse
+import os
+import time
+
+from passlib.hash import bcrypt
+
+from app.core.hashing import HashingPool
+from app.core.security import verify_password
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 11, 12, 13])
+    parser.add_argument("--calls", type=int, default=64)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    print(f"{'cost':>4} {'ms/login':>9} {'logins/s':>9} {'logins/s/core':>14}")
+    with HashingPool(args.processes, queue_size=args.calls) as pool:
+        pool.run(time.sleep, 0)  # Start the processes before timing.
+        for rounds in args.rounds:
+            hashed_password = bcrypt.using(rounds=rounds).hash("benchmark password")
+            start = time.perf_counter()
+            futures = [
+                pool.submit(verify_password, "benchmark password", hashed_password)
+                for _ in range(args.calls)
+            ]
+            assert all(future.result() for future in futures)
+            elapsed = time.perf_counter() - start
+            per_second = args.calls / elapsed
+            print(
+                f"{rounds:>4} {elapsed / args.calls * args.processes * 1000:>9.1f} "
+                f"{per_second:>9.1f} {per_second / args.processes:>14.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
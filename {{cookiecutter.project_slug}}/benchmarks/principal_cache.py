@@ -0,0 +1,55 @@
+"""Compare `/users/me` with the principal cache off and on.
+
+Starts the application once per setting and reports requests/sec and latency
+percentiles. Requires the database and Redis from `.env`.
+
+    uv run python -m benchmarks.principal_cache --concurrency 128 --duration 15
+"""
+
+import argparse
+import asyncio
+
+import httpx
+
+from app.core.config import settings
+from benchmarks.utils import HEADER, LoadResult, run_load, serve, superuser_headers
+
+
+async def measure(
+    base_url: str, mode: str, concurrency: int, duration: float
+) -> LoadResult:
+    headers = superuser_headers(base_url)
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+        return await run_load(
+            client,
+            f"cache {mode} /users/me",
+            f"{settings.API_V1_STR}/users/me",
+            headers=headers,
+            concurrency=concurrency,
+            duration=duration,
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=128)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    results = []
+    for mode, seconds in (("off", "0"), ("on", "30")):
+        env = {"PRINCIPAL_CACHE_SECONDS": seconds}
+        with serve(env, workers=args.workers) as base_url:
+            results.append(
+                asyncio.run(measure(base_url, mode, args.concurrency, args.duration))
+            )
+
+    print(HEADER)
+    for result in results:
+        print(result.row())
+
+
+if __name__ == "__main__":
+    main()
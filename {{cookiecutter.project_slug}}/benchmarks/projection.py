@@ -0,0 +1,92 @@
+"""Time and memory per page of users: full ORM objects vs column projection.
+
+Reports the `get_multi` load alone, then load plus validation into
+`List[schemas.User]` as the `GET /users/` response does, and the peak
+memory of the latter. Runs against an in-memory SQLite database by
+default; pass `--database-url` for Postgres.
+
+    uv run python -m benchmarks.projection --rows 10000
+"""
+
+import argparse
+import timeit
+import tracemalloc
+from typing import Any, Callable, List
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app import crud, schemas
+from app.api.api_v1.endpoints.users import USER_FIELDS
+from app.core.enums import UserPermissionEnum
+from app.db.base_class import Base
+from app.models.user import User
+
+users_adapter = TypeAdapter(List[schemas.User])
+
+
+def peak_memory(func: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database-url", default="sqlite://")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--calls", type=int, default=10)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    if engine.dialect.name == "sqlite":
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(
+                insert(User),
+                [
+                    {
+                        "first_name": "First",
+                        "last_name": "Last",
+                        "cpf": f"{index:011d}",
+                        "email": f"user{index}@example.com",
+                        "phone": f"{index:010d}",
+                        "permission": UserPermissionEnum.USER.value,
+                        "hashed_password": "$2b$12$" + "x" * 53,
+                    }
+                    for index in range(args.rows)
+                ],
+            )
+
+    with Session(engine) as db:
+
+        def load_orm() -> List[Any]:
+            users = crud.user.get_multi(db, limit=args.rows)
+            db.expunge_all()
+            return users
+
+        def load_projected() -> List[Any]:
+            return crud.user.get_multi(db, limit=args.rows, fields=USER_FIELDS)
+
+        print(f"{'mode':<10} {'load ms':>9} {'+validate ms':>13} {'peak MiB':>9}")
+        for name, load in (("orm", load_orm), ("projected", load_projected)):
+
+            def respond() -> None:
+                users_adapter.validate_python(load(), from_attributes=True)
+
+            respond()
+            load_seconds = timeit.timeit(load, number=args.calls) / args.calls
+            seconds = timeit.timeit(respond, number=args.calls) / args.calls
+            memory = peak_memory(respond) / 2**20
+            print(
+                f"{name:<10} {load_seconds * 1e3:>9.1f} {seconds * 1e3:>13.1f} "
+                f"{memory:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
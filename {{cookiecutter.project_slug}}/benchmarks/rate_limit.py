@@ -0,0 +1,129 @@
+"""Measure the latency a rate limit adds to each request.
+
+Serves a trivial endpoint in process, through an ASGI transport, so only the
+limiter differs: none, the slowapi middleware with a default limit in
+`--storage`, the two-tier limiter syncing to the Redis from `.env`, and the
+atomic GCRA script on that Redis, as a route dependency like the login limit.
+The limit is high enough never to be hit; the numbers are the per-request
+cost of counting, and how much of it is a round trip to the store.
+
+    uv run python -m benchmarks.rate_limit --requests 5000
+    uv run python -m benchmarks.rate_limit --storage memory://
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Callable, List, Sequence
+
+import httpx
+from fastapi import Depends, FastAPI
+from fastapi.params import Depends as Dependency
+from slowapi import Limiter
+from slowapi.middleware import SlowAPIMiddleware
+from slowapi.util import get_remote_address
+
+from app.api import deps
+from app.core.config import settings
+from app.core.middleware import RateLimitMiddleware
+from app.core.rate_limit import RedisRateLimiter, TwoTierLimiter
+from app.core.redis import async_redis_client, circuit_breaker, redis_client
+
+RATE = "1000000/minute"
+
+
+def application(
+    configure: Callable[[FastAPI], None] = lambda app: None,
+    dependencies: Sequence[Dependency] = (),
+) -> FastAPI:
+    app = FastAPI(dependencies=list(dependencies))
+
+    @app.get("/")
+    def index() -> None:
+        return None
+
+    configure(app)
+    return app
+
+
+def slowapi(storage: str) -> Callable[[FastAPI], None]:
+    def configure(app: FastAPI) -> None:
+        app.state.limiter = Limiter(
+            key_func=get_remote_address, default_limits=[RATE], storage_uri=storage
+        )
+        app.add_middleware(SlowAPIMiddleware)
+
+    return configure
+
+
+def two_tier(limiter: TwoTierLimiter) -> Callable[[FastAPI], None]:
+    def configure(app: FastAPI) -> None:
+        app.add_middleware(RateLimitMiddleware, limiter=limiter)
+
+    return configure
+
+
+async def measure(app: FastAPI, requests: int) -> List[float]:
+    latencies = []
+    transport = httpx.ASGITransport(app=app, client=("10.0.0.1", 1234))
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://benchmark"
+    ) as client:
+        for _ in range(requests // 10):
+            await client.get("/")
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = await client.get("/")
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--storage", default=settings.REDIS_HOST)
+    args = parser.parse_args()
+
+    limiter = TwoTierLimiter(
+        redis_client,
+        circuit_breaker("rate-limit"),
+        RATE,
+        sync_seconds=settings.RATE_LIMIT_SYNC_SECONDS,
+    )
+    gcra = deps.rate_limit(
+        RedisRateLimiter(async_redis_client, circuit_breaker("login-rate-limit"), RATE),
+        "",
+    )
+    limiter.start()
+    try:
+        latencies = {
+            "none": asyncio.run(measure(application(), args.requests)),
+            "slowapi": asyncio.run(
+                measure(application(slowapi(args.storage)), args.requests)
+            ),
+            "two-tier": asyncio.run(
+                measure(application(two_tier(limiter)), args.requests)
+            ),
+            "gcra": asyncio.run(
+                measure(application(dependencies=[Depends(gcra)]), args.requests)
+            ),
+        }
+    finally:
+        limiter.stop()
+
+    baseline = statistics.median(latencies["none"])
+    print(f"{'limiter':<12} {'p50 ms':>9} {'p99 ms':>9} {'added p50 ms':>13}")
+    for name, values in latencies.items():
+        ordered = sorted(values)
+        p50 = statistics.median(ordered)
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        print(
+            f"{name:<12} {p50 * 1000:>9.3f} {p99 * 1000:>9.3f} "
+            f"{(p50 - baseline) * 1000:>13.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
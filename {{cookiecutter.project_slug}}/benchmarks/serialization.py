@@ -0,0 +1,111 @@
+"""Measure the response encoding of `List[schemas.User]`, per page size.
+
+Compares the ways a page of users can become a response body:
+
+- `json` and `orjson`: what FastAPI does for `response_model`, validating
+  the users into the model, dumping them to JSON-compatible data and
+  rendering that with `JSONResponse` or `ORJSONResponse`.
+- `serializer`: `schemas.user_serializer`, writing JSON bytes straight from
+  the ORM objects, or from the rows `GET /users/` loads, in one pass.
+
+The users live in an in-memory SQLite database; `render us` is the time of
+the JSON rendering alone, where it is a separate step.
+
+    uv run python -m benchmarks.serialization --sizes 10 100 1000
+"""
+
+import argparse
+import timeit
+from typing import Any, Callable, List, Optional
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app import crud, schemas
+from app.api.api_v1.endpoints.users import USER_FIELDS
+from app.core.enums import UserPermissionEnum
+from app.db.base_class import Base
+from app.models.user import User
+
+users_adapter = TypeAdapter(List[schemas.User])
+
+
+def per_call(func: Callable[[], Any], calls: int) -> float:
+    return timeit.timeit(func, number=calls) / calls
+
+
+def row(name: str, size: int, total: float, render: Optional[float] = None) -> str:
+    rendered = f"{render * 1e6:>10.1f}" if render is not None else f"{'-':>10}"
+    return (
+        f"{size:>6} {name:<20} {rendered} {total * 1e6:>10.1f} "
+        f"{total / size * 1e6:>8.2f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(User),
+            [
+                {
+                    "first_name": "First",
+                    "last_name": "Last",
+                    "cpf": f"{index:011d}",
+                    "email": f"user{index}@example.com",
+                    "phone": f"{index:010d}",
+                    "permission": UserPermissionEnum.USER.value,
+                    "hashed_password": "$2b$12$" + "x" * 53,
+                }
+                for index in range(max(args.sizes))
+            ],
+        )
+
+    print(
+        f"{'items':>6} {'response':<20} {'render us':>10} "
+        f"{'total us':>10} {'us/item':>8}"
+    )
+    with Session(engine) as db:
+        for size in args.sizes:
+            objects = crud.user.get_multi(db, limit=size)
+            rows = crud.user.get_multi(db, limit=size, fields=USER_FIELDS)
+            for name, response_class in (
+                ("json", JSONResponse),
+                ("orjson", ORJSONResponse),
+            ):
+
+                def respond() -> bytes:
+                    validated = users_adapter.validate_python(
+                        objects, from_attributes=True
+                    )
+                    return response_class(
+                        users_adapter.dump_python(validated, mode="json")
+                    ).body
+
+                content = users_adapter.dump_python(
+                    users_adapter.validate_python(objects, from_attributes=True),
+                    mode="json",
+                )
+                render = per_call(lambda: response_class(content).body, args.calls)
+                print(row(name, size, per_call(respond, args.calls), render))
+            for name, page in (
+                ("serializer objects", objects),
+                ("serializer rows", rows),
+            ):
+                total = per_call(
+                    lambda: schemas.user_serializer.response_many(page).body,
+                    args.calls,
+                )
+                print(row(name, size, total))
+
+
+if __name__ == "__main__":
+    main()
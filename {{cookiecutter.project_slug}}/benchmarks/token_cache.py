@@ -0,0 +1,44 @@
+"""Access token validations per second with the verified-token cache off and on.
+
+Validates `--tokens` distinct tokens round-robin through `deps.get_token_data`,
+as repeated requests from that many clients would. No database is needed.
+
+    uv run python -m benchmarks.token_cache --tokens 1000
+"""
+
+import argparse
+import itertools
+import timeit
+
+from app.api import deps
+from app.core.cache import LocalCache
+from app.core.config import settings
+from app.core.security import create_access_token
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=1000)
+    parser.add_argument("--calls", type=int, default=100_000)
+    args = parser.parse_args()
+
+    tokens = [create_access_token(user_id) for user_id in range(args.tokens)]
+    print(f"{'cache':<6} {'validations/s':>14} {'us/call':>9}")
+    for mode, ttl in (("off", 0), ("on", settings.TOKEN_CACHE_SECONDS or 300)):
+        deps.verified_tokens = LocalCache(
+            "verified_token", maxsize=max(args.tokens, 1), ttl=ttl
+        )
+        cycled = itertools.cycle(tokens)
+
+        def validate() -> None:
+            deps.get_token_data(next(cycled))
+
+        for token in tokens:
+            deps.get_token_data(token)
+        seconds = timeit.timeit(validate, number=args.calls)
+        per_call = seconds / args.calls
+        print(f"{mode:<6} {1 / per_call:>14.0f} {per_call * 1e6:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Measure the revocation check of access tokens with 1M revoked tokens.
+
+Fills a revocation filter with `--revoked` token IDs and times the check of
+valid tokens, the common case, which the Bloom filter answers from memory.
+Its false positives are the share of valid tokens looked up in Redis.
+
+With `--redis`, the revoked IDs are also stored in the Redis from `.env`
+and the filter is rebuilt from there, so the check of revoked tokens, a
+filter hit plus a Redis lookup, is timed as well. The IDs are removed
+afterwards.
+
+    uv run python -m benchmarks.token_revocation --revoked 1000000 --checks 200000
+"""
+
+import argparse
+import secrets
+import time
+from typing import Callable, List
+
+from app.core.config import settings
+from app.core.redis import circuit_breaker, redis_client
+from app.core.tokens import RevocationList
+
+
+def rate(check: Callable[[str], bool], jtis: List[str]) -> float:
+    start = time.perf_counter()
+    for jti in jtis:
+        check(jti)
+    return len(jtis) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--revoked", type=int, default=1_000_000)
+    parser.add_argument("--checks", type=int, default=200_000)
+    parser.add_argument("--redis", action="store_true")
+    args = parser.parse_args()
+
+    revocations = RevocationList(
+        redis_client,
+        circuit_breaker("token-revocations"),
+        capacity=settings.REVOCATION_FILTER_CAPACITY,
+        error_rate=settings.REVOCATION_FILTER_ERROR_RATE,
+    )
+    revoked = [secrets.token_urlsafe(16) for _ in range(args.revoked)]
+    valid = [secrets.token_urlsafe(16) for _ in range(args.checks)]
+
+    start = time.perf_counter()
+    if args.redis:
+        expires_at = time.time() + 3600
+        for index in range(0, len(revoked), 10_000):
+            batch = revoked[index : index + 10_000]
+            revocations._redis.zadd(revocations.key, {jti: expires_at for jti in batch})
+        revocations._resync()
+    else:
+        revocations._apply(revoked)
+    print(f"filled with {args.revoked} revoked in {time.perf_counter() - start:.1f}s")
+
+    bloom = revocations._filter
+    false_positives = sum(jti in bloom for jti in valid)
+    print(
+        f"filter: {len(bloom.bits) / 2**20:.1f} MiB, {bloom.hashes} hashes, "
+        f"{false_positives / len(valid):.4%} of valid tokens go to Redis"
+    )
+    misses = [jti for jti in valid if jti not in bloom]
+    print(f"valid tokens:   {rate(revocations.is_revoked, misses):>12.0f} checks/s")
+    if args.redis:
+        try:
+            sample = revoked[: min(len(revoked), 20_000)]
+            print(
+                f"revoked tokens: {rate(revocations.is_revoked, sample):>12.0f} checks/s"
+            )
+        finally:
+            for index in range(0, len(revoked), 10_000):
+                revocations._redis.zrem(
+                    revocations.key, *revoked[index : index + 10_000]
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Shared helpers for the HTTP benchmarks."""
+
+import asyncio
+import contextlib
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+import httpx
+
+from app.core.config import settings
+
+
+@dataclass
+class LoadResult:
+    """The outcome of a load run against one endpoint."""
+
+    name: str
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def requests_per_second(self) -> float:
+        return len(self.latencies) / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, value: float) -> float:
+        """Get a latency percentile in milliseconds.
+
+        Args:
+            value (float): The percentile, between 0 and 100.
+
+        Returns:
+            float: The latency in milliseconds.
+        """
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * value / 100))
+        return ordered[index] * 1000
+
+    def row(self) -> str:
+        return (
+            f"{self.name:<32} {self.requests_per_second:>10.1f} "
+            f"{self.percentile(50):>9.2f} {self.percentile(99):>9.2f} {self.errors:>7}"
+        )
+
+
+HEADER = f"{'scenario':<32} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}"
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    name: str,
+    url: str,
+    *,
+    headers: Optional[Dict[str, str]] = None,
+    concurrency: int = 64,
+    duration: float = 10.0,
+) -> LoadResult:
+    """Hit a GET endpoint from `concurrency` workers for `duration` seconds.
+
+    Args:
+        client (httpx.AsyncClient): The HTTP client.
+        name (str): The scenario name used in the report.
+        url (str): The URL to request.
+        headers (Optional[Dict[str, str]], optional): The request headers. Defaults to None.
+        concurrency (int, optional): The number of concurrent workers. Defaults to 64.
+        duration (float, optional): The run duration in seconds. Defaults to 10.0.
+
+    Returns:
+        LoadResult: The collected latencies.
+    """
+    result = LoadResult(name=name)
+    deadline = time.perf_counter() + duration
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = await client.get(url, headers=headers)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                result.latencies.append(time.perf_counter() - start)
+            else:
+                result.errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def superuser_headers(base_url: str) -> Dict[str, str]:
+    """Log in as the first superuser.
+
+    Args:
+        base_url (str): The server base URL.
+
+    Returns:
+        Dict[str, str]: The authorization headers.
+    """
+    response = httpx.post(
+        f"{base_url}{settings.API_V1_STR}/login/access-token",
+        data={
+            "username": settings.FIRST_SUPERUSER,
+            "password": settings.FIRST_SUPERUSER_PASSWORD,
+        },
+    )
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@contextlib.contextmanager
+def serve(env: Dict[str, str], *, port: int = 8765, workers: int = 1) -> Iterator[str]:
+    """Run the application with uvicorn in a subprocess.
+
+    Args:
+        env (Dict[str, str]): Environment overrides for the server.
+        port (int, optional): The port to listen on. Defaults to 8765.
+        workers (int, optional): The number of uvicorn workers. Defaults to 1.
+
+    Yields:
+        Iterator[str]: The server base URL.
+    """
+    base_url = f"http://127.0.0.1:{port}"
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+        ],
+        env={**os.environ, **env},
+    )
+    try:
+        for _ in range(100):
+            try:
+                if httpx.get(f"{base_url}/actuator/health").status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.1)
+        else:
+            raise RuntimeError("The server did not start.")
+        yield base_url
+    finally:
+        process.terminate()
+        process.wait()